@@ -0,0 +1,445 @@
+"""This module contains `serve_agent()`, an agent serving secrets on a Unix socket.
+
+`AgentClient` is the thin client that talks to it.
+
+Short-lived scripts pay for starting Python, importing boto3, resolving
+credentials and a TLS handshake before their first request. The agent
+pays for these once, then holds a warm client and a `SecretCache`. It
+answers over a Unix domain socket, so a lookup costs one local round trip.
+
+The protocol is one JSON object per line in each direction. A request
+is a `cli.run_command()` command, such as {"op": "get", "secret_id": "x"}.
+A response is that command's result. A connection may send any number of
+requests, and each is answered in order.
+
+This module imports nothing heavier than the standard library until
+`serve_agent()` is called, so clients load it quickly.
+"""
+
+import contextlib
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+
+SOCKET_VARIABLE = "PASSWORD_MANAGER_AGENT_SOCKET"
+DEFAULT_SOCKET_PATH = "~/.password_manager/agent.sock"
+
+DEFAULT_SOCKET_MODE = 0o600
+DEFAULT_IDLE_TIMEOUT = 3600
+DEFAULT_CACHE_TTL = 300
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_CLIENT_TIMEOUT = 30
+
+
+class AgentError(Exception):
+    """Traps errors where the agent cannot be reached, or reports that a request failed.
+
+    Attributes:
+        error (str): the class name of the error raised in the agent, if any.
+    """
+
+    def __init__(self, message=None, error: str = None):
+        super().__init__(message)
+        self.error = error
+
+
+def socket_path(path: str = None) -> str:
+    """A function to resolve the agent's socket path.
+
+    Args:
+        path (str): an explicit path, used as given.
+
+    Returns:
+        path (str): path, else $PASSWORD_MANAGER_AGENT_SOCKET, else
+        DEFAULT_SOCKET_PATH, with "~" expanded.
+    """
+
+    return os.path.expanduser(
+        path or os.environ.get(SOCKET_VARIABLE) or DEFAULT_SOCKET_PATH
+    )
+
+
+def serve_agent(
+    path: str = None,
+    mode: int = DEFAULT_SOCKET_MODE,
+    idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+    cache_ttl: float = DEFAULT_CACHE_TTL,
+    cache_size: int = DEFAULT_CACHE_SIZE,
+    ready=None,
+):
+    """A function to run the agent in the foreground until stopped or idle too long.
+
+    The client is created, and one ListSecrets request made, before the
+    socket is opened, so even the first request is served warm. Each
+    connection gets its own thread. Reads go through a `SecretCache`,
+    which creates, upserts and deletes made through the agent invalidate.
+
+    Args:
+        path (str): the socket to listen on, resolved with `socket_path()`.
+        mode (int): the socket file's permissions. The default lets only
+        the owner connect.
+        idle_timeout (float): seconds without a request after which the
+        agent exits. 0 or None keeps it running until stopped.
+        cache_ttl (float): seconds a secret value is served from the cache.
+        cache_size (int): the maximum number of secrets cached at once.
+        ready (callable): called with the socket path once it is accepting
+        connections.
+
+    Raises:
+        AgentError: if another agent is already listening on path.
+    """
+
+    from src.cli import run_command
+    from src.client import get_client
+    from src.secret_cache import SecretCache
+
+    path = socket_path(path)
+    _remove_stale_socket(path)
+
+    _warm(get_client)
+    cache = SecretCache(ttl=cache_ttl, max_size=cache_size)
+
+    server = _AgentServer(path, mode, cache, run_command)
+    watchdog = threading.Thread(
+        target=server.watch,
+        args=(idle_timeout,),
+        name="agent-idle-timeout",
+        daemon=True,
+    )
+
+    try:
+        if idle_timeout:
+            watchdog.start()
+        if ready is not None:
+            ready(path)
+        server.serve_forever(poll_interval=0.5)
+    finally:
+        server.server_close()
+        cache.close()
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+
+
+class AgentClient:
+    """A connection to a running agent, with the same operations as the library.
+
+    One connection is kept open and reused, and may be shared between
+    threads. If the agent has restarted, so the request could not be sent,
+    it is sent once more on a new connection. A request that was sent is
+    never repeated, even when its response times out.
+
+    Args:
+        path (str): the agent's socket, resolved with `socket_path()`.
+        timeout (float): seconds to wait for each response.
+    """
+
+    def __init__(self, path: str = None, timeout: float = DEFAULT_CLIENT_TIMEOUT):
+        self.path = socket_path(path)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._socket = None
+        self._file = None
+
+    def call(self, command: dict) -> dict:
+        """A method to send one command and return its result unchanged.
+
+        Args:
+            command (dict): a `cli.run_command()` command.
+
+        Returns:
+            result (dict): as returned by `cli.run_command()`.
+
+        Raises:
+            AgentError: if the agent cannot be reached.
+        """
+
+        request = (json.dumps(command, separators=(",", ":")) + "\n").encode("utf-8")
+
+        with self._lock:
+            for _ in range(2):
+                reused = self._socket is not None
+                try:
+                    if not reused:
+                        self._connect()
+                    self._socket.sendall(request)
+                except OSError as e:
+                    error = e
+                    self._disconnect()
+                    # Only a connection that never took the request is
+                    # retried, e.g. one the agent closed when it restarted.
+                    if not reused or isinstance(
+                        e, (BrokenPipeError, ConnectionResetError)
+                    ):
+                        continue
+                    break
+
+                try:
+                    line = self._file.readline()
+                except OSError as e:
+                    # The agent may still be running the request, so sending
+                    # it again could create or delete a secret twice.
+                    error = e
+                    self._disconnect()
+                    break
+                if line:
+                    return json.loads(line)
+                error = ConnectionResetError("the agent closed the connection")
+                self._disconnect()
+                break
+
+        raise AgentError(
+            print(f"AgentError: no agent at {self.path} ({error})."),
+            error=type(error).__name__,
+        )
+
+    def get_secret(self, secret_id: str) -> str:
+        """A method to retrieve a secret, as `get_secret()` does.
+
+        Args:
+            secret_id (str): the name of the secret to be retrieved.
+
+        Returns:
+            secret_string (str): a string of the retrieved secret user_id and password.
+
+        Raises:
+            AgentError: if the agent cannot be reached or the lookup failed.
+        """
+
+        return self._result({"op": "get", "secret_id": secret_id})
+
+    def list_secrets(
+        self, name_prefix: str = None, tags: dict = None, description: str = None
+    ) -> list:
+        """A method to list secret names, as `list_secrets()` does."""
+
+        return self._result(
+            {
+                "op": "list",
+                "name_prefix": name_prefix,
+                "tags": tags,
+                "description": description,
+            }
+        )
+
+    def create_secret(self, secret_id: str, user_id: str, password: str) -> int:
+        """A method to store a new secret, as `create_secret()` does."""
+
+        return self._result(
+            {
+                "op": "create",
+                "secret_id": secret_id,
+                "user_id": user_id,
+                "password": password,
+            }
+        )
+
+    def upsert_secret(self, secret_id: str, user_id: str, password: str) -> str:
+        """A method to create or update a secret, as `upsert_secret()` does."""
+
+        return self._result(
+            {
+                "op": "upsert",
+                "secret_id": secret_id,
+                "user_id": user_id,
+                "password": password,
+            }
+        )
+
+    def delete_secret(
+        self,
+        secret_id: str,
+        recovery_window_in_days: int = None,
+        force_delete: bool = False,
+    ) -> int:
+        """A method to delete a secret, as `delete_secret()` does."""
+
+        return self._result(
+            {
+                "op": "delete",
+                "secret_id": secret_id,
+                "recovery_window_in_days": recovery_window_in_days,
+                "force_delete": force_delete,
+            }
+        )
+
+    def ping(self) -> dict:
+        """A method to return the agent's pid, uptime and cache statistics."""
+
+        return self._result({"op": "ping"})
+
+    def stop(self):
+        """A method to ask the agent to exit once this request is answered."""
+
+        self._result({"op": "stop"})
+        self.close()
+
+    def close(self):
+        """A method to close the connection; the next call opens a new one."""
+
+        with self._lock:
+            self._disconnect()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _result(self, command):
+        result = self.call(command)
+        if not result["ok"]:
+            raise AgentError(
+                print(f"{result['error']}: {result.get('message')}"),
+                error=result["error"],
+            )
+        return result["result"]
+
+    def _connect(self):
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(self.timeout)
+        try:
+            self._socket.connect(self.path)
+        except OSError:
+            self._disconnect()
+            raise
+        self._file = self._socket.makefile("rb")
+
+    def _disconnect(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        self.server.connections.add(self.request)
+
+    def finish(self):
+        self.server.connections.discard(self.request)
+        with contextlib.suppress(OSError):
+            super().finish()
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            result = self.server.run(line)
+            response = json.dumps(result, default=str, separators=(",", ":")) + "\n"
+            self.wfile.write(response.encode("utf-8"))
+            if result.get("op") == "stop" and result["ok"]:
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+
+class _AgentServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, mode, cache, run_command):
+        self.cache = cache
+        self.run_command = run_command
+        self.started = time.monotonic()
+        self.last_request = self.started
+        self.connections = set()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+
+        # Create the socket without group or other access, so there is
+        # no moment at which it is more open than mode.
+        umask = os.umask(0o177)
+        try:
+            super().__init__(path, _Handler)
+        finally:
+            os.umask(umask)
+        os.chmod(path, mode)
+
+    def run(self, line):
+        self.last_request = time.monotonic()
+
+        try:
+            command = json.loads(line)
+            if not isinstance(command, dict):
+                raise ValueError("command must be a JSON object")
+        except ValueError as e:
+            return {"ok": False, "error": "InvalidCommand", "message": str(e)}
+
+        op = command.get("op")
+        if op == "get":
+            return self._get(command)
+        if op == "ping":
+            return {"op": op, "ok": True, "result": self._status()}
+        if op == "stop":
+            return {"op": op, "ok": True, "result": None}
+        return self.run_command(command)
+
+    def server_close(self):
+        super().server_close()
+        # Also end open connections, so their clients see the agent has gone.
+        for connection in list(self.connections):
+            with contextlib.suppress(OSError):
+                connection.shutdown(socket.SHUT_RDWR)
+
+    def watch(self, idle_timeout):
+        while True:
+            idle = time.monotonic() - self.last_request
+            if idle >= idle_timeout:
+                self.shutdown()
+                return
+            time.sleep(min(idle_timeout - idle, 1.0))
+
+    def _get(self, command):
+        secret_id = command.get("secret_id")
+        result = {"op": "get", "secret_id": secret_id}
+        try:
+            result["result"] = self.cache.get_secret(secret_id or "")
+        except Exception as e:
+            result["ok"] = False
+            result["error"] = type(e).__name__
+            result["message"] = str(e) if str(e) != "None" else None
+            return result
+        result["ok"] = True
+        return result
+
+    def _status(self):
+        return {
+            "pid": os.getpid(),
+            "uptime": round(time.monotonic() - self.started, 3),
+            "cache": self.cache.stats,
+        }
+
+
+def _remove_stale_socket(path):
+    if not os.path.exists(path):
+        return
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        # Left behind by an agent that did not exit cleanly.
+        os.remove(path)
+    else:
+        raise AgentError(print(f"AgentError: an agent is already listening on {path}."))
+    finally:
+        probe.close()
+
+
+def _warm(get_client):
+    try:
+        from src import rate_limit
+
+        sm = get_client()
+        rate_limit.call("ListSecrets", sm.list_secrets, MaxResults=1)
+    except Exception as e:
+        # Keep serving, so the problem can be fixed without a restart,
+        # but say so now rather than at the first request.
+        print(f"Agent warm-up failed: {type(e).__name__}: {e}", file=sys.stderr)
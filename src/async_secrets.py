@@ -0,0 +1,187 @@
+"""This module contains awaitable versions of the secret operations for asyncio callers.
+
+Each coroutine runs the matching synchronous function on a shared, bounded
+thread pool, so validation and exceptions are exactly those of the sync
+API. A per-event-loop semaphore limits how many calls are in flight;
+further calls wait on the semaphore rather than queueing threads.
+"""
+
+import asyncio
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from src import create_secret as _create
+from src import delete_secret as _delete
+from src import get_secret as _get
+from src import get_secrets as _batch
+from src import list_secrets as _list
+from src.validation import validate_secret_ids
+
+DEFAULT_CONCURRENCY = 16
+
+_lock = threading.Lock()
+_concurrency = DEFAULT_CONCURRENCY
+_executor = None
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def set_concurrency(limit: int):
+    """A function to set how many operations may run at once.
+
+    Args:
+        limit (int): the maximum number of concurrent operations.
+
+    Raises:
+        ValueError: if limit is less than 1.
+    """
+
+    global _concurrency, _executor
+
+    if limit < 1:
+        raise ValueError("limit must be at least 1.")
+
+    with _lock:
+        _concurrency = limit
+        old_executor, _executor = _executor, None
+        _semaphores.clear()
+
+    if old_executor is not None:
+        old_executor.shutdown(wait=False)
+
+
+async def create_secret(
+    secret_identifier: str,
+    user_id: str,
+    password: str,
+    binary: bool = False,
+    replica_regions: list = None,
+):
+    """An awaitable `create_secret()`, with the same arguments, result and errors."""
+
+    return await _run(
+        _create.create_secret,
+        secret_identifier,
+        user_id,
+        password,
+        binary=binary,
+        replica_regions=replica_regions,
+    )
+
+
+async def get_secret(secret_id: str):
+    """An awaitable `get_secret()`, with the same arguments, result and errors."""
+
+    return await _run(_get.get_secret, secret_id)
+
+
+async def delete_secret(
+    secret_id: str,
+    recovery_window_in_days: int = None,
+    force_delete: bool = False,
+):
+    """An awaitable `delete_secret()`, with the same arguments, result and errors."""
+
+    return await _run(
+        _delete.delete_secret,
+        secret_id,
+        recovery_window_in_days=recovery_window_in_days,
+        force_delete=force_delete,
+    )
+
+
+async def list_secrets(**filters) -> list:
+    """An awaitable `list_secrets()`, with the same arguments and result."""
+
+    return await _run(_list.list_secrets, **filters)
+
+
+async def get_secrets(secret_ids: list) -> tuple:
+    """An awaitable version of `get_secrets()`.
+
+    The ids are split into BatchGetSecretValue-sized chunks and every chunk
+    is fetched concurrently, subject to the concurrency limit.
+
+    Args:
+        secret_ids (list): the names or ARNs of the secrets to be retrieved.
+
+    Returns:
+        secrets (dict): a mapping of secret id to its SecretString.
+        errors (dict): a mapping of secret id to its "ErrorCode" and "Message".
+
+    Raises:
+        BlankArgumentError: if any secret_id is blank.
+    """
+
+    validate_secret_ids(secret_ids)
+
+    unique_ids = list(dict.fromkeys(secret_ids))
+    size = _batch.BATCH_SIZE
+    chunks = [unique_ids[i : i + size] for i in range(0, len(unique_ids), size)]
+
+    results = await asyncio.gather(
+        *(_run(_batch.get_secrets, chunk, max_workers=1) for chunk in chunks)
+    )
+
+    secrets = {}
+    errors = {}
+    for chunk_secrets, chunk_errors in results:
+        secrets.update(chunk_secrets)
+        errors.update(chunk_errors)
+
+    return secrets, errors
+
+
+async def gather_secrets(secret_ids: list) -> tuple:
+    """A function to fetch many secrets with one `get_secret()` call each, concurrently.
+
+    Unlike `get_secrets()` this raises nothing for individual secrets:
+    any exception is reported against its id instead.
+
+    Args:
+        secret_ids (list): the names of the secrets to be retrieved.
+
+    Returns:
+        secrets (dict): a mapping of secret id to its SecretString.
+        errors (dict): a mapping of secret id to the exception it raised.
+    """
+
+    unique_ids = list(dict.fromkeys(secret_ids))
+    results = await asyncio.gather(
+        *(get_secret(secret_id) for secret_id in unique_ids), return_exceptions=True
+    )
+
+    secrets = {}
+    errors = {}
+    for secret_id, result in zip(unique_ids, results):
+        if isinstance(result, Exception):
+            errors[secret_id] = result
+        else:
+            secrets[secret_id] = result
+
+    return secrets, errors
+
+
+async def _run(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    executor, semaphore = _resources(loop)
+
+    async with semaphore:
+        return await loop.run_in_executor(executor, partial(func, *args, **kwargs))
+
+
+def _resources(loop):
+    global _executor
+
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=_concurrency, thread_name_prefix="async_secrets"
+            )
+        semaphore = _semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(_concurrency)
+            _semaphores[loop] = semaphore
+
+        return _executor, semaphore
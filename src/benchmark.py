@@ -0,0 +1,335 @@
+"""This module contains the benchmark suite for the secret operations.
+
+The suite runs against a local moto server.
+
+Run it with `python -m src.benchmark` (or `make benchmark`). Results are
+written as JSON; pass `--baseline` with an earlier result file to flag
+regressions.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from src import rate_limit
+from src.client import reset_clients
+from src.create_secret import create_secret
+from src.delete_secret import delete_secret
+from src.delete_secrets import delete_secrets
+from src.get_secret import get_secret
+from src.get_secrets import get_secrets, BATCH_SIZE
+from src.import_secrets import import_secrets
+from src.list_secrets import list_secrets
+
+COUNTS = (100, 1000, 10000)
+MODES = ("single", "batch", "concurrent")
+DEFAULT_WORKERS = 16
+DEFAULT_LIST_REPEATS = 5
+DEFAULT_THRESHOLD = 0.10
+
+ENDPOINT_VARIABLE = "AWS_ENDPOINT_URL_SECRETS_MANAGER"
+
+# Latencies where higher is worse, then throughput where lower is worse.
+LATENCY_METRICS = ("p50_ms", "p99_ms")
+THROUGHPUT_METRIC = "ops_per_second"
+
+
+def summarise(samples: list, elapsed: float) -> dict:
+    """A function to reduce per-call latencies to percentiles and throughput.
+
+    Args:
+        samples (list): the duration of each call, in seconds.
+        elapsed (float): the wall-clock seconds taken by all the calls.
+
+    Returns:
+        summary (dict): "n", "mean_ms", "p50_ms", "p90_ms", "p99_ms",
+        "max_ms" and "ops_per_second".
+    """
+
+    ordered = sorted(samples)
+
+    def percentile(p):
+        # Nearest rank, so single samples and small runs stay meaningful.
+        index = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered)) - 1))
+        return ordered[index] * 1000
+
+    return {
+        "n": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": percentile(50),
+        "p90_ms": percentile(90),
+        "p99_ms": percentile(99),
+        "max_ms": ordered[-1] * 1000,
+        "ops_per_second": len(ordered) / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def run_benchmarks(
+    endpoint: str,
+    counts=COUNTS,
+    modes=MODES,
+    workers: int = DEFAULT_WORKERS,
+    list_repeats: int = DEFAULT_LIST_REPEATS,
+) -> dict:
+    """A function to time every operation against a Secrets Manager endpoint.
+
+    For each secret count and mode the store is reset, `count` secrets are
+    created, each is read, the full listing is taken `list_repeats` times
+    and every secret is deleted:
+
+    - "single" makes one call at a time.
+    - "batch" uses `import_secrets()`, `get_secrets()` one chunk at a time
+      and `delete_secrets()`, so batch latencies are per call of those.
+    - "concurrent" makes single calls from `workers` threads at once.
+
+    The shared rate controller is lifted for the run so that the numbers
+    measure this code and the endpoint, not the configured quotas.
+
+    Args:
+        endpoint (str): the URL of a moto server, which must support
+        "/moto-api/reset".
+        counts (tuple): the numbers of secrets to benchmark with.
+        modes (tuple): any of MODES.
+        workers (int): the number of threads for "concurrent" mode, and the
+        worker pools of the batch functions.
+        list_repeats (int): how many times to take the listing.
+
+    Returns:
+        report (dict): "environment" details and "results", keyed
+        "{count}/{mode}/{operation}", each a `summarise()` summary.
+    """
+
+    results = {}
+
+    unlimited = rate_limit.RateController(
+        rates={operation: 1e9 for operation in rate_limit.DEFAULT_RATES}
+    )
+    previous = rate_limit.get_rate_controller()
+    rate_limit.set_rate_controller(unlimited)
+
+    try:
+        with _endpoint(endpoint), contextlib.redirect_stdout(io.StringIO()):
+            for count in counts:
+                names = [f"benchmark/secret{i:05d}" for i in range(count)]
+                for mode in modes:
+                    _reset(endpoint)
+                    for operation, summary in _run_mode(
+                        mode, names, workers, list_repeats
+                    ):
+                        results[f"{count}/{mode}/{operation}"] = summary
+    finally:
+        rate_limit.set_rate_controller(previous)
+
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "workers": workers,
+        },
+        "results": results,
+    }
+
+
+def compare(
+    baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD
+) -> list:
+    """A function to find the results that have regressed since a baseline.
+
+    Only results present in both reports are compared.
+
+    Args:
+        baseline (dict): an earlier `run_benchmarks()` report.
+        current (dict): the report to check.
+        threshold (float): the relative change tolerated, e.g. 0.10 for 10%.
+
+    Returns:
+        regressions (list): one dict per regressed metric, with its "key",
+        "metric", "baseline", "current" and relative "change".
+    """
+
+    regressions = []
+
+    for key, before in baseline["results"].items():
+        after = current["results"].get(key)
+        if after is None:
+            continue
+
+        for metric in LATENCY_METRICS + (THROUGHPUT_METRIC,):
+            old, new = before.get(metric), after.get(metric)
+            if not old or new is None:
+                continue
+
+            change = (new - old) / old
+            worse = -change if metric == THROUGHPUT_METRIC else change
+            if worse > threshold:
+                regressions.append(
+                    {
+                        "key": key,
+                        "metric": metric,
+                        "baseline": old,
+                        "current": new,
+                        "change": change,
+                    }
+                )
+
+    return regressions
+
+
+def main(argv: list = None) -> int:
+    """A function to run the benchmarks from the command line.
+
+    Args:
+        argv (list): the command line arguments, defaulting to sys.argv[1:].
+
+    Returns:
+        exit_code (int): 0, or 1 if any regression was found against the baseline.
+    """
+
+    parser = argparse.ArgumentParser(
+        prog="benchmark", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("--counts", type=int, nargs="+", default=list(COUNTS))
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="a previous JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    # Imported here: the server needs moto[server], which only benchmarking uses.
+    from moto.server import ThreadedMotoServer
+
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "eu-west-2")
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=0, verbose=False)
+    server.start()
+    try:
+        host, port = server.get_host_and_port()
+        report = run_benchmarks(
+            f"http://{host}:{port}", args.counts, args.modes, args.workers
+        )
+    finally:
+        server.stop()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        regressions = compare(json.load(f), report, args.threshold)
+
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression['key']} {regression['metric']}: "
+            f"{regression['baseline']:.2f} -> {regression['current']:.2f} "
+            f"({regression['change']:+.0%})",
+            file=sys.stderr,
+        )
+
+    return 1 if regressions else 0
+
+
+def _run_mode(mode, names, workers, list_repeats):
+    if mode == "single":
+        yield "create", _timed_each(
+            lambda n: create_secret(n, "user", "password"), names
+        )
+        yield "get", _timed_each(get_secret, names)
+        yield "list", _timed_each(lambda _: list_secrets(), range(list_repeats))
+        yield "delete", _timed_each(
+            lambda n: delete_secret(n, force_delete=True), names
+        )
+
+    elif mode == "concurrent":
+        create = lambda n: create_secret(n, "user", "password")  # noqa: E731
+        yield "create", _timed_each(create, names, workers)
+        yield "get", _timed_each(get_secret, names, workers)
+        yield "list", _timed_each(
+            lambda _: list_secrets(), range(list_repeats), workers
+        )
+        yield "delete", _timed_each(
+            lambda n: delete_secret(n, force_delete=True), names, workers
+        )
+
+    elif mode == "batch":
+        rows = "".join(
+            f'{{"secret_identifier": "{n}", '
+            '"user_id": "user", "password": "password"}\n'
+            for n in names
+        )
+        yield "create", _timed_each(
+            lambda _: import_secrets(
+                io.StringIO(rows), fmt="jsonl", max_workers=workers
+            ),
+            [None],
+        )
+        chunks = [names[i : i + BATCH_SIZE] for i in range(0, len(names), BATCH_SIZE)]
+        yield "get", _timed_each(lambda chunk: get_secrets(chunk, 1), chunks)
+        yield "list", _timed_each(lambda _: list_secrets(), range(list_repeats))
+        yield "delete", _timed_each(
+            lambda _: delete_secrets(names, force_delete=True, max_workers=workers),
+            [None],
+        )
+
+    else:
+        raise ValueError(f"Unknown mode: {mode}. Expected one of {', '.join(MODES)}.")
+
+
+def _timed_each(func, items, workers=1):
+    def timed(item):
+        start = time.perf_counter()
+        func(item)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            samples = list(executor.map(timed, items))
+    else:
+        samples = [timed(item) for item in items]
+
+    return summarise(samples, time.perf_counter() - start)
+
+
+@contextlib.contextmanager
+def _endpoint(url):
+    # The client picks up the service-specific endpoint variable, so every
+    # operation talks to the server without taking an endpoint argument.
+    previous = os.environ.get(ENDPOINT_VARIABLE)
+    os.environ[ENDPOINT_VARIABLE] = url
+    reset_clients()
+    try:
+        yield
+    finally:
+        if previous is None:
+            del os.environ[ENDPOINT_VARIABLE]
+        else:
+            os.environ[ENDPOINT_VARIABLE] = previous
+        reset_clients()
+
+
+def _reset(endpoint):
+    request = urllib.request.Request(f"{endpoint}/moto-api/reset", method="POST")
+    with urllib.request.urlopen(request) as response:  # nosec B310 - local moto server
+        response.read()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,579 @@
+"""This module contains the command line entry point, with subcommands and a batch mode.
+
+With no subcommand the interactive `password_manager()` menu is started.
+Every subcommand prints one JSON line per result, so output can be piped
+straight into other tools.
+"""
+
+import argparse
+import contextlib
+import getpass
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from src import metrics
+from src.agent import (
+    AgentClient,
+    AgentError,
+    serve_agent,
+    DEFAULT_CACHE_TTL,
+    DEFAULT_IDLE_TIMEOUT,
+    DEFAULT_SOCKET_MODE,
+)
+from src.client import BACKEND_VARIABLE, BACKENDS, VAULT_VARIABLE
+from src.create_secret import create_secret
+from src.delete_secret import delete_secret
+from src.export_secrets import export_secrets, FORMATS, DEFAULT_MAX_WORKERS
+from src.get_secret import get_secret
+from src.inventory import scan_inventory
+from src.list_secrets import list_secrets
+from src.rotate_secrets import rotate_secrets, DEFAULT_ROTATIONS_PER_SECOND
+from src.snapshot import load_key, restore_snapshot, snapshot_secrets
+from src.sync_secrets import apply_sync, plan_sync, DIRECTIONS
+from src.upsert_secret import upsert_secret
+
+OPERATIONS = ("create", "upsert", "get", "delete", "list")
+
+
+def run_command(command: dict) -> dict:
+    """A function to run one create/upsert/get/delete/list command and describe it.
+
+    Args:
+        command (dict): an "op" of "create", "upsert", "get", "delete" or
+        "list" plus that operation's fields: "secret_id" for all but list,
+        "user_id" and "password" for create/upsert, and optionally
+        "recovery_window_in_days"/"force_delete" for delete and
+        "name_prefix"/"tags"/"description" for list.
+
+    Returns:
+        result (dict): the command's "op" and "secret_id", "ok", and either
+        "result" or the "error" class name and "message".
+    """
+
+    op = command.get("op")
+    secret_id = command.get("secret_id")
+    result = {"op": op}
+    if secret_id is not None:
+        result["secret_id"] = secret_id
+
+    try:
+        if op == "create":
+            value = create_secret(
+                secret_id or "",
+                command.get("user_id") or "",
+                command.get("password") or "",
+                binary=bool(command.get("binary", False)),
+            )
+        elif op == "upsert":
+            value = upsert_secret(
+                secret_id or "",
+                command.get("user_id") or "",
+                command.get("password") or "",
+            )
+        elif op == "get":
+            value = get_secret(secret_id or "")
+        elif op == "delete":
+            value = delete_secret(
+                secret_id or "",
+                recovery_window_in_days=command.get("recovery_window_in_days"),
+                force_delete=bool(command.get("force_delete", False)),
+            )
+        elif op == "list":
+            value = list_secrets(
+                name_prefix=command.get("name_prefix"),
+                tags=command.get("tags"),
+                description=command.get("description"),
+            )
+        else:
+            raise ValueError(
+                f"Unknown op: {op}. Expected one of {', '.join(OPERATIONS)}."
+            )
+
+    except Exception as e:
+        result["ok"] = False
+        result["error"] = type(e).__name__
+        result["message"] = str(e) if str(e) != "None" else None
+        return result
+
+    result["ok"] = True
+    result["result"] = value
+    return result
+
+
+def run_batch(stream, out, max_workers: int = 1) -> int:
+    """A function to run a stream of JSON-lines commands in one process.
+
+    Commands share the pooled client. With more than one worker they run
+    concurrently, with at most twice `max_workers` commands in flight;
+    results are still written in input order as soon as they are ready.
+
+    Args:
+        stream (TextIO): one JSON command per line, as taken by `run_command()`.
+        out (TextIO): where to write one JSON result per line.
+        max_workers (int): the maximum number of commands run at once.
+
+    Returns:
+        failures (int): the number of commands that did not succeed.
+    """
+
+    failures = 0
+
+    def emit(line_number, result):
+        nonlocal failures
+        result = {"line": line_number, **result}
+        if not result["ok"]:
+            failures += 1
+        out.write(json.dumps(result, default=str) + "\n")
+        out.flush()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+
+            try:
+                command = json.loads(line)
+                if not isinstance(command, dict):
+                    raise ValueError("command must be a JSON object")
+            except ValueError as e:
+                invalid = {"ok": False, "error": "InvalidCommand", "message": str(e)}
+                pending.append((line_number, None, invalid))
+            else:
+                future = executor.submit(run_command, command)
+                pending.append((line_number, future, None))
+
+            while pending and (
+                len(pending) >= max_workers * 2
+                or pending[0][1] is None
+                or pending[0][1].done()
+            ):
+                number, future, result = pending.popleft()
+                emit(number, result if future is None else future.result())
+
+        while pending:
+            number, future, result = pending.popleft()
+            emit(number, result if future is None else future.result())
+
+    return failures
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """A function to build the command line parser.
+
+    Returns:
+        parser (ArgumentParser): the parser for every option and subcommand.
+    """
+
+    parser = argparse.ArgumentParser(
+        prog="password_manager",
+        description="Manage user_names and passwords in AWS Secrets Manager.",
+    )
+    parser.add_argument(
+        "--prewarm",
+        action="store_true",
+        help="load boto3 and the AWS client in the background at startup",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        help=f"where secrets are stored; defaults to ${BACKEND_VARIABLE} or aws",
+    )
+    parser.add_argument(
+        "--vault",
+        metavar="PATH",
+        help=f"the local vault file; defaults to ${VAULT_VARIABLE}",
+    )
+    parser.add_argument(
+        "--agent",
+        nargs="?",
+        const="",
+        metavar="SOCKET",
+        help="send create/upsert/get/delete/list to a running agent; "
+        "the socket defaults to $PASSWORD_MANAGER_AGENT_SOCKET",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        metavar="PATH",
+        help="write Prometheus text-format metrics to PATH on exit",
+    )
+    parser.add_argument(
+        "--metrics-log",
+        action="store_true",
+        help="log every metric as a JSON line on stderr",
+    )
+    parser.add_argument(
+        "--import-profile",
+        action="store_true",
+        help="report where startup time goes and exit",
+    )
+
+    subparsers = parser.add_subparsers(dest="command")
+
+    create = subparsers.add_parser("create", help="store a new secret")
+    create.add_argument("secret_id")
+    create.add_argument("user_id")
+    password = create.add_mutually_exclusive_group()
+    password.add_argument(
+        "--password",
+        help="deprecated: visible to other users in the process list; "
+        "without --password-stdin the password is prompted for",
+    )
+    password.add_argument(
+        "--password-stdin",
+        action="store_true",
+        help="read the password from the first line of stdin",
+    )
+    create.add_argument("--binary", action="store_true", help="store as SecretBinary")
+
+    upsert = subparsers.add_parser(
+        "upsert", help="store a secret, creating it or adding a new version"
+    )
+    upsert.add_argument("secret_id")
+    upsert.add_argument("user_id")
+    password = upsert.add_mutually_exclusive_group()
+    password.add_argument(
+        "--password",
+        help="deprecated: visible to other users in the process list; "
+        "without --password-stdin the password is prompted for",
+    )
+    password.add_argument(
+        "--password-stdin",
+        action="store_true",
+        help="read the password from the first line of stdin",
+    )
+
+    get = subparsers.add_parser("get", help="print a secret")
+    get.add_argument("secret_id")
+
+    delete = subparsers.add_parser("delete", help="delete a secret")
+    delete.add_argument("secret_id")
+    delete.add_argument("--recovery-days", type=int, dest="recovery_window_in_days")
+    delete.add_argument("--force", action="store_true", dest="force_delete")
+
+    listing = subparsers.add_parser("list", help="list secret names")
+    listing.add_argument("--prefix", dest="name_prefix")
+    listing.add_argument("--description")
+    listing.add_argument(
+        "--tag",
+        action="append",
+        default=[],
+        metavar="KEY[=VALUE]",
+        help="only list secrets with this tag; may be repeated",
+    )
+
+    batch = subparsers.add_parser(
+        "batch", help="run JSON-lines commands from a file or stdin"
+    )
+    batch.add_argument("file", nargs="?", default="-", help="defaults to stdin")
+    batch.add_argument("--workers", type=int, default=1)
+
+    export = subparsers.add_parser(
+        "export", help="write secrets to a directory, JSON-lines file or tar"
+    )
+    export.add_argument("target", help="a directory, or a file for jsonl and tar")
+    export.add_argument("secret_ids", nargs="*", help="defaults to every secret")
+    export.add_argument("--format", choices=FORMATS, default="dir", dest="fmt")
+    export.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS)
+
+    rotate = subparsers.add_parser(
+        "rotate", help="give the selected secrets new random passwords"
+    )
+    rotate.add_argument("secret_ids", nargs="*")
+    rotate.add_argument("--prefix", dest="name_prefix")
+    rotate.add_argument(
+        "--tag",
+        action="append",
+        default=[],
+        metavar="KEY[=VALUE]",
+        help="rotate secrets with this tag; may be repeated",
+    )
+    rotate.add_argument("--journal", help="a checkpoint file to resume from")
+    rotate.add_argument("--workers", type=int, default=8)
+    rotate.add_argument(
+        "--rate",
+        type=float,
+        default=DEFAULT_ROTATIONS_PER_SECOND,
+        help="the most rotations started per second",
+    )
+
+    snapshot = subparsers.add_parser(
+        "snapshot", help="back up secrets to one encrypted, compressed file"
+    )
+    snapshot.add_argument("path")
+    snapshot.add_argument("secret_ids", nargs="*", help="defaults to every secret")
+    snapshot.add_argument(
+        "--key-file",
+        help="used, or created, when $PASSWORD_MANAGER_SNAPSHOT_KEY is unset",
+    )
+    snapshot.add_argument("--workers", type=int, default=8)
+    snapshot.add_argument(
+        "--restart", action="store_true", help="discard an interrupted snapshot"
+    )
+
+    restore = subparsers.add_parser(
+        "restore", help="write back the secrets in a snapshot that have changed"
+    )
+    restore.add_argument("path")
+    restore.add_argument("--key-file")
+    restore.add_argument("--workers", type=int, default=8)
+    restore.add_argument(
+        "--restart",
+        action="store_true",
+        help="replay frames an interrupted restore finished",
+    )
+
+    sync = subparsers.add_parser(
+        "sync", help="show, then make, the changes between a directory and the store"
+    )
+    sync.add_argument("directory", help="a directory in the export dir format")
+    sync.add_argument("--direction", choices=DIRECTIONS, default="push")
+    sync.add_argument("--prefix", default="", dest="name_prefix")
+    sync.add_argument(
+        "--delete", action="store_true", help="also delete what the source side lacks"
+    )
+    sync.add_argument(
+        "--allow-empty",
+        action="store_true",
+        help="let --delete push from a directory with no secrets in it",
+    )
+    sync.add_argument(
+        "--apply",
+        action="store_true",
+        help="make the changes rather than only list them",
+    )
+    sync.add_argument("--workers", type=int, default=8)
+
+    agent = subparsers.add_parser(
+        "agent", help="serve secrets to other processes over a Unix socket"
+    )
+    agent.add_argument("--socket", help="defaults to $PASSWORD_MANAGER_AGENT_SOCKET")
+    agent.add_argument(
+        "--mode",
+        type=lambda value: int(value, 8),
+        default=DEFAULT_SOCKET_MODE,
+        help="the socket's octal permissions (default: 600)",
+    )
+    agent.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=DEFAULT_IDLE_TIMEOUT,
+        help="exit after this many seconds without a request; 0 to never",
+    )
+    agent.add_argument("--cache-ttl", type=float, default=DEFAULT_CACHE_TTL)
+
+    inventory = subparsers.add_parser(
+        "inventory", help="print the metadata of every secret, scanning in parallel"
+    )
+    inventory.add_argument("--prefix", default="", dest="name_prefix")
+    inventory.add_argument("--describe", action="store_true")
+    inventory.add_argument("--workers", type=int, default=8)
+
+    return parser
+
+
+def main(argv: list = None) -> int:
+    """A function to run the command line interface.
+
+    Args:
+        argv (list): the command line arguments, defaulting to sys.argv[1:].
+
+    Returns:
+        exit_code (int): 0 on success, 1 if any command failed.
+    """
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.agent is not None and args.command not in OPERATIONS:
+        parser.error(f"--agent only applies to {', '.join(OPERATIONS)}")
+
+    if args.import_profile:
+        from src.startup import print_startup_profile
+
+        print_startup_profile()
+        return 0
+
+    # Set for the whole process, so the interactive menu uses them too.
+    if args.backend:
+        os.environ[BACKEND_VARIABLE] = args.backend
+    if args.vault:
+        os.environ[VAULT_VARIABLE] = args.vault
+
+    sinks = []
+    if args.metrics_file:
+        sinks.append(metrics.PrometheusTextfileSink(args.metrics_file))
+    if args.metrics_log:
+        sinks.append(metrics.JsonLogSink(sys.stderr))
+    if sinks:
+        metrics.enable(*sinks)
+
+    if args.command is None:
+        from src.password_manager import password_manager
+
+        password_manager(prewarm=args.prewarm)
+        return 0
+
+    # The operations print diagnostics as they fail; keep them out of the
+    # JSON-lines output.
+    out = sys.stdout
+
+    if args.command == "batch":
+        with contextlib.redirect_stdout(sys.stderr):
+            if args.file == "-":
+                failures = run_batch(sys.stdin, out, args.workers)
+            else:
+                with open(args.file, "r", encoding="utf-8") as f:
+                    failures = run_batch(f, out, args.workers)
+        return 1 if failures else 0
+
+    if args.command == "export":
+        with contextlib.redirect_stdout(sys.stderr):
+            summary = export_secrets(
+                args.target,
+                secret_ids=args.secret_ids or None,
+                fmt=args.fmt,
+                max_workers=args.workers,
+            )
+        out.write(json.dumps(summary) + "\n")
+        return 1 if summary["errors"] else 0
+
+    if args.command == "rotate":
+        tags = dict(tag.partition("=")[::2] for tag in args.tag)
+        with contextlib.redirect_stdout(sys.stderr):
+            results = rotate_secrets(
+                secret_ids=args.secret_ids,
+                name_prefix=args.name_prefix,
+                tags={key: value or None for key, value in tags.items()} or None,
+                journal=args.journal,
+                max_workers=args.workers,
+                rotations_per_second=args.rate,
+            )
+        for secret_id, status in results.items():
+            out.write(json.dumps({"secret_id": secret_id, "status": status}) + "\n")
+        return 1 if "failed" in results.values() else 0
+
+    if args.command in ("snapshot", "restore"):
+        with contextlib.redirect_stdout(sys.stderr):
+            key = load_key(key_file=args.key_file, create=args.command == "snapshot")
+            if args.command == "snapshot":
+                summary = snapshot_secrets(
+                    args.path,
+                    key,
+                    secret_ids=args.secret_ids or None,
+                    max_workers=args.workers,
+                    resume=not args.restart,
+                )
+            else:
+                summary = restore_snapshot(
+                    args.path, key, max_workers=args.workers, resume=not args.restart
+                )
+        out.write(json.dumps(summary) + "\n")
+        return 1 if summary["errors"] else 0
+
+    if args.command == "sync":
+        with contextlib.redirect_stdout(sys.stderr):
+            try:
+                plan = plan_sync(
+                    args.directory,
+                    direction=args.direction,
+                    name_prefix=args.name_prefix,
+                    delete=args.delete,
+                    max_workers=args.workers,
+                    allow_empty=args.allow_empty,
+                )
+            except (FileNotFoundError, ValueError) as e:
+                parser.error(str(e))
+            for action, secret_id in plan.changes():
+                out.write(json.dumps({"action": action, "secret_id": secret_id}) + "\n")
+            summary = (
+                apply_sync(plan, max_workers=args.workers)
+                if args.apply
+                else plan.as_dict()
+            )
+        out.write(json.dumps(summary) + "\n")
+        return 1 if summary["errors"] else 0
+
+    if args.command == "agent":
+
+        def ready(path):
+            out.write(json.dumps({"socket": path, "pid": os.getpid()}) + "\n")
+            out.flush()
+
+        with contextlib.redirect_stdout(sys.stderr):
+            serve_agent(
+                args.socket,
+                mode=args.mode,
+                idle_timeout=args.idle_timeout,
+                cache_ttl=args.cache_ttl,
+                ready=ready,
+            )
+        return 0
+
+    if args.command == "inventory":
+        with contextlib.redirect_stdout(sys.stderr):
+            records = scan_inventory(
+                args.name_prefix,
+                max_workers=args.workers,
+                describe=args.describe,
+                describe_workers=args.workers,
+            )
+            for record in records:
+                out.write(json.dumps(record.as_dict(), default=str) + "\n")
+        return 0
+
+    command = {"op": args.command}
+
+    if args.command in ("create", "upsert", "get", "delete"):
+        command["secret_id"] = args.secret_id
+
+    if args.command in ("create", "upsert"):
+        command["user_id"] = args.user_id
+        command["password"] = _read_password(args)
+
+    if args.command == "create":
+        command["binary"] = args.binary
+
+    elif args.command == "delete":
+        command["recovery_window_in_days"] = args.recovery_window_in_days
+        command["force_delete"] = args.force_delete
+
+    elif args.command == "list":
+        command["name_prefix"] = args.name_prefix
+        command["description"] = args.description
+        tags = dict(tag.partition("=")[::2] for tag in args.tag)
+        command["tags"] = {key: value or None for key, value in tags.items()} or None
+
+    with contextlib.redirect_stdout(sys.stderr):
+        if args.agent is not None:
+            try:
+                result = AgentClient(args.agent or None).call(command)
+            except AgentError as e:
+                result = {"op": command["op"], "ok": False, "error": "AgentError"}
+                result["message"] = f"{e.error} connecting to the agent"
+        else:
+            result = run_command(command)
+    out.write(json.dumps(result, default=str) + "\n")
+
+    return 0 if result["ok"] else 1
+
+
+def _read_password(args):
+    if args.password_stdin:
+        return sys.stdin.readline().rstrip("\n")
+    if args.password is not None:
+        print(
+            "Warning: --password is visible to other users in the process list; "
+            "use --password-stdin instead.",
+            file=sys.stderr,
+        )
+        return args.password
+    return getpass.getpass("Password: ")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""This module contains the shared, pooled AWS Secrets Manager client factory.
+
+The backend is chosen by the PASSWORD_MANAGER_BACKEND environment variable:
+"aws" (the default) for AWS Secrets Manager, or "local" for a
+`local_vault.LocalVault` at PASSWORD_MANAGER_VAULT.
+"""
+
+import os
+import threading
+import time
+
+from src import metrics
+
+DEFAULT_MAX_POOL_CONNECTIONS = 10
+DEFAULT_CONNECT_TIMEOUT = 60
+DEFAULT_READ_TIMEOUT = 60
+
+BACKEND_VARIABLE = "PASSWORD_MANAGER_BACKEND"
+VAULT_VARIABLE = "PASSWORD_MANAGER_VAULT"
+BACKENDS = ("aws", "local")
+
+_lock = threading.Lock()
+_clients = {}
+_settings = {
+    "max_pool_connections": DEFAULT_MAX_POOL_CONNECTIONS,
+    "connect_timeout": DEFAULT_CONNECT_TIMEOUT,
+    "read_timeout": DEFAULT_READ_TIMEOUT,
+}
+
+
+def get_client(region_name: str = None, profile_name: str = None):
+    """A function to return a shared secretsmanager client, creating it on first use.
+
+    One client is kept per (region_name, profile_name) pair. botocore clients
+    are thread-safe, so concurrent callers share the client and its
+    connection pool. Clients without a profile are built from boto3's
+    default session and are recreated if that session is replaced.
+
+    With the "local" backend the shared `LocalVault` is returned instead,
+    whatever the region and profile.
+
+    Args:
+        region_name (str): the AWS region, or None for the ambient default.
+        profile_name (str): the AWS profile, or None for the default session.
+
+    Returns:
+        client: a boto3 secretsmanager client, or a LocalVault.
+
+    Raises:
+        ValueError: if PASSWORD_MANAGER_BACKEND is not a known backend.
+    """
+
+    backend = os.environ.get(BACKEND_VARIABLE)
+    if backend and backend != "aws":
+        return _get_vault(backend)
+
+    key = (region_name, profile_name)
+
+    entry = _clients.get(key)
+    if entry is not None and _is_current(entry[0], profile_name):
+        return entry[1]
+
+    with _lock:
+        entry = _clients.get(key)
+        if entry is None or not _is_current(entry[0], profile_name):
+            entry = _create_client(region_name, profile_name)
+            _clients[key] = entry
+
+    return entry[1]
+
+
+def configure_clients(
+    max_pool_connections: int = None,
+    connect_timeout: float = None,
+    read_timeout: float = None,
+):
+    """A function to set the connection pool size and timeouts for new clients.
+
+    Clients that have already been created are discarded so the next call to
+    `get_client()` picks up the new settings.
+
+    Args:
+        max_pool_connections (int): maximum connections kept in each client's pool.
+        connect_timeout (float): seconds to wait when opening a connection.
+        read_timeout (float): seconds to wait when reading a response.
+
+    Raises:
+        ValueError: if any setting is not a positive number.
+    """
+
+    updates = {
+        "max_pool_connections": max_pool_connections,
+        "connect_timeout": connect_timeout,
+        "read_timeout": read_timeout,
+    }
+
+    for name, value in updates.items():
+        if value is not None and value <= 0:
+            raise ValueError(f"{name} must be a positive number.")
+
+    with _lock:
+        for name, value in updates.items():
+            if value is not None:
+                _settings[name] = value
+        _clients.clear()
+
+
+def reset_clients():
+    """A function to discard every cached client."""
+
+    with _lock:
+        _clients.clear()
+
+
+def prewarm(region_name: str = None, profile_name: str = None) -> threading.Thread:
+    """A function to import boto3 and create a client on a background thread.
+
+    Callers such as the interactive CLI can start this while waiting for
+    user input, so the first operation does not pay for loading boto3,
+    the service model and credentials.
+
+    Args:
+        region_name (str): the AWS region, or None for the ambient default.
+        profile_name (str): the AWS profile, or None for the default session.
+
+    Returns:
+        thread (Thread): the started daemon thread.
+    """
+
+    def warm():
+        try:
+            get_client(region_name, profile_name)
+        except Exception:
+            # Any real problem is raised again by the first operation.
+            pass
+
+    thread = threading.Thread(target=warm, name="client-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+def _get_vault(backend):
+    if backend not in BACKENDS:
+        raise ValueError(f"{BACKEND_VARIABLE} must be one of {', '.join(BACKENDS)}.")
+
+    from src.local_vault import DEFAULT_VAULT_PATH
+
+    path = os.path.abspath(
+        os.path.expanduser(os.environ.get(VAULT_VARIABLE) or DEFAULT_VAULT_PATH)
+    )
+    key = (backend, path)
+
+    entry = _clients.get(key)
+    if entry is None:
+        with _lock:
+            entry = _clients.get(key)
+            if entry is None:
+                from src.local_vault import LocalVault
+
+                entry = _clients[key] = (None, LocalVault(path))
+
+    return entry[1]
+
+
+def _is_current(session, profile_name):
+    # Clients for the default profile follow boto3's default session, so a
+    # call to boto3.setup_default_session() is honoured on the next lookup.
+    if profile_name is not None:
+        return True
+
+    import boto3
+
+    return session is boto3.DEFAULT_SESSION
+
+
+def _create_client(region_name, profile_name):
+    # boto3 is imported on first use so that importing this package, and
+    # starting the CLI, does not pay for loading it.
+    start = time.perf_counter()
+
+    import boto3
+    from botocore.config import Config
+
+    config = Config(
+        max_pool_connections=_settings["max_pool_connections"],
+        connect_timeout=_settings["connect_timeout"],
+        read_timeout=_settings["read_timeout"],
+        # Retries are handled by src.rate_limit, which shares backoff and
+        # throttle state between threads; botocore's own would double them.
+        retries={"total_max_attempts": 1},
+    )
+
+    if profile_name is None:
+        if boto3.DEFAULT_SESSION is None:
+            boto3.setup_default_session()
+        session = boto3.DEFAULT_SESSION
+    else:
+        session = boto3.session.Session(profile_name=profile_name)
+
+    client = session.client("secretsmanager", region_name=region_name, config=config)
+
+    # Covers importing boto3, loading the service model and resolving
+    # credentials, none of which the per-request timings see.
+    metrics.observe("client_setup_seconds", time.perf_counter() - start)
+    metrics.instrument_client(client)
+
+    return session, client
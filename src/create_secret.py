@@ -1,17 +1,34 @@
 """This module contains the definition for `create_secret()`."""
 
-import re
-
-import boto3
-
-
-def create_secret(secret_identifier: str, user_id: str, password: str):
+from src import events, metrics, rate_limit
+from src.client import get_client
+from src.secret_codec import encode_secret, encode_secret_binary
+from src.validation import validate_secret, validate_secret_size
+
+# Re-exported so that existing `from src.create_secret import ...` keeps working.
+from src.validation import BlankArgumentError, InvalidCharacterError  # noqa: F401
+
+
+@metrics.instrument("create_secret")
+def create_secret(
+    secret_identifier: str,
+    user_id: str,
+    password: str,
+    binary: bool = False,
+    replica_regions: list = None,
+):
     """A function to create and store a new secret in AWS Secret Manager
 
+    The user_id and password are stored as a JSON SecretString, or as a
+    compressed, versioned SecretBinary when binary is set.
+
     Args:
         secret_identifier (str): the name of the secret.
         user_id (str): user_id to be saved.
         password (str): password to be saved.
+        binary (bool): whether to store the secret as SecretBinary.
+        replica_regions (list): regions to replicate the secret to, for
+        reading with `replicas.ReplicaRouter`.
 
     Returns:
         status_code (int): the http status code from the request response.
@@ -23,44 +40,37 @@ def create_secret(secret_identifier: str, user_id: str, password: str):
         argument.
         InvalidCharacterError: if secret_identifier contains any invalid
         characters.
+        NameTooLongError: if secret_identifier is over 512 characters.
+        SecretTooLargeError: if the stored value would be over 64KB.
     """
 
-    if len(secret_identifier) == 0 or len(user_id) == 0 or len(password) == 0:
-        raise BlankArgumentError(
-            print("BlankArgumentError: arguments cannot be blank.")
-        )
-
-    regex = r"[a-z]|[A-Z]|[0-9]|\/|_|\+|=|\.|@|-"
+    validate_secret(secret_identifier, user_id, password)
 
-    regex_list = re.findall(regex, secret_identifier)
+    if binary:
+        value = {"SecretBinary": encode_secret_binary(user_id, password)}
+        validate_secret_size(value["SecretBinary"])
+    else:
+        value = {"SecretString": encode_secret(user_id, password)}
 
-    if len(regex_list) != len(secret_identifier):
-        raise InvalidCharacterError(
-            print(
-                "InvalidCharacterError: secret_identity can only contain ASCII letters, numbers and the following characters: /_+=.@-"
-            )
-        )
+    if replica_regions:
+        value["AddReplicaRegions"] = [{"Region": region} for region in replica_regions]
 
-    sm = boto3.client("secretsmanager")
+    sm = get_client()
 
     try:
-        response = sm.create_secret(
+        response = rate_limit.call(
+            "CreateSecret",
+            sm.create_secret,
             Name=secret_identifier,
-            SecretString=f"{{'user_id':{user_id}, 'password':{password}}}",
+            **value,
         )
 
         status_code = response["ResponseMetadata"]["HTTPStatusCode"]
 
+        events.notify(events.CREATED, secret_identifier)
+
         return status_code
 
     except sm.exceptions.ResourceExistsException as r:
         print(f"ResourceExistsException: {secret_identifier} already exists.")
         raise r
-
-
-class BlankArgumentError(Exception):
-    """Traps errors where blank arguments are passed."""
-
-
-class InvalidCharacterError(Exception):
-    """Traps errors where invalid characters are used in secret_identifier."""
@@ -1,13 +1,26 @@
 """This module contains the definition for `delete_secret()`."""
 
-import boto3
+from src import events, metrics, rate_limit
+from src.client import get_client
+from src.validation import validate_secret_id
 
+# Re-exported so that existing `from src.delete_secret import ...` keeps working.
+from src.validation import BlankArgumentError  # noqa: F401
 
-def delete_secret(secret_id: str):
+
+@metrics.instrument("delete_secret")
+def delete_secret(
+    secret_id: str,
+    recovery_window_in_days: int = None,
+    force_delete: bool = False,
+):
     """A function to delete a specified secret from AWS Secret Manager.
 
     Args:
         secret_id (str): string of the name of the secret to be deleted
+        recovery_window_in_days (int): days (7-30) the secret can be restored
+        for. Defaults to the AWS default of 30 days.
+        force_delete (bool): delete immediately, with no recovery window.
 
     Returns:
         status_code (int): the http status code from the request response.
@@ -15,29 +28,37 @@ def delete_secret(secret_id: str):
     Raises:
         ResourceNotFoundError: if no resource with the given secret_id is found.
         BlankArgumentError: if passed a blank secret_id.
+        ValueError: if passed both a recovery window and force_delete.
 
     """
 
-    if len(secret_id) == 0:
-        raise BlankArgumentError(
-            print("BlankArgumentError: secret_id cannot be blank.")
-        )
+    validate_secret_id(secret_id)
+
+    if recovery_window_in_days is not None and force_delete:
+        raise ValueError("recovery_window_in_days cannot be used with force_delete.")
+
+    kwargs = {}
+    if recovery_window_in_days is not None:
+        kwargs["RecoveryWindowInDays"] = recovery_window_in_days
+    if force_delete:
+        kwargs["ForceDeleteWithoutRecovery"] = True
 
-    sm = boto3.client("secretsmanager")
+    sm = get_client()
 
     try:
-        response = sm.delete_secret(
+        response = rate_limit.call(
+            "DeleteSecret",
+            sm.delete_secret,
             SecretId=secret_id,
+            **kwargs,
         )
 
         status_code = response["ResponseMetadata"]["HTTPStatusCode"]
 
+        events.notify(events.DELETED, secret_id)
+
         return status_code
 
     except sm.exceptions.ResourceNotFoundException as r:
         print(f"ResourceNotFound: {secret_id}.")
         raise r
-
-
-class BlankArgumentError(Exception):
-    """Traps errors where blank arguments are passed."""
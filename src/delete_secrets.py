@@ -0,0 +1,134 @@
+"""This module contains the definitions for `select_secrets()` and `delete_secrets()`.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatchcase
+
+from src.client import get_client
+from src.delete_secret import delete_secret
+from src.list_secrets import iter_secrets
+
+DELETED = "deleted"
+NOT_FOUND = "not found"
+FAILED = "failed"
+WOULD_DELETE = "would delete"
+
+DEFAULT_MAX_WORKERS = 8
+
+_GLOB_CHARACTERS = "*?["
+
+
+def select_secrets(
+    secret_ids: list = None, name_prefix: str = None, pattern: str = None
+) -> list:
+    """A function to resolve ids, a name prefix and/or a glob pattern into secret names.
+
+    Explicit ids are used as given. Prefixes and patterns are resolved
+    against the paginated listing; a pattern's literal leading characters
+    are sent to the API as a name-prefix filter so only candidate pages are
+    fetched.
+
+    Args:
+        secret_ids (list): secret names to include as given.
+        name_prefix (str): include every secret whose name starts with this.
+        pattern (str): include every secret whose name matches this glob,
+        e.g. "test/*/db".
+
+    Returns:
+        secret_list (list): the selected secret names, without duplicates.
+
+    Raises:
+        ValueError: if no selector is passed, or name_prefix starts with "!".
+    """
+
+    if not secret_ids and not name_prefix and not pattern:
+        raise ValueError("Specify secret_ids, name_prefix or pattern.")
+
+    selected = dict.fromkeys(secret_ids or [])
+
+    if name_prefix:
+        selected.update(dict.fromkeys(iter_secrets(name_prefix=name_prefix)))
+
+    if pattern:
+        literal_prefix = _literal_prefix(pattern)
+        # The listing rejects a leading "!", which the API reads as "not".
+        if literal_prefix.startswith("!"):
+            literal_prefix = ""
+        selected.update(
+            dict.fromkeys(
+                name
+                for name in iter_secrets(name_prefix=literal_prefix or None)
+                if fnmatchcase(name, pattern)
+            )
+        )
+
+    return list(selected)
+
+
+def delete_secrets(
+    secret_ids: list = None,
+    name_prefix: str = None,
+    pattern: str = None,
+    recovery_window_in_days: int = None,
+    force_delete: bool = False,
+    dry_run: bool = False,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> dict:
+    """A function to delete many secrets from AWS Secret Manager concurrently.
+
+    Targets are chosen as in `select_secrets()` and deleted by a bounded
+    thread pool. A secret that cannot be deleted does not stop the others.
+
+    Args:
+        secret_ids (list): secret names to delete.
+        name_prefix (str): delete every secret whose name starts with this.
+        pattern (str): delete every secret whose name matches this glob.
+        recovery_window_in_days (int): days (7-30) the secrets can be restored for.
+        force_delete (bool): delete immediately, with no recovery window.
+        dry_run (bool): print what would be deleted without deleting anything.
+        max_workers (int): the maximum number of deletions in flight at once.
+
+    Returns:
+        results (dict): a mapping of secret name to "deleted", "not found",
+        "failed" or, for a dry run, "would delete".
+
+    Raises:
+        ValueError: if no selector is passed, or if passed both a recovery
+        window and force_delete.
+    """
+
+    if recovery_window_in_days is not None and force_delete:
+        raise ValueError("recovery_window_in_days cannot be used with force_delete.")
+
+    targets = select_secrets(secret_ids, name_prefix, pattern)
+
+    if dry_run:
+        for secret_id in targets:
+            print(f"Would delete: {secret_id}")
+        return {secret_id: WOULD_DELETE for secret_id in targets}
+
+    def delete(secret_id):
+        try:
+            delete_secret(
+                secret_id,
+                recovery_window_in_days=recovery_window_in_days,
+                force_delete=force_delete,
+            )
+            return DELETED
+        except get_client().exceptions.ResourceNotFoundException:
+            return NOT_FOUND
+        except Exception:
+            return FAILED
+
+    if not targets:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(targets))) as executor:
+        return dict(zip(targets, executor.map(delete, targets)))
+
+
+def _literal_prefix(pattern):
+    for i, character in enumerate(pattern):
+        if character in _GLOB_CHARACTERS:
+            return pattern[:i]
+    return pattern
@@ -0,0 +1,73 @@
+"""This module contains the change notifications published by the secret operations."""
+
+import threading
+import weakref
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+
+_lock = threading.Lock()
+_listeners = []
+
+
+def subscribe(listener):
+    """A function to register a callable to be told about changes to secrets.
+
+    Bound methods are held weakly, so an object that subscribes one of its
+    own methods does not have its lifetime extended by the subscription.
+
+    Args:
+        listener (callable): called as listener(action, secret_id), where
+        action is one of CREATED, UPDATED or DELETED.
+    """
+
+    if hasattr(listener, "__self__"):
+        ref = weakref.WeakMethod(listener)
+    else:
+        ref = _StrongRef(listener)
+
+    with _lock:
+        _listeners.append(ref)
+
+
+def unsubscribe(listener):
+    """A function to stop a previously subscribed callable being notified.
+
+    Args:
+        listener (callable): the callable passed to `subscribe()`.
+    """
+
+    with _lock:
+        _listeners[:] = [ref for ref in _listeners if ref() not in (None, listener)]
+
+
+def notify(action: str, secret_id: str):
+    """A function to tell every subscribed listener that a secret has changed.
+
+    Args:
+        action (str): one of CREATED, UPDATED or DELETED.
+        secret_id (str): the name of the secret that changed.
+    """
+
+    with _lock:
+        listeners = [ref() for ref in _listeners]
+        _listeners[:] = [
+            ref for ref, listener in zip(_listeners, listeners) if listener is not None
+        ]
+
+    for listener in listeners:
+        if listener is not None:
+            listener(action, secret_id)
+
+
+class _StrongRef:
+    """Gives plain functions the same call interface as a weak reference."""
+
+    __slots__ = ("_obj",)
+
+    def __init__(self, obj):
+        self._obj = obj
+
+    def __call__(self):
+        return self._obj
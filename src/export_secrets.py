@@ -0,0 +1,272 @@
+"""This module contains the definition for `export_secrets()`.
+
+`export_secrets()` streams retrieved secrets to disk.
+"""
+
+import io
+import json
+import os
+import tarfile
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import quote, unquote
+
+from src.get_secrets import get_secrets, BATCH_SIZE
+from src.list_secrets import iter_secrets
+
+FORMATS = ("dir", "jsonl", "tar")
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_FSYNC_BATCH = 64
+
+FILE_MODE = 0o600
+
+_SAFE_CHARACTERS = "_+=.@-"
+
+
+def secret_filename(secret_id: str) -> str:
+    """A function to map a secret id to a single, safe file name.
+
+    Slashes (and anything else outside the characters `create_secret()`
+    allows) are percent-encoded, so ids such as "prod/db" cannot escape the
+    target directory. The mapping is reversible with `secret_id_from_filename()`.
+
+    Args:
+        secret_id (str): the name of the secret.
+
+    Returns:
+        filename (str): e.g. "prod%2Fdb.txt".
+    """
+
+    name = quote(secret_id, safe=_SAFE_CHARACTERS)
+    if name.strip(".") == "":
+        name = name.replace(".", "%2E")
+    return f"{name}.txt"
+
+
+def secret_id_from_filename(filename: str) -> str:
+    """A function to recover the secret id from a `secret_filename()` name."""
+
+    return unquote(filename[: -len(".txt")] if filename.endswith(".txt") else filename)
+
+
+def write_secret_file(directory: str, secret_id: str, secret_string: str) -> str:
+    """A function to write one secret atomically, with owner-only permissions.
+
+    Args:
+        directory (str): the directory to write into.
+        secret_id (str): the name of the secret, mapped with `secret_filename()`.
+        secret_string (str): the string to be saved.
+
+    Returns:
+        path (str): the path of the written file.
+    """
+
+    with _DirectoryWriter(directory, fsync_batch=1) as writer:
+        return writer.write(secret_id, secret_string)
+
+
+def export_secrets(
+    target: str,
+    secret_ids: list = None,
+    fmt: str = "dir",
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    fsync_batch: int = DEFAULT_FSYNC_BATCH,
+) -> dict:
+    """A function to fetch many secrets concurrently and stream them to disk.
+
+    Secrets are fetched in BatchGetSecretValue chunks by a bounded worker
+    pool, and each chunk is written as soon as it arrives, so disk writes
+    overlap the fetches still in flight and at most 2 * max_workers chunks
+    are held in memory.
+
+    Every file is created with 0600 permissions and only appears under its
+    final name once complete. In "dir" format each secret becomes its own
+    file, with fsyncs grouped `fsync_batch` files at a time followed by one
+    fsync of the directory.
+
+    Args:
+        target (str): the directory ("dir") or file ("jsonl", "tar") to write.
+        secret_ids (list): the secrets to export. Defaults to every secret.
+        fmt (str): "dir", "jsonl" (one {"secret_id", "secret_string"} per
+        line) or "tar" (a streamed tar of secret_filename() members).
+        max_workers (int): the maximum number of chunks fetched at once.
+        fsync_batch (int): how many files to write between fsyncs in "dir" format.
+
+    Returns:
+        summary (dict): the number of secrets "exported" and an "errors"
+        mapping of secret id to error code.
+
+    Raises:
+        ValueError: if fmt is not one of FORMATS.
+    """
+
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}.")
+
+    ids = iter_secrets() if secret_ids is None else iter(secret_ids)
+
+    if fmt == "dir":
+        writer = _DirectoryWriter(target, fsync_batch)
+    elif fmt == "jsonl":
+        writer = _JsonLinesWriter(target)
+    else:
+        writer = _TarWriter(target)
+
+    summary = {"exported": 0, "errors": {}}
+
+    with writer, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = set()
+
+        def drain(futures):
+            for future in futures:
+                secrets, errors = future.result()
+                for secret_id, secret_string in secrets.items():
+                    writer.write(secret_id, secret_string)
+                summary["exported"] += len(secrets)
+                for secret_id, error in errors.items():
+                    summary["errors"][secret_id] = error["ErrorCode"]
+
+        for chunk in _chunks(ids, BATCH_SIZE):
+            if len(in_flight) >= max_workers * 2:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                drain(done)
+            in_flight.add(executor.submit(get_secrets, chunk, 1))
+
+        drain(wait(in_flight).done)
+
+    return summary
+
+
+def _chunks(ids, size):
+    chunk = []
+    for secret_id in ids:
+        chunk.append(secret_id)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _temporary_file(directory):
+    fd, path = tempfile.mkstemp(dir=directory, prefix=".export-", suffix=".tmp")
+    os.fchmod(fd, FILE_MODE)
+    return fd, path
+
+
+def _fsync_directory(directory):
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class _DirectoryWriter:
+    """Writes one file per secret, renaming each into place after a grouped fsync."""
+
+    def __init__(self, directory, fsync_batch):
+        self.directory = directory
+        self.fsync_batch = max(1, fsync_batch)
+        self._pending = []
+
+    def __enter__(self):
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        return self
+
+    def write(self, secret_id, secret_string):
+        fd, temp_path = _temporary_file(self.directory)
+        final_path = os.path.join(self.directory, secret_filename(secret_id))
+
+        try:
+            os.write(fd, secret_string.encode("utf-8"))
+        except BaseException:
+            os.close(fd)
+            os.unlink(temp_path)
+            raise
+
+        self._pending.append((fd, temp_path, final_path))
+        if len(self._pending) >= self.fsync_batch:
+            self._flush()
+
+        return final_path
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self._flush()
+        else:
+            for fd, temp_path, _ in self._pending:
+                os.close(fd)
+                os.unlink(temp_path)
+            self._pending = []
+
+    def _flush(self):
+        if not self._pending:
+            return
+
+        for fd, temp_path, final_path in self._pending:
+            os.fsync(fd)
+            os.close(fd)
+            os.replace(temp_path, final_path)
+
+        self._pending = []
+        _fsync_directory(self.directory)
+
+
+class _SingleFileWriter:
+    """Writes to a temporary file beside the target, renamed into place on success."""
+
+    def __init__(self, path):
+        self.path = path
+        self.directory = os.path.dirname(os.path.abspath(path))
+
+    def __enter__(self):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, self._temp_path = _temporary_file(self.directory)
+        self._file = os.fdopen(fd, "wb")
+        self._open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self._close()
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        finally:
+            self._file.close()
+
+        if exc_type is None:
+            os.replace(self._temp_path, self.path)
+            _fsync_directory(self.directory)
+        else:
+            os.unlink(self._temp_path)
+
+    def _open(self):
+        pass
+
+    def _close(self):
+        pass
+
+
+class _JsonLinesWriter(_SingleFileWriter):
+    def write(self, secret_id, secret_string):
+        line = json.dumps({"secret_id": secret_id, "secret_string": secret_string})
+        self._file.write(line.encode("utf-8") + b"\n")
+
+
+class _TarWriter(_SingleFileWriter):
+    def _open(self):
+        self._tar = tarfile.open(fileobj=self._file, mode="w|")
+
+    def write(self, secret_id, secret_string):
+        data = secret_string.encode("utf-8")
+        info = tarfile.TarInfo(secret_filename(secret_id))
+        info.size = len(data)
+        info.mode = FILE_MODE
+        info.mtime = int(time.time())
+        self._tar.addfile(info, io.BytesIO(data))
+
+    def _close(self):
+        self._tar.close()
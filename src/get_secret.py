@@ -1,8 +1,18 @@
-"""This module contains the definition for `get_secret()`."""
+"""This module contains the definitions for `get_secret()` and its variants.
 
-import boto3
+Those are `get_secret_fields()` and `get_secret_version()`.
+"""
 
+from src import metrics, rate_limit
+from src.client import get_client
+from src.secret_codec import binary_to_string, decode_secret
+from src.validation import validate_secret_id
 
+# Re-exported so that existing `from src.get_secret import ...` keeps working.
+from src.validation import BlankArgumentError  # noqa: F401
+
+
+@metrics.instrument("get_secret")
 def get_secret(secret_id: str):
     """A function to retrieve the details of a secret from AWS Secret Manager and return them as a string.
 
@@ -17,21 +27,69 @@ def get_secret(secret_id: str):
         ResourceNotFoundException: if secret not found in AWS Secrets Manager.
     """
 
-    if len(secret_id) == 0:
-        raise BlankArgumentError(
-            print("BlankArgumentError: secret_id cannot be blank.")
-        )
+    secret_string, _ = get_secret_version(secret_id)
+    return secret_string
+
+
+def get_secret_fields(secret_id: str) -> dict:
+    """A function to retrieve a secret from AWS Secret Manager as its parsed fields.
+
+    Args:
+        secret_id (str): the name of the secret to be retrieved.
+
+    Returns:
+        fields (dict): the secret's "user_id" and "password".
+
+    Raises:
+        BlankArgumentError: if passed a blank secret_id.
+        ResourceNotFoundException: if secret not found in AWS Secrets Manager.
+        SecretFormatError: if the stored value cannot be decoded.
+    """
+
+    return decode_secret(get_secret(secret_id))
+
+
+def get_secret_version(secret_id: str) -> tuple:
+    """A function to retrieve the current value of a secret and its version id.
+
+    Args:
+        secret_id (str): the name of the secret to be retrieved.
+
+    Returns:
+        secret_string (str): a string of the retrieved secret user_id and
+        password. SecretBinary values are unwrapped to their JSON.
+        version_id (str): the VersionId of the retrieved value.
+
+    Raises:
+        BlankArgumentError: if passed a blank secret_id.
+        ResourceNotFoundException: if secret not found in AWS Secrets Manager.
+    """
+
+    validate_secret_id(secret_id)
 
-    sm = boto3.client("secretsmanager")
+    sm = get_client()
 
     try:
-        response = sm.get_secret_value(SecretId=secret_id)
-        return response["SecretString"]
+        response = rate_limit.call(
+            "GetSecretValue", sm.get_secret_value, SecretId=secret_id
+        )
+        return secret_string_from(response), response["VersionId"]
 
     except sm.exceptions.ResourceNotFoundException as r:
         print(f"ResourceNotFoundError: {secret_id} not found.")
         raise r
 
 
-class BlankArgumentError(Exception):
-    """Traps errors where blank arguments are passed."""
+def secret_string_from(response: dict) -> str:
+    """A function to return a response's SecretString, unwrapping SecretBinary.
+
+    Args:
+        response (dict): a GetSecretValue response or BatchGetSecretValue entry.
+
+    Returns:
+        secret_string (str): the secret's string value.
+    """
+
+    if "SecretString" in response:
+        return response["SecretString"]
+    return binary_to_string(response["SecretBinary"])
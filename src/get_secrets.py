@@ -0,0 +1,131 @@
+"""This module contains the definition for `get_secrets()`."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from src import metrics, rate_limit
+from src.client import get_client
+from src.get_secret import secret_string_from
+from src.secret_codec import SecretFormatError
+from src.validation import validate_secret_ids
+
+# Re-exported so that existing `from src.get_secrets import ...` keeps working.
+from src.validation import BlankArgumentError  # noqa: F401
+
+BATCH_SIZE = 20
+DEFAULT_MAX_WORKERS = 4
+
+
+@metrics.instrument("get_secrets")
+def get_secrets(secret_ids: list, max_workers: int = DEFAULT_MAX_WORKERS) -> tuple:
+    """A function to retrieve many secrets from AWS Secret Manager in few round trips.
+
+    The ids are split into chunks of `BATCH_SIZE` (the BatchGetSecretValue
+    limit) and the chunks are fetched concurrently by a bounded worker pool.
+    A secret that cannot be retrieved is reported in the error mapping
+    rather than failing the whole batch.
+
+    Args:
+        secret_ids (list): the names or ARNs of the secrets to be retrieved.
+        max_workers (int): the maximum number of chunks fetched at once.
+
+    Returns:
+        secrets (dict): a mapping of secret id to its SecretString.
+        errors (dict): a mapping of secret id to a dict with the "ErrorCode"
+        (e.g. "ResourceNotFoundException") and "Message" for that id.
+
+    Raises:
+        BlankArgumentError: if any secret_id is blank.
+    """
+
+    validate_secret_ids(secret_ids)
+
+    unique_ids = list(dict.fromkeys(secret_ids))
+    chunks = [
+        unique_ids[i : i + BATCH_SIZE] for i in range(0, len(unique_ids), BATCH_SIZE)
+    ]
+
+    secrets = {}
+    errors = {}
+
+    if not chunks:
+        return secrets, errors
+
+    sm = get_client()
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        for chunk_secrets, chunk_errors in executor.map(
+            lambda chunk: _get_chunk(sm, chunk), chunks
+        ):
+            secrets.update(chunk_secrets)
+            errors.update(chunk_errors)
+
+    return secrets, errors
+
+
+def _get_chunk(sm, chunk):
+    secrets = {}
+    errors = {}
+
+    kwargs = {"SecretIdList": chunk}
+
+    try:
+        while True:
+            response = rate_limit.call(
+                "BatchGetSecretValue", sm.batch_get_secret_value, **kwargs
+            )
+
+            for value in response.get("SecretValues", []):
+                secret_id = _requested_id(chunk, value)
+                try:
+                    secrets[secret_id] = secret_string_from(value)
+                except SecretFormatError:
+                    # Raised for every short, corrupt or unknown payload, so
+                    # one bad secret does not fail the rest of the batch.
+                    errors[secret_id] = {
+                        "ErrorCode": "SecretFormatError",
+                        "Message": "SecretBinary could not be decoded.",
+                    }
+
+            for error in response.get("Errors", []):
+                errors[error["SecretId"]] = {
+                    "ErrorCode": error.get("ErrorCode"),
+                    "Message": error.get("Message"),
+                }
+
+            next_token = response.get("NextToken")
+            if not next_token:
+                break
+
+            kwargs["NextToken"] = next_token
+
+    except sm.exceptions.ClientError as e:
+        for secret_id in chunk:
+            if secret_id not in secrets:
+                errors[secret_id] = {
+                    "ErrorCode": e.response["Error"]["Code"],
+                    "Message": e.response["Error"].get("Message"),
+                }
+
+    # Some backends leave an id they cannot find out of both lists; report
+    # it as missing rather than dropping it.
+    for secret_id in chunk:
+        if secret_id not in secrets and secret_id not in errors:
+            errors[secret_id] = {
+                "ErrorCode": "ResourceNotFoundException",
+                "Message": "Secrets Manager can't find the specified secret.",
+            }
+
+    return secrets, errors
+
+
+def _requested_id(chunk, value):
+    # Callers may ask by name or by ARN; report the value under whichever
+    # form they used.
+    if value["Name"] in chunk:
+        return value["Name"]
+    if value["ARN"] in chunk:
+        return value["ARN"]
+    for secret_id in chunk:
+        if value["ARN"].startswith(secret_id):
+            return secret_id
+    return value["Name"]
@@ -0,0 +1,165 @@
+"""This module contains the definition for `import_secrets()`.
+
+`import_secrets()` is a bulk loader for CSV and JSON-lines files.
+"""
+
+import csv
+import json
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterator, TextIO
+
+from src.client import get_client
+from src.create_secret import create_secret
+from src.validation import check_secret, ValidationError, FIELDS
+
+CREATED = "created"
+EXISTS = "already exists"
+INVALID = "invalid"
+FAILED = "failed"
+
+DEFAULT_MAX_WORKERS = 8
+
+
+def import_secrets(
+    stream: TextIO,
+    fmt: str = "csv",
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    report: TextIO = None,
+) -> dict:
+    """A function to create many secrets from a CSV or JSON-lines stream.
+
+    Rows are read lazily and handed to a bounded thread pool, with no more
+    than twice `max_workers` rows in flight, so memory stays flat however
+    large the input is. Rows are validated with the same rules as
+    `create_secret()` before they are queued, so invalid rows never take
+    a worker.
+
+    Args:
+        stream (TextIO): the open file to read rows from. Each row needs
+        secret_identifier, user_id and password fields.
+        fmt (str): "csv" for a CSV file with a header row, or "jsonl" for
+        one JSON object per line.
+        max_workers (int): the maximum number of secrets created at once.
+        report (TextIO): if given, one JSON line per row is written here as
+        each row completes, with its row number, secret_identifier, status
+        and any error.
+
+    Returns:
+        summary (dict): the number of rows with each status.
+
+    Raises:
+        ValueError: if fmt is not "csv" or "jsonl".
+    """
+
+    rows = iter_rows(stream, fmt)
+
+    summary = {CREATED: 0, EXISTS: 0, INVALID: 0, FAILED: 0}
+    in_flight = set()
+
+    def record(result):
+        summary[result["status"]] += 1
+        if report is not None:
+            report.write(json.dumps(result) + "\n")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for row_number, row in enumerate(rows, start=1):
+            if len(in_flight) >= max_workers * 2:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record(future.result())
+
+            secret_identifier, user_id, password = (
+                str(row.get(f) or "") for f in FIELDS
+            )
+            error = check_secret(secret_identifier, user_id, password)
+            if error is not None:
+                record(
+                    {
+                        "row": row_number,
+                        "secret_identifier": secret_identifier,
+                        "status": INVALID,
+                        "error": error.__name__,
+                    }
+                )
+                continue
+
+            in_flight.add(
+                executor.submit(
+                    _import_row, row_number, secret_identifier, user_id, password
+                )
+            )
+
+        for future in wait(in_flight).done:
+            record(future.result())
+
+    return summary
+
+
+def iter_rows(stream: TextIO, fmt: str) -> Iterator[dict]:
+    """A function to lazily read secret rows from a CSV or JSON-lines stream.
+
+    A JSON line that cannot be parsed is yielded as an empty row, which is
+    then reported as invalid.
+
+    Args:
+        stream (TextIO): the open file to read rows from.
+        fmt (str): "csv" or "jsonl".
+
+    Yields:
+        row (dict): the fields of one row.
+
+    Raises:
+        ValueError: if fmt is not "csv" or "jsonl".
+    """
+
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+
+    elif fmt == "jsonl":
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                row = {}
+            yield row if isinstance(row, dict) else {}
+
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}.")
+
+
+def detect_format(path: str) -> str:
+    """A function to choose the import format from a file's extension.
+
+    Args:
+        path (str): the path of the file to import.
+
+    Returns:
+        fmt (str): "jsonl" for .jsonl/.ndjson/.json files, otherwise "csv".
+    """
+
+    if path.lower().endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    return "csv"
+
+
+def _import_row(row_number, secret_identifier, user_id, password):
+    result = {"row": row_number, "secret_identifier": secret_identifier}
+
+    try:
+        create_secret(secret_identifier, user_id, password)
+        result["status"] = CREATED
+
+    except ValidationError as e:
+        result["status"] = INVALID
+        result["error"] = type(e).__name__
+
+    except get_client().exceptions.ResourceExistsException:
+        result["status"] = EXISTS
+
+    except Exception as e:
+        result["status"] = FAILED
+        result["error"] = type(e).__name__
+
+    return result
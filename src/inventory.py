@@ -0,0 +1,324 @@
+"""This module contains the definition for `scan_inventory()`.
+
+`scan_inventory()` is a sharded, parallel scan of every secret's metadata.
+"""
+
+import itertools
+import queue
+import string
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterator
+
+from src import rate_limit
+from src.client import get_client
+
+# Every character a secret name can contain, case-folded. The API's name
+# filter is case-insensitive, so each shard is listed once for both cases.
+FIRST_CHARACTERS = string.ascii_lowercase + string.digits + "/_+=.@-"
+
+# Backends whose name filter is case-sensitive, such as moto and LocalVault,
+# are sent every case variant of a shard as alternatives in the same filter;
+# AWS returns each match once however many variants it matches. A shard is
+# not split into shards with more variants than the API's limit.
+MAX_FILTER_VALUES = 10
+PAGE_SIZE = 100
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_DESCRIBE_WORKERS = 8
+DEFAULT_BUFFER_SIZE = 1000
+
+_DONE = object()
+
+
+class SecretRecord:
+    """One secret's metadata, without the rest of the response it came from.
+
+    Fields from the listing are always set; kms_key_id, primary_region and
+    replica_regions are only filled in by a describe scan.
+    """
+
+    __slots__ = (
+        "name",
+        "arn",
+        "description",
+        "created",
+        "last_changed",
+        "last_accessed",
+        "rotation_enabled",
+        "tags",
+        "versions",
+        "current_version",
+        "kms_key_id",
+        "primary_region",
+        "replica_regions",
+    )
+
+    def __init__(self, summary: dict):
+        self.name = summary["Name"]
+        self.arn = summary.get("ARN")
+        self.description = summary.get("Description")
+        self.created = summary.get("CreatedDate")
+        self.last_changed = summary.get("LastChangedDate")
+        self.last_accessed = summary.get("LastAccessedDate")
+        self.rotation_enabled = summary.get("RotationEnabled", False)
+        self.tags = tuple(
+            (tag["Key"], tag.get("Value")) for tag in summary.get("Tags", [])
+        )
+        stages = (
+            summary.get("SecretVersionsToStages")
+            or summary.get("VersionIdsToStages")
+            or {}
+        )
+        self.versions = len(stages)
+        self.current_version = next(
+            (
+                version_id
+                for version_id, labels in stages.items()
+                if "AWSCURRENT" in labels
+            ),
+            None,
+        )
+        self.kms_key_id = None
+        self.primary_region = None
+        self.replica_regions = None
+
+    def as_dict(self) -> dict:
+        """A method to return the record's fields as a dict, e.g. for JSON output."""
+
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields["tags"] = dict(self.tags)
+        return fields
+
+    def __repr__(self):
+        return f"SecretRecord({self.name!r})"
+
+
+def shard_prefixes(name_prefix: str = "") -> list:
+    """A function to split the names under a prefix into disjoint name-prefix shards.
+
+    Together the shards cover every name that is longer than name_prefix.
+    The characters after name_prefix are matched case-insensitively, as the
+    API's name filter does, so "a" and "A" are the same shard.
+
+    Args:
+        name_prefix (str): the prefix to split, or "" for every secret.
+
+    Returns:
+        prefixes (list): name_prefix followed by each of FIRST_CHARACTERS.
+    """
+
+    return [name_prefix + character for character in FIRST_CHARACTERS]
+
+
+def scan_inventory(
+    name_prefix: str = "",
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    describe: bool = False,
+    describe_workers: int = DEFAULT_DESCRIBE_WORKERS,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+) -> Iterator[SecretRecord]:
+    """A function to stream every secret's metadata, listing many shards at once.
+
+    The namespace is split with `shard_prefixes()` and up to `max_workers`
+    shards are paged through in parallel, each with its own ListSecrets
+    cursor. A shard with more than one page is split again by its next
+    character, so a namespace that is mostly under one prefix is still
+    spread across the workers. A shard is paged through instead once its
+    next characters would need more than MAX_FILTER_VALUES case variants.
+    With describe set, a second pool of `describe_workers` adds
+    DescribeSecret details to each record. Results pass through bounded
+    queues of `buffer_size`, so memory stays flat however many secrets
+    there are, and scanning pauses while the caller falls behind. Records
+    arrive in no particular order.
+
+    Args:
+        name_prefix (str): only scan secrets whose name starts with this.
+        max_workers (int): the maximum number of shards listed at once.
+        describe (bool): whether to add DescribeSecret details to each record.
+        describe_workers (int): the maximum number of DescribeSecret calls at once.
+        buffer_size (int): the most records held between stages.
+
+    Yields:
+        record (SecretRecord): one secret's metadata.
+
+    Raises:
+        Exception: the first error from any shard or describe call.
+    """
+
+    stop = threading.Event()
+    listed = queue.Queue(buffer_size)
+    described = queue.Queue(buffer_size) if describe else listed
+    finishers = describe_workers if describe else 1
+
+    def put(target, item):
+        while not stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def scan_shard(suffix):
+        # Returns the shards to scan instead, when this one is too big.
+        prefix = name_prefix + suffix
+        sm = get_client()
+        response = _list_page(sm, name_prefix, suffix, None)
+
+        if response.get("NextToken") and _splittable(suffix):
+            exact = [
+                s
+                for s in response["SecretList"]
+                if _in_shard(s, prefix, len(name_prefix))
+            ]
+            exact = [s for s in exact if len(s["Name"]) == len(prefix)]
+            if not exact:
+                # A secret named exactly the prefix is in none of the new shards.
+                summary = _describe_exact(prefix)
+                exact = [summary] if summary is not None else []
+            for summary in exact:
+                if not put(listed, SecretRecord(summary)):
+                    return []
+            return [suffix + character for character in FIRST_CHARACTERS]
+
+        while True:
+            for summary in response["SecretList"]:
+                if _in_shard(summary, prefix, len(name_prefix)):
+                    if not put(listed, SecretRecord(summary)):
+                        return []
+            if not response.get("NextToken"):
+                return []
+            response = _list_page(sm, name_prefix, suffix, response["NextToken"])
+
+    def list_all():
+        try:
+            if name_prefix:
+                # A secret named exactly name_prefix is in none of the shards.
+                summary = _describe_exact(name_prefix)
+                if summary is not None:
+                    put(listed, SecretRecord(summary))
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                pending = {
+                    executor.submit(scan_shard, prefix[len(name_prefix) :])
+                    for prefix in shard_prefixes(name_prefix)
+                }
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        for suffix in future.result():
+                            pending.add(executor.submit(scan_shard, suffix))
+
+        except Exception as e:
+            put(listed, _Failure(e))
+
+        finally:
+            for _ in range(finishers):
+                put(listed, _DONE)
+
+    def describe_all():
+        sm = get_client()
+        while not stop.is_set():
+            item = listed.get()
+            if isinstance(item, SecretRecord):
+                try:
+                    _describe(sm, item)
+                except Exception as e:
+                    item = _Failure(e)
+            if not put(described, item) or item is _DONE:
+                return
+
+    threads = [threading.Thread(target=list_all, name="inventory-list", daemon=True)]
+    if describe:
+        threads += [
+            threading.Thread(
+                target=describe_all, name="inventory-describe", daemon=True
+            )
+            for _ in range(describe_workers)
+        ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        finished = 0
+        while finished < finishers:
+            item = described.get()
+            if item is _DONE:
+                finished += 1
+            elif isinstance(item, _Failure):
+                raise item.error
+            else:
+                yield item
+
+    finally:
+        stop.set()
+        # Unblock any describe worker still waiting for a record.
+        for _ in range(finishers):
+            try:
+                listed.put_nowait(_DONE)
+            except queue.Full:
+                break
+
+
+def _list_page(sm, name_prefix, suffix, next_token):
+    values = [name_prefix + variant for variant in _case_variants(suffix)]
+    kwargs = {
+        "Filters": [{"Key": "name", "Values": values}],
+        "MaxResults": PAGE_SIZE,
+    }
+    if next_token:
+        kwargs["NextToken"] = next_token
+    return rate_limit.call("ListSecrets", sm.list_secrets, **kwargs)
+
+
+def _case_variants(suffix):
+    choices = [sorted({c.lower(), c.upper()}) for c in suffix]
+    return ["".join(variant) for variant in itertools.product(*choices)]
+
+
+def _splittable(suffix):
+    # A shard one character longer has up to twice as many case variants.
+    return 2 * len(_case_variants(suffix)) <= MAX_FILTER_VALUES
+
+
+def _in_shard(summary, prefix, fixed):
+    # The API may return other cases of name_prefix, deleted secrets, and,
+    # unless it is case-insensitive, nothing else outside the shard.
+    name = summary["Name"]
+    return (
+        "DeletedDate" not in summary
+        and name.startswith(prefix[:fixed])
+        and name[fixed:].lower().startswith(prefix[fixed:])
+    )
+
+
+def _describe_exact(name):
+    sm = get_client()
+    try:
+        summary = rate_limit.call("DescribeSecret", sm.describe_secret, SecretId=name)
+    except sm.exceptions.ResourceNotFoundException:
+        return None
+
+    if summary.get("Name") != name or "DeletedDate" in summary:
+        return None
+    return summary
+
+
+def _describe(sm, record):
+    response = rate_limit.call(
+        "DescribeSecret", sm.describe_secret, SecretId=record.arn or record.name
+    )
+    record.kms_key_id = response.get("KmsKeyId")
+    record.primary_region = response.get("PrimaryRegion")
+    record.replica_regions = tuple(
+        replica["Region"] for replica in response.get("ReplicationStatus", [])
+    )
+    record.versions = len(response.get("VersionIdsToStages", {})) or record.versions
+
+
+class _Failure:
+    __slots__ = ("error",)
+
+    def __init__(self, error):
+        self.error = error
@@ -1,25 +1,145 @@
-"""This module contains the definition for `list_secrets()`."""
+"""This module contains the definitions for `list_secrets()` and its iterators.
 
-import boto3
+Those are `iter_secrets()` and `iter_secret_metadata()`.
+"""
 
+from typing import Iterator
 
-def list_secrets() -> list:
+from src import metrics, rate_limit
+from src.client import get_client
+
+
+def iter_secrets(
+    name_prefix: str = None,
+    tags: dict = None,
+    description: str = None,
+    max_results: int = None,
+) -> Iterator[str]:
+    """A function to lazily yield the names of secrets stored in AWS Secrets Manager.
+
+    Every page of results is walked, one request at a time, so the first
+    names are available as soon as the first page arrives and memory use
+    does not grow with the number of secrets. Filters are applied by the
+    API; the name prefix and tags are checked again here, since the API
+    matches names without regard to case and tag keys and values apart.
+
+    Args:
+        name_prefix (str): only yield secrets whose name starts with this prefix.
+        tags (dict): only yield secrets carrying these tags. A value of None
+        matches any secret with the tag key.
+        description (str): only yield secrets whose description starts with this.
+        max_results (int): the page size requested from the API (1-100).
+
+    Yields:
+        name (str): an AWS Secrets Manager name.
+
+    Raises:
+        ValueError: if name_prefix starts with "!", which the API reads as "not".
+    """
+
+    for secret in iter_secret_metadata(name_prefix, tags, description, max_results):
+        yield secret["Name"]
+
+
+def iter_secret_metadata(
+    name_prefix: str = None,
+    tags: dict = None,
+    description: str = None,
+    max_results: int = None,
+    include_deleted: bool = False,
+) -> Iterator[dict]:
+    """A function to lazily yield the ListSecrets summary of each stored secret.
+
+    This takes the same filters as `iter_secrets()` but yields each secret's
+    full summary (Name, ARN, Tags, LastChangedDate and so on) rather than
+    just its name.
+
+    Args:
+        name_prefix (str): only yield secrets whose name starts with this prefix.
+        tags (dict): only yield secrets carrying these tags.
+        description (str): only yield secrets whose description starts with this.
+        max_results (int): the page size requested from the API (1-100).
+        include_deleted (bool): also yield secrets scheduled for deletion.
+
+    Yields:
+        secret (dict): a SecretList entry from the ListSecrets response.
+
+    Raises:
+        ValueError: if name_prefix starts with "!".
+    """
+
+    if name_prefix and name_prefix.startswith("!"):
+        raise ValueError("name_prefix cannot start with '!'.")
+
+    sm = get_client()
+
+    kwargs = {}
+
+    filters = _build_filters(name_prefix, tags, description)
+    if filters:
+        kwargs["Filters"] = filters
+
+    if max_results is not None:
+        kwargs["MaxResults"] = max_results
+
+    if include_deleted:
+        kwargs["IncludePlannedDeletion"] = True
+
+    while True:
+        response = rate_limit.call("ListSecrets", sm.list_secrets, **kwargs)
+
+        for secret in response["SecretList"]:
+            if "DeletedDate" in secret and not include_deleted:
+                continue
+            if name_prefix and not secret["Name"].startswith(name_prefix):
+                continue
+            if tags and not _has_tags(secret, tags):
+                continue
+            yield secret
+
+        next_token = response.get("NextToken")
+        if not next_token:
+            return
+
+        kwargs["NextToken"] = next_token
+
+
+@metrics.instrument("list_secrets")
+def list_secrets(**filters) -> list:
     """A function to retrieve a list of all the secrets stored in AWS Secrets Manager.
 
+    Args:
+        **filters: any of the keyword arguments accepted by `iter_secrets()`.
+
     Returns:
         secret_list (list): a list of AWS Secrets Manager names.
     """
 
-    sm = boto3.client("secretsmanager")
+    return list(iter_secrets(**filters))
 
-    response = sm.list_secrets(
-        IncludePlannedDeletion=True,
-    )
 
-    secret_list = [
-        secret["Name"]
-        for secret in response["SecretList"]
-        if "DeletedDate" not in str(secret)
-    ]
+def _build_filters(name_prefix, tags, description):
+    filters = []
+
+    if name_prefix:
+        filters.append({"Key": "name", "Values": [name_prefix]})
+
+    if description:
+        filters.append({"Key": "description", "Values": [description]})
 
-    return secret_list
+    for key, value in (tags or {}).items():
+        filters.append({"Key": "tag-key", "Values": [key]})
+        if value is not None:
+            filters.append({"Key": "tag-value", "Values": [value]})
+
+    return filters
+
+
+def _has_tags(secret, tags):
+    # The API matches tag keys and tag values independently, so confirm each
+    # requested key carries its requested value on the same tag.
+    secret_tags = {tag["Key"]: tag.get("Value") for tag in secret.get("Tags", [])}
+    return all(
+        key in secret_tags and (value is None or secret_tags[key] == value)
+        for key, value in tags.items()
+    )
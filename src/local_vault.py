@@ -0,0 +1,1006 @@
+"""This module contains `LocalVault`, an encrypted SQLite stand-in for Secrets Manager.
+
+The vault answers the part of the Secrets Manager API that this package
+uses. Its responses, and the exception classes it raises, match a boto3
+client's, so every operation works against it unchanged.
+`client.get_client()` returns one when PASSWORD_MANAGER_BACKEND is "local".
+
+Secret values are encrypted with AES-256-GCM under a key kept outside the
+vault. Names, descriptions and tags are stored in the clear, as AWS does.
+"""
+
+import base64
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+DEFAULT_VAULT_PATH = os.path.join("~", ".password_manager", "vault.db")
+KEY_VARIABLE = "PASSWORD_MANAGER_VAULT_KEY"
+KEY_FILE_VARIABLE = "PASSWORD_MANAGER_VAULT_KEY_FILE"
+
+CURRENT_STAGE = "AWSCURRENT"
+PREVIOUS_STAGE = "AWSPREVIOUS"
+
+DEFAULT_RECOVERY_WINDOW = 30
+MIN_RECOVERY_WINDOW = 7
+MAX_RECOVERY_WINDOW = 30
+MAX_PAGE_SIZE = 100
+
+# Reads are served from a memory map of the file rather than read() calls.
+MMAP_SIZE = 256 * 1024 * 1024
+
+_NONCE_SIZE = 12
+_KEY_SIZE = 32
+_CHECK_VALUE = b"password-manager-vault"
+_DAY = 86400
+
+_STRING, _BINARY = 0, 1
+
+_MARKED_FOR_DELETION = (
+    "You can't perform this operation on the secret because it was marked for deletion."
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS secrets (
+    name TEXT PRIMARY KEY,
+    arn TEXT NOT NULL UNIQUE,
+    description TEXT,
+    tags TEXT NOT NULL DEFAULT '[]',
+    created REAL NOT NULL,
+    last_changed REAL NOT NULL,
+    last_accessed REAL,
+    deletion_date REAL,
+    current_version TEXT
+);
+CREATE TABLE IF NOT EXISTS versions (
+    name TEXT NOT NULL,
+    version_id TEXT NOT NULL,
+    stages TEXT NOT NULL,
+    created REAL NOT NULL,
+    kind INTEGER NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (name, version_id)
+) WITHOUT ROWID;
+"""
+
+
+class VaultKeyError(Exception):
+    """Traps errors where the vault key is missing, malformed or wrong."""
+
+
+def generate_key() -> str:
+    """A function to generate a new vault key.
+
+    Returns:
+        key (str): 32 random bytes, URL-safe base64 encoded.
+    """
+
+    return base64.urlsafe_b64encode(os.urandom(_KEY_SIZE)).decode("ascii")
+
+
+def decode_key(key: str) -> bytes:
+    """A function to decode a key from `generate_key()`.
+
+    Args:
+        key (str): the URL-safe base64 key.
+
+    Returns:
+        key (bytes): the 32 raw key bytes.
+
+    Raises:
+        VaultKeyError: if the key is not 32 bytes of URL-safe base64.
+    """
+
+    try:
+        raw = base64.urlsafe_b64decode(key)
+    except (ValueError, TypeError):
+        raw = b""
+
+    if len(raw) != _KEY_SIZE:
+        raise VaultKeyError(
+            print(
+                f"VaultKeyError: the key must be {_KEY_SIZE} bytes, "
+                "URL-safe base64 encoded."
+            )
+        )
+    return raw
+
+
+def default_key_file(vault_path: str) -> str:
+    """A function to return where a vault's key file is kept by default.
+
+    PASSWORD_MANAGER_VAULT_KEY_FILE overrides it.
+
+    Keys live under the user's configuration directory rather than beside
+    the vault, so copying or backing up the vault's directory does not
+    copy the key with it.
+
+    Args:
+        vault_path (str): the vault file.
+
+    Returns:
+        path (str): $XDG_CONFIG_HOME (or ~/.config)/password-manager/keys/
+        followed by the vault's file name and a hash of its full path.
+    """
+
+    vault_path = os.path.abspath(os.path.expanduser(vault_path))
+    config_dir = os.environ.get("XDG_CONFIG_HOME") or os.path.join(
+        os.path.expanduser("~"), ".config"
+    )
+    path_hash = hashlib.sha256(vault_path.encode("utf-8")).hexdigest()[:16]
+    name = f"{os.path.basename(vault_path)}-{path_hash}.key"
+    return os.path.join(config_dir, "password-manager", "keys", name)
+
+
+class LocalVault:
+    """A Secrets Manager look-alike backed by an encrypted SQLite file.
+
+    Lookups by name or ARN use the primary key or a unique index. Each
+    thread gets its own connection, in WAL mode, so reads run in parallel
+    with each other and with a writer.
+
+    The key comes from the `key` argument, then PASSWORD_MANAGER_VAULT_KEY,
+    then the file named by PASSWORD_MANAGER_VAULT_KEY_FILE (by default
+    `default_key_file()`, outside the vault's directory). A new key file
+    is created, readable only by you, when a new vault is created.
+
+    Args:
+        path (str): the vault file, created if missing.
+        key (str): the URL-safe base64 key from `generate_key()`.
+
+    Raises:
+        VaultKeyError: if the key is missing, malformed or wrong.
+    """
+
+    def __init__(self, path: str = DEFAULT_VAULT_PATH, key: str = None):
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.region = "local"
+
+        new_vault = not os.path.exists(self.path)
+        if new_vault:
+            os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+            _create_private(self.path)
+
+        self._aead = AESGCM(decode_key(key or _load_key(self.path, new_vault)))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._exceptions = None
+
+        with self._write() as conn:
+            # executescript() would commit part way through the transaction.
+            for statement in _SCHEMA.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+            self._check_key(conn)
+            conn.execute(
+                "DELETE FROM versions WHERE name IN "
+                "(SELECT name FROM secrets WHERE deletion_date <= ?)",
+                (time.time(),),
+            )
+            conn.execute("DELETE FROM secrets WHERE deletion_date <= ?", (time.time(),))
+
+    @property
+    def exceptions(self):
+        """The exception classes of a boto3 secretsmanager client.
+
+        For example `ResourceNotFoundException`.
+        """
+
+        import boto3
+
+        if boto3.DEFAULT_SESSION is None:
+            boto3.setup_default_session()
+        session = boto3.DEFAULT_SESSION._session
+
+        # The factory caches the classes per service, so these are the very
+        # classes a boto3 client from the default session raises.
+        cached = self._exceptions
+        if cached is None or cached[0] is not session:
+            factory = session._get_internal_component("exceptions_factory")
+            model = session.get_service_model("secretsmanager")
+            cached = self._exceptions = (
+                session,
+                factory.create_client_exceptions(model),
+            )
+        return cached[1]
+
+    def close(self):
+        """A method to close every thread's connection to the vault."""
+
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def create_secret(
+        self,
+        Name: str,
+        SecretString: str = None,
+        SecretBinary: bytes = None,
+        ClientRequestToken: str = None,
+        Description: str = None,
+        Tags: list = None,
+        AddReplicaRegions: list = None,
+        **kwargs,
+    ) -> dict:
+        operation = "CreateSecret"
+
+        if AddReplicaRegions:
+            raise self._error(
+                "InvalidRequestException",
+                "The local vault cannot replicate secrets to other regions.",
+                operation,
+            )
+
+        value = self._value(SecretString, SecretBinary, operation, required=False)
+        now = time.time()
+
+        with self._write() as conn:
+            row = conn.execute(
+                "SELECT deletion_date FROM secrets WHERE name = ?", (Name,)
+            ).fetchone()
+
+            if row is not None and row[0] is not None and row[0] <= now:
+                # Its recovery window has passed, so it no longer exists.
+                conn.execute("DELETE FROM versions WHERE name = ?", (Name,))
+                conn.execute("DELETE FROM secrets WHERE name = ?", (Name,))
+                row = None
+
+            if row is not None:
+                if row[0] is not None:
+                    raise self._error(
+                        "InvalidRequestException",
+                        "You can't create this secret because a secret with this name "
+                        "is already scheduled for deletion.",
+                        operation,
+                    )
+                raise self._error(
+                    "ResourceExistsException",
+                    f"The operation failed because the secret {Name} already exists.",
+                    operation,
+                )
+
+            arn = f"arn:aws:secretsmanager:local:000000000000:secret:{Name}-{_suffix()}"
+            conn.execute(
+                "INSERT INTO secrets "
+                "(name, arn, description, tags, created, last_changed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (Name, arn, Description, json.dumps(Tags or []), now, now),
+            )
+
+            response = {"ARN": arn, "Name": Name}
+            if value is not None:
+                version_id = ClientRequestToken or str(uuid.uuid4())
+                self._add_version(conn, Name, version_id, value, [CURRENT_STAGE], now)
+                response["VersionId"] = version_id
+
+        return _ok(response)
+
+    def put_secret_value(
+        self,
+        SecretId: str,
+        SecretString: str = None,
+        SecretBinary: bytes = None,
+        ClientRequestToken: str = None,
+        VersionStages: list = None,
+        **kwargs,
+    ) -> dict:
+        operation = "PutSecretValue"
+
+        value = self._value(SecretString, SecretBinary, operation)
+        version_id = ClientRequestToken or str(uuid.uuid4())
+        stages = list(VersionStages or [CURRENT_STAGE])
+        now = time.time()
+
+        with self._write() as conn:
+            name, arn = self._find_live(conn, SecretId, operation)
+
+            existing = conn.execute(
+                "SELECT stages, kind, value FROM versions "
+                "WHERE name = ? AND version_id = ?",
+                (name, version_id),
+            ).fetchone()
+
+            if existing is not None:
+                # A repeated request is ignored, as long as it is for the same value.
+                if (existing[1], self._unseal(name, version_id, existing[2])) != value:
+                    raise self._error(
+                        "ResourceExistsException",
+                        "A resource with the ID you requested already exists.",
+                        operation,
+                    )
+                stages = json.loads(existing[0])
+            else:
+                self._add_version(conn, name, version_id, value, stages, now)
+                conn.execute(
+                    "UPDATE secrets SET last_changed = ? WHERE name = ?", (now, name)
+                )
+
+        return _ok(
+            {"ARN": arn, "Name": name, "VersionId": version_id, "VersionStages": stages}
+        )
+
+    def get_secret_value(
+        self, SecretId: str, VersionId: str = None, VersionStage: str = None, **kwargs
+    ) -> dict:
+        operation = "GetSecretValue"
+        conn = self._connection()
+
+        if VersionStage not in (None, CURRENT_STAGE) and VersionId is None:
+            name, _ = self._find_live(conn, SecretId, operation)
+            VersionId = self._stage_holder(conn, name, VersionStage, operation)
+
+        column = "arn" if SecretId.startswith("arn:") else "name"
+        row = conn.execute(
+            "SELECT s.name, s.arn, s.deletion_date, s.last_accessed, v.version_id, "
+            "v.stages, v.created, v.kind, v.value FROM secrets s LEFT JOIN versions v "
+            "ON v.name = s.name AND v.version_id = COALESCE(?, s.current_version) "
+            f"WHERE s.{column} = ?",
+            (VersionId, SecretId),
+        ).fetchone()
+
+        if row is None:
+            raise self._not_found(operation)
+
+        (
+            name,
+            arn,
+            deletion_date,
+            last_accessed,
+            version_id,
+            stages,
+            created,
+            kind,
+            sealed,
+        ) = row
+
+        if deletion_date is not None:
+            if deletion_date <= time.time():
+                raise self._not_found(operation)
+            raise self._error(
+                "InvalidRequestException", _MARKED_FOR_DELETION, operation
+            )
+
+        stages = json.loads(stages) if stages is not None else []
+        if version_id is None or (
+            VersionStage is not None and VersionStage not in stages
+        ):
+            raise self._error(
+                "ResourceNotFoundException",
+                "Secrets Manager can't find the specified secret value for "
+                + (
+                    f"VersionId: {VersionId}"
+                    if VersionId
+                    else f"staging label: {VersionStage or CURRENT_STAGE}"
+                ),
+                operation,
+            )
+
+        self._touch(conn, name, last_accessed)
+
+        data = self._unseal(name, version_id, sealed)
+        response = {
+            "ARN": arn,
+            "Name": name,
+            "VersionId": version_id,
+            "VersionStages": stages,
+            "CreatedDate": _datetime(created),
+        }
+        if kind == _BINARY:
+            response["SecretBinary"] = data
+        else:
+            response["SecretString"] = data.decode("utf-8")
+
+        return _ok(response)
+
+    def batch_get_secret_value(
+        self,
+        SecretIdList: list = None,
+        Filters: list = None,
+        MaxResults: int = None,
+        NextToken: str = None,
+        **kwargs,
+    ) -> dict:
+        operation = "BatchGetSecretValue"
+
+        if SecretIdList is not None and Filters is not None:
+            raise self._error(
+                "InvalidParameterException",
+                "Either 'SecretIdList' or 'Filters' must be provided, but not both.",
+                operation,
+            )
+
+        response = {"SecretValues": [], "Errors": []}
+
+        if SecretIdList is None:
+            listing = self.list_secrets(
+                Filters=Filters, MaxResults=MaxResults, NextToken=NextToken
+            )
+            SecretIdList = [secret["Name"] for secret in listing["SecretList"]]
+            if "NextToken" in listing:
+                response["NextToken"] = listing["NextToken"]
+
+        for secret_id in SecretIdList:
+            try:
+                value = self.get_secret_value(SecretId=secret_id)
+            except self.exceptions.ClientError as e:
+                response["Errors"].append(
+                    {
+                        "SecretId": secret_id,
+                        "ErrorCode": e.response["Error"]["Code"],
+                        "Message": e.response["Error"]["Message"],
+                    }
+                )
+                continue
+            del value["ResponseMetadata"]
+            response["SecretValues"].append(value)
+
+        return _ok(response)
+
+    def delete_secret(
+        self,
+        SecretId: str,
+        RecoveryWindowInDays: int = None,
+        ForceDeleteWithoutRecovery: bool = False,
+        **kwargs,
+    ) -> dict:
+        operation = "DeleteSecret"
+
+        if RecoveryWindowInDays is not None and ForceDeleteWithoutRecovery:
+            raise self._error(
+                "InvalidParameterException",
+                "You can't use ForceDeleteWithoutRecovery in conjunction with "
+                "RecoveryWindowInDays.",
+                operation,
+            )
+
+        window = (
+            DEFAULT_RECOVERY_WINDOW
+            if RecoveryWindowInDays is None
+            else RecoveryWindowInDays
+        )
+        if not MIN_RECOVERY_WINDOW <= window <= MAX_RECOVERY_WINDOW:
+            raise self._error(
+                "InvalidParameterException",
+                "RecoveryWindowInDays value must be between 7 and 30 days (inclusive).",
+                operation,
+            )
+
+        now = time.time()
+
+        with self._write() as conn:
+            name, arn, deletion_date = self._find(conn, SecretId, operation)
+
+            if ForceDeleteWithoutRecovery:
+                conn.execute("DELETE FROM versions WHERE name = ?", (name,))
+                conn.execute("DELETE FROM secrets WHERE name = ?", (name,))
+                deletion_date = now
+            elif deletion_date is None:
+                deletion_date = now + window * _DAY
+                conn.execute(
+                    "UPDATE secrets SET deletion_date = ? WHERE name = ?",
+                    (deletion_date, name),
+                )
+            else:
+                raise self._error(
+                    "InvalidRequestException", _MARKED_FOR_DELETION, operation
+                )
+
+        return _ok({"ARN": arn, "Name": name, "DeletionDate": _datetime(deletion_date)})
+
+    def restore_secret(self, SecretId: str, **kwargs) -> dict:
+        with self._write() as conn:
+            name, arn, _ = self._find(conn, SecretId, "RestoreSecret")
+            conn.execute(
+                "UPDATE secrets SET deletion_date = NULL WHERE name = ?", (name,)
+            )
+
+        return _ok({"ARN": arn, "Name": name})
+
+    def describe_secret(self, SecretId: str, **kwargs) -> dict:
+        conn = self._connection()
+        name, _, _ = self._find(conn, SecretId, "DescribeSecret")
+
+        row = conn.execute(
+            f"SELECT {_SUMMARY_COLUMNS} FROM secrets WHERE name = ?", (name,)
+        ).fetchone()
+        response = _summary(
+            row, "VersionIdsToStages", self._version_stages(conn, [name])
+        )
+
+        return _ok(response)
+
+    def list_secrets(
+        self,
+        Filters: list = None,
+        MaxResults: int = None,
+        NextToken: str = None,
+        IncludePlannedDeletion: bool = False,
+        **kwargs,
+    ) -> dict:
+        operation = "ListSecrets"
+
+        page_size = MAX_PAGE_SIZE if MaxResults is None else MaxResults
+        if not 1 <= page_size <= MAX_PAGE_SIZE:
+            raise self._error(
+                "InvalidParameterException",
+                f"MaxResults must be between 1 and {MAX_PAGE_SIZE}.",
+                operation,
+            )
+
+        matches = self._filter(Filters or [], operation)
+
+        query = f"SELECT {_SUMMARY_COLUMNS} FROM secrets WHERE name > ?"
+        params = [NextToken or ""]
+
+        # A single name prefix narrows the scan to a range of the primary key.
+        prefixes = [f["Values"] for f in Filters or [] if f["Key"] == "name"]
+        if len(prefixes) == 1 and len(prefixes[0]) == 1 and prefixes[0][0]:
+            prefix = prefixes[0][0]
+            query += " AND name >= ? AND name < ?"
+            params += [prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)]
+
+        now = time.time()
+        rows = []
+        next_token = None
+
+        for row in self._connection().execute(query + " ORDER BY name", params):
+            deletion_date = row[7]
+            if deletion_date is not None and (
+                deletion_date <= now or not IncludePlannedDeletion
+            ):
+                continue
+            if not matches(row):
+                continue
+            if len(rows) == page_size:
+                next_token = rows[-1][0]
+                break
+            rows.append(row)
+
+        stages = self._version_stages(self._connection(), [row[0] for row in rows])
+        response = {
+            "SecretList": [
+                _summary(row, "SecretVersionsToStages", stages) for row in rows
+            ]
+        }
+        if next_token is not None:
+            response["NextToken"] = next_token
+
+        return _ok(response)
+
+    def update_secret_version_stage(
+        self,
+        SecretId: str,
+        VersionStage: str,
+        RemoveFromVersionId: str = None,
+        MoveToVersionId: str = None,
+        **kwargs,
+    ) -> dict:
+        operation = "UpdateSecretVersionStage"
+
+        with self._write() as conn:
+            name, arn = self._find_live(conn, SecretId, operation)
+            holder = self._stage_holder(
+                conn, name, VersionStage, operation, required=False
+            )
+
+            if holder is not None and holder not in (
+                RemoveFromVersionId,
+                MoveToVersionId,
+            ):
+                raise self._error(
+                    "InvalidParameterException",
+                    f"The parameter RemoveFromVersionId can't be empty. Staging label "
+                    f"{VersionStage} is currently attached to version {holder}, so you "
+                    f"must explicitly reference that version in RemoveFromVersionId.",
+                    operation,
+                )
+
+            if MoveToVersionId is not None:
+                exists = conn.execute(
+                    "SELECT 1 FROM versions WHERE name = ? AND version_id = ?",
+                    (name, MoveToVersionId),
+                ).fetchone()
+                if exists is None:
+                    raise self._error(
+                        "ResourceNotFoundException",
+                        f"Secrets Manager can't find the specified secret value for "
+                        f"VersionId: {MoveToVersionId}",
+                        operation,
+                    )
+            elif VersionStage == CURRENT_STAGE:
+                raise self._error(
+                    "InvalidParameterException",
+                    "You can only move the AWSCURRENT staging label "
+                    "to another version.",
+                    operation,
+                )
+
+            self._move_stage(conn, name, VersionStage, MoveToVersionId)
+            conn.execute(
+                "UPDATE secrets SET last_changed = ? WHERE name = ?",
+                (time.time(), name),
+            )
+
+        return _ok({"ARN": arn, "Name": name})
+
+    def tag_resource(self, SecretId: str, Tags: list, **kwargs) -> dict:
+        with self._write() as conn:
+            name, _ = self._find_live(conn, SecretId, "TagResource")
+            tags = self._tags(conn, name)
+            tags.update({tag["Key"]: tag.get("Value", "") for tag in Tags})
+            self._set_tags(conn, name, tags)
+
+        return _ok({})
+
+    def untag_resource(self, SecretId: str, TagKeys: list, **kwargs) -> dict:
+        with self._write() as conn:
+            name, _ = self._find_live(conn, SecretId, "UntagResource")
+            tags = self._tags(conn, name)
+            for key in TagKeys:
+                tags.pop(key, None)
+            self._set_tags(conn, name, tags)
+
+        return _ok({})
+
+    def replicate_secret_to_regions(self, SecretId: str, **kwargs) -> dict:
+        raise self._error(
+            "InvalidRequestException",
+            "The local vault cannot replicate secrets to other regions.",
+            "ReplicateSecretToRegions",
+        )
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path, timeout=30, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextlib.contextmanager
+    def _write(self):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _check_key(self, conn):
+        row = conn.execute("SELECT value FROM meta WHERE key = 'check'").fetchone()
+        if row is None:
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('check', ?)",
+                (self._seal("", "check", _CHECK_VALUE),),
+            )
+            return
+
+        from cryptography.exceptions import InvalidTag
+
+        try:
+            self._unseal("", "check", row[0])
+        except InvalidTag:
+            raise VaultKeyError(
+                print(f"VaultKeyError: the key does not open the vault at {self.path}.")
+            )
+
+    def _seal(self, name, version_id, data):
+        nonce = os.urandom(_NONCE_SIZE)
+        return nonce + self._aead.encrypt(
+            nonce, data, _associated_data(name, version_id)
+        )
+
+    def _unseal(self, name, version_id, sealed):
+        # The name and version are bound to the ciphertext, so a value
+        # copied into another row fails to decrypt.
+        return self._aead.decrypt(
+            sealed[:_NONCE_SIZE],
+            sealed[_NONCE_SIZE:],
+            _associated_data(name, version_id),
+        )
+
+    def _value(self, secret_string, secret_binary, operation, required=True):
+        if secret_string is not None and secret_binary is not None:
+            raise self._error(
+                "InvalidParameterException",
+                "You can't specify both a binary secret value "
+                "and a string secret value "
+                "in the same secret.",
+                operation,
+            )
+        if secret_binary is not None:
+            return _BINARY, bytes(secret_binary)
+        if secret_string is not None:
+            return _STRING, secret_string.encode("utf-8")
+        if required:
+            raise self._error(
+                "InvalidRequestException",
+                "You must provide either SecretString or SecretBinary.",
+                operation,
+            )
+        return None
+
+    def _find(self, conn, secret_id, operation):
+        column = "arn" if secret_id.startswith("arn:") else "name"
+        row = conn.execute(
+            f"SELECT name, arn, deletion_date FROM secrets WHERE {column} = ?",
+            (secret_id,),
+        ).fetchone()
+        if row is None or (row[2] is not None and row[2] <= time.time()):
+            raise self._not_found(operation)
+        return row
+
+    def _find_live(self, conn, secret_id, operation):
+        name, arn, deletion_date = self._find(conn, secret_id, operation)
+        if deletion_date is not None:
+            raise self._error(
+                "InvalidRequestException", _MARKED_FOR_DELETION, operation
+            )
+        return name, arn
+
+    def _add_version(self, conn, name, version_id, value, stages, now):
+        kind, data = value
+        conn.execute(
+            "INSERT INTO versions (name, version_id, stages, created, kind, value) "
+            "VALUES (?, ?, '[]', ?, ?, ?)",
+            (name, version_id, now, kind, self._seal(name, version_id, data)),
+        )
+        for stage in stages:
+            self._move_stage(conn, name, stage, version_id)
+
+    def _move_stage(self, conn, name, stage, version_id):
+        # Each label is on at most one version. Moving AWSCURRENT leaves
+        # AWSPREVIOUS on the version that held it.
+        stages = {
+            vid: json.loads(labels)
+            for vid, labels in conn.execute(
+                "SELECT version_id, stages FROM versions WHERE name = ?", (name,)
+            )
+        }
+        before = {vid: list(labels) for vid, labels in stages.items()}
+
+        holders = [
+            vid
+            for vid, labels in stages.items()
+            if stage in labels and vid != version_id
+        ]
+        for vid in holders:
+            stages[vid].remove(stage)
+
+        if stage == CURRENT_STAGE and holders:
+            for labels in stages.values():
+                if PREVIOUS_STAGE in labels:
+                    labels.remove(PREVIOUS_STAGE)
+            stages[holders[0]].append(PREVIOUS_STAGE)
+
+        if version_id is not None and stage not in stages[version_id]:
+            stages[version_id].append(stage)
+
+        for vid, labels in stages.items():
+            if labels != before[vid]:
+                conn.execute(
+                    "UPDATE versions SET stages = ? WHERE name = ? AND version_id = ?",
+                    (json.dumps(labels), name, vid),
+                )
+
+        if stage == CURRENT_STAGE:
+            conn.execute(
+                "UPDATE secrets SET current_version = ? WHERE name = ?",
+                (version_id, name),
+            )
+
+    def _stage_holder(self, conn, name, stage, operation, required=True):
+        for version_id, labels in conn.execute(
+            "SELECT version_id, stages FROM versions WHERE name = ?", (name,)
+        ):
+            if stage in json.loads(labels):
+                return version_id
+
+        if required:
+            raise self._error(
+                "ResourceNotFoundException",
+                "Secrets Manager can't find the specified secret value "
+                f"for staging label: {stage}",
+                operation,
+            )
+        return None
+
+    def _version_stages(self, conn, names):
+        stages = {name: {} for name in names}
+        for start in range(0, len(names), 500):
+            chunk = names[start : start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for name, version_id, labels in conn.execute(
+                "SELECT name, version_id, stages FROM versions "
+                f"WHERE name IN ({placeholders})",
+                chunk,
+            ):
+                labels = json.loads(labels)
+                if labels:
+                    stages[name][version_id] = labels
+        return stages
+
+    def _touch(self, conn, name, last_accessed):
+        # Like AWS, only the day of the last access is kept, so a read
+        # writes to the vault at most once a day per secret.
+        today = time.time() // _DAY * _DAY
+        if last_accessed != today:
+            conn.execute(
+                "UPDATE secrets SET last_accessed = ? WHERE name = ?", (today, name)
+            )
+
+    def _tags(self, conn, name):
+        row = conn.execute(
+            "SELECT tags FROM secrets WHERE name = ?", (name,)
+        ).fetchone()
+        return {tag["Key"]: tag.get("Value", "") for tag in json.loads(row[0])}
+
+    def _set_tags(self, conn, name, tags):
+        conn.execute(
+            "UPDATE secrets SET tags = ?, last_changed = ? WHERE name = ?",
+            (
+                json.dumps(
+                    [{"Key": key, "Value": value} for key, value in tags.items()]
+                ),
+                time.time(),
+                name,
+            ),
+        )
+
+    def _filter(self, filters, operation):
+        # Values within a filter are alternatives; every filter must match.
+        tests = []
+        for f in filters:
+            key, values = f["Key"], f["Values"]
+            if key == "name":
+                tests.append(lambda row, v=values: any(row[0].startswith(p) for p in v))
+            elif key == "description":
+                tests.append(
+                    lambda row, v=values: any((row[2] or "").startswith(p) for p in v)
+                )
+            elif key == "tag-key":
+                tests.append(
+                    lambda row, v=values: any(
+                        t["Key"].startswith(p) for t in json.loads(row[3]) for p in v
+                    )
+                )
+            elif key == "tag-value":
+                tests.append(
+                    lambda row, v=values: any(
+                        t.get("Value", "").startswith(p)
+                        for t in json.loads(row[3])
+                        for p in v
+                    )
+                )
+            else:
+                raise self._error(
+                    "InvalidParameterException", f"Invalid filter key: {key}", operation
+                )
+
+        return lambda row: all(test(row) for test in tests)
+
+    def _not_found(self, operation):
+        return self._error(
+            "ResourceNotFoundException",
+            "Secrets Manager can't find the specified secret.",
+            operation,
+        )
+
+    def _error(self, code, message, operation):
+        error_class = getattr(self.exceptions, code)
+        return error_class(
+            {
+                "Error": {"Code": code, "Message": message},
+                "ResponseMetadata": {"HTTPStatusCode": 400},
+            },
+            operation,
+        )
+
+
+_SUMMARY_COLUMNS = (
+    "name, arn, description, tags, created, last_changed, last_accessed, deletion_date"
+)
+
+
+def _summary(row, stages_key, stages):
+    (
+        name,
+        arn,
+        description,
+        tags,
+        created,
+        last_changed,
+        last_accessed,
+        deletion_date,
+    ) = row
+
+    summary = {
+        "ARN": arn,
+        "Name": name,
+        "LastChangedDate": _datetime(last_changed),
+        "Tags": json.loads(tags),
+        stages_key: stages.get(name, {}),
+        "CreatedDate": _datetime(created),
+    }
+    if description is not None:
+        summary["Description"] = description
+    if last_accessed is not None:
+        summary["LastAccessedDate"] = _datetime(last_accessed)
+    if deletion_date is not None:
+        summary["DeletedDate"] = _datetime(deletion_date)
+
+    return summary
+
+
+def _ok(response):
+    response["ResponseMetadata"] = {"HTTPStatusCode": 200, "RetryAttempts": 0}
+    return response
+
+
+def _datetime(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc)
+
+
+def _associated_data(name, version_id):
+    return f"{name}\0{version_id}".encode("utf-8")
+
+
+def _suffix():
+    return base64.b32encode(os.urandom(5)).decode("ascii")[:6].lower()
+
+
+def _create_private(path):
+    os.close(os.open(path, os.O_CREAT | os.O_WRONLY, 0o600))
+
+
+def _load_key(vault_path, new_vault):
+    key = os.environ.get(KEY_VARIABLE)
+    if key:
+        return key
+
+    key_file = os.environ.get(KEY_FILE_VARIABLE)
+    if key_file:
+        key_file = os.path.expanduser(key_file)
+    else:
+        key_file = default_key_file(vault_path)
+
+    if not os.path.exists(key_file):
+        if not new_vault:
+            raise VaultKeyError(
+                print(
+                    f"VaultKeyError: no key for the vault at {vault_path}; "
+                    f"set {KEY_VARIABLE}."
+                )
+            )
+        os.makedirs(
+            os.path.dirname(os.path.abspath(key_file)), mode=0o700, exist_ok=True
+        )
+        fd = os.open(key_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+        with os.fdopen(fd, "w", encoding="ascii") as f:
+            f.write(generate_key() + "\n")
+
+    with open(key_file, "r", encoding="ascii") as f:
+        return f.read().strip()
@@ -0,0 +1,293 @@
+"""This module contains `MetadataIndex`, a local SQLite index of secret metadata."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from src import events
+from src.client import get_client
+from src.list_secrets import iter_secret_metadata
+
+DEFAULT_MAX_STALENESS = 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS secrets (
+    name TEXT PRIMARY KEY,
+    arn TEXT,
+    last_changed REAL,
+    deleted INTEGER NOT NULL DEFAULT 0,
+    tags TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS tags (
+    name TEXT NOT NULL REFERENCES secrets(name) ON DELETE CASCADE,
+    key TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (name, key)
+);
+CREATE INDEX IF NOT EXISTS tags_by_key ON tags (key, value);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value REAL
+);
+"""
+
+
+def default_index_path(region_name: str = None) -> str:
+    """A function to return where the index for a region or local vault is kept.
+
+    Args:
+        region_name (str): the AWS region, or None for the shared client's
+        region. With the local backend, each vault file gets its own index.
+
+    Returns:
+        path (str): a path under $XDG_CACHE_HOME (or ~/.cache)/password-manager.
+    """
+
+    if region_name is None:
+        client = get_client()
+        if hasattr(client, "meta"):
+            region_name = client.meta.region_name
+        else:
+            vault_hash = hashlib.sha256(client.path.encode("utf-8")).hexdigest()[:16]
+            region_name = f"local-{vault_hash}"
+
+    cache_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_dir, "password-manager", f"index-{region_name}.sqlite3")
+
+
+class MetadataIndex:
+    """A persistent, on-disk index of secret names, ARNs, tags and change dates.
+
+    Queries are answered from SQLite. The index goes back to the API only
+    when it has never been synced, when its last sync is older than
+    `max_staleness`, or when a query asks for `refresh=True`.
+
+    ListSecrets has no "changed since" filter, so a sync walks the summary
+    listing (never DescribeSecret or the values) and rewrites only the rows
+    whose LastChangedDate, deletion state or tags differ. Secrets that have
+    disappeared from the listing are removed. Creates and deletes made
+    through this library update the index straight away.
+
+    Args:
+        path (str): the SQLite file to use. Defaults to `default_index_path()`.
+        max_staleness (float): seconds a sync is trusted for, or None to
+        only sync when asked to.
+    """
+
+    def __init__(self, path: str = None, max_staleness: float = DEFAULT_MAX_STALENESS):
+        self.path = path or default_index_path()
+        self.max_staleness = max_staleness
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA foreign_keys = ON")
+        self._db.executescript(_SCHEMA)
+
+        if self.path != ":memory:":
+            os.chmod(self.path, 0o600)
+
+        events.subscribe(self._on_change)
+
+    def sync(self) -> dict:
+        """A method to bring the index up to date with AWS Secrets Manager.
+
+        Returns:
+            counts (dict): the number of rows "added", "updated", "removed"
+            and left "unchanged".
+        """
+
+        counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        started = time.time()
+
+        with self._lock:
+            known = {
+                name: (last_changed, deleted, tags)
+                for name, last_changed, deleted, tags in self._db.execute(
+                    "SELECT name, last_changed, deleted, tags FROM secrets"
+                )
+            }
+
+        seen = set()
+
+        for secret in iter_secret_metadata(include_deleted=True):
+            name = secret["Name"]
+            seen.add(name)
+
+            row = _row(secret)
+            current = known.get(name)
+
+            if current == (row[2], row[3], row[4]):
+                counts["unchanged"] += 1
+                continue
+
+            counts["updated" if current else "added"] += 1
+            with self._lock, self._db:
+                self._upsert(row, secret.get("Tags", []))
+
+        removed = [name for name in known if name not in seen]
+        counts["removed"] = len(removed)
+
+        with self._lock, self._db:
+            self._db.executemany(
+                "DELETE FROM secrets WHERE name = ?", ((name,) for name in removed)
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES ('last_sync', ?)", (started,)
+            )
+
+        return counts
+
+    def list_secrets(
+        self, name_prefix: str = None, tags: dict = None, refresh: bool = False
+    ) -> list:
+        """A method to list secret names from the index.
+
+        Args:
+            name_prefix (str): only list secrets whose name starts with this prefix.
+            tags (dict): only list secrets carrying these tags. A value of
+            None matches any secret with the tag key.
+            refresh (bool): sync with the API before answering.
+
+        Returns:
+            secret_list (list): matching secret names, sorted, excluding
+            secrets scheduled for deletion.
+        """
+
+        self.ensure_fresh(refresh)
+
+        query = "SELECT name FROM secrets WHERE deleted = 0"
+        params = []
+
+        if name_prefix:
+            query += " AND name >= ? AND name < ?"
+            params += [name_prefix, name_prefix + "\U0010ffff"]
+
+        for key, value in (tags or {}).items():
+            if value is None:
+                query += " AND name IN (SELECT name FROM tags WHERE key = ?)"
+                params.append(key)
+            else:
+                query += (
+                    " AND name IN (SELECT name FROM tags WHERE key = ? AND value = ?)"
+                )
+                params += [key, value]
+
+        query += " ORDER BY name"
+
+        with self._lock:
+            return [name for (name,) in self._db.execute(query, params)]
+
+    def get_metadata(self, secret_id: str, refresh: bool = False) -> dict:
+        """A method to look up one secret's indexed metadata.
+
+        Args:
+            secret_id (str): the name of the secret.
+            refresh (bool): sync with the API before answering.
+
+        Returns:
+            metadata (dict): the secret's "Name", "ARN", "LastChangedDate"
+            (a POSIX timestamp), "Deleted" and "Tags", or None if it is not
+            in the index.
+        """
+
+        self.ensure_fresh(refresh)
+
+        with self._lock:
+            row = self._db.execute(
+                "SELECT name, arn, last_changed, deleted, tags "
+                "FROM secrets WHERE name = ?",
+                (secret_id,),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return {
+            "Name": row[0],
+            "ARN": row[1],
+            "LastChangedDate": row[2],
+            "Deleted": bool(row[3]),
+            "Tags": json.loads(row[4]),
+        }
+
+    def ensure_fresh(self, refresh: bool = False):
+        """A method to sync if asked to, or if the last sync is older than allowed.
+
+        Args:
+            refresh (bool): sync regardless of when the last sync was.
+        """
+
+        last_sync = self.last_sync
+        if (
+            refresh
+            or last_sync is None
+            or (
+                self.max_staleness is not None
+                and time.time() - last_sync > self.max_staleness
+            )
+        ):
+            self.sync()
+
+    @property
+    def last_sync(self) -> float:
+        """float: the POSIX time the last sync started, or None if never synced."""
+
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM sync_state WHERE key = 'last_sync'"
+            ).fetchone()
+        return row[0] if row else None
+
+    def close(self):
+        """A method to stop listening for changes and close the database."""
+
+        events.unsubscribe(self._on_change)
+        with self._lock:
+            self._db.close()
+
+    def _on_change(self, action, secret_id):
+        with self._lock, self._db:
+            if action == events.DELETED:
+                self._db.execute(
+                    "UPDATE secrets SET deleted = 1, last_changed = ? WHERE name = ?",
+                    (time.time(), secret_id),
+                )
+            else:
+                self._db.execute(
+                    "INSERT INTO secrets (name, last_changed) VALUES (?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET deleted = 0, "
+                    "last_changed = excluded.last_changed",
+                    (secret_id, time.time()),
+                )
+
+    def _upsert(self, row, tags):
+        self._db.execute("INSERT OR REPLACE INTO secrets VALUES (?, ?, ?, ?, ?)", row)
+        self._db.execute("DELETE FROM tags WHERE name = ?", (row[0],))
+        self._db.executemany(
+            "INSERT OR REPLACE INTO tags VALUES (?, ?, ?)",
+            ((row[0], tag["Key"], tag.get("Value")) for tag in tags),
+        )
+
+
+def _row(secret):
+    last_changed = secret.get("LastChangedDate") or secret.get("CreatedDate")
+    if hasattr(last_changed, "timestamp"):
+        last_changed = last_changed.timestamp()
+
+    tags = {tag["Key"]: tag.get("Value") for tag in secret.get("Tags", [])}
+
+    return (
+        secret["Name"],
+        secret.get("ARN"),
+        last_changed,
+        int("DeletedDate" in secret),
+        json.dumps(tags, sort_keys=True),
+    )
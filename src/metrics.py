@@ -0,0 +1,440 @@
+"""This module contains the optional metrics layer for operations and API calls.
+
+It records timings and counts, and sends them to configurable sinks.
+
+Nothing is recorded until `enable()` is called. Until then `@instrument`
+costs one global lookup per call and no botocore hooks are registered.
+"""
+
+import atexit
+import functools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+
+PREFIX = "password_manager_"
+
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536)
+
+_registry = None
+_local = threading.local()
+_atexit_registered = False
+
+
+class Histogram:
+    """Counts of observations per bucket upper bound, with their sum."""
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list:
+        """list: [upper bound, observations at or below it] pairs, up to "+Inf"."""
+
+        total, pairs = 0, []
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            total += count
+            pairs.append([bound, total])
+        return pairs
+
+
+class Registry:
+    """Thread-safe labelled counters and histograms that forward measurements to sinks.
+
+    Args:
+        sinks (list): objects with `emit(event)` and `flush(snapshot)`
+        methods, such as CallbackSink, JsonLogSink or PrometheusTextfileSink.
+    """
+
+    def __init__(self, sinks: list = None):
+        self.sinks = list(sinks or [])
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def increment(self, name: str, value: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+        self._emit("counter", name, value, labels)
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                buckets = SIZE_BUCKETS if name.endswith("_bytes") else LATENCY_BUCKETS
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+        self._emit("histogram", name, value, labels)
+
+    def snapshot(self) -> dict:
+        """A method to copy every metric.
+
+        Returns:
+            snapshot (dict): "counters", mapping each name to a list of
+            {"labels", "value"}, and "histograms", mapping each name to a
+            list of {"labels", "buckets", "sum", "count"}.
+        """
+
+        snapshot = {"counters": {}, "histograms": {}}
+
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                snapshot["counters"].setdefault(name, []).append(
+                    {"labels": dict(labels), "value": value}
+                )
+            for (name, labels), histogram in sorted(
+                self._histograms.items(), key=lambda item: item[0]
+            ):
+                snapshot["histograms"].setdefault(name, []).append(
+                    {
+                        "labels": dict(labels),
+                        "buckets": histogram.cumulative(),
+                        "sum": histogram.sum,
+                        "count": histogram.count,
+                    }
+                )
+
+        return snapshot
+
+    def flush(self):
+        """A method to hand a snapshot to every sink, e.g. to rewrite a metrics file."""
+
+        snapshot = self.snapshot()
+        for sink in self.sinks:
+            sink.flush(snapshot)
+
+    def _emit(self, kind, name, value, labels):
+        if not self.sinks:
+            return
+
+        event = {
+            "time": time.time(),
+            "type": kind,
+            "name": name,
+            "value": value,
+            "labels": labels,
+        }
+        for sink in self.sinks:
+            sink.emit(event)
+
+
+class CallbackSink:
+    """Calls a function with every measurement, as an event dict.
+
+    Args:
+        callback (callable): called with {"time", "type", "name", "value", "labels"}.
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def emit(self, event: dict):
+        self.callback(event)
+
+    def flush(self, snapshot: dict):
+        pass
+
+
+class JsonLogSink:
+    """Writes every measurement as one JSON line.
+
+    Args:
+        stream (TextIO): where to write, defaulting to stderr.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stderr
+        self._lock = threading.Lock()
+
+    def emit(self, event: dict):
+        line = json.dumps(event) + "\n"
+        with self._lock:
+            self.stream.write(line)
+
+    def flush(self, snapshot: dict):
+        with self._lock:
+            self.stream.flush()
+
+
+class PrometheusTextfileSink:
+    """Rewrites a Prometheus text-format file on every flush.
+
+    The file is meant for node_exporter's textfile collector.
+
+    The file is replaced atomically, so the collector never reads a
+    partial write.
+
+    Args:
+        path (str): the file to write, e.g. ".../textfile/password_manager.prom".
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def emit(self, event: dict):
+        pass
+
+    def flush(self, snapshot: dict):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(
+            dir=directory, prefix=".metrics-", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(to_prometheus(snapshot))
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+
+def to_prometheus(snapshot: dict) -> str:
+    """A function to render a `Registry.snapshot()` in the Prometheus text format.
+
+    Args:
+        snapshot (dict): the metrics to render.
+
+    Returns:
+        text (str): the exposition text, one sample per line.
+    """
+
+    lines = []
+
+    for name, samples in snapshot["counters"].items():
+        lines.append(f"# TYPE {PREFIX}{name} counter")
+        for sample in samples:
+            lines.append(f"{PREFIX}{name}{_labels(sample['labels'])} {sample['value']}")
+
+    for name, samples in snapshot["histograms"].items():
+        lines.append(f"# TYPE {PREFIX}{name} histogram")
+        for sample in samples:
+            labels = sample["labels"]
+            for bound, count in sample["buckets"]:
+                lines.append(
+                    f"{PREFIX}{name}_bucket{_labels({**labels, 'le': bound})} {count}"
+                )
+            lines.append(f"{PREFIX}{name}_sum{_labels(labels)} {sample['sum']}")
+            lines.append(f"{PREFIX}{name}_count{_labels(labels)} {sample['count']}")
+
+    return "\n".join(lines) + "\n"
+
+
+def enable(*sinks) -> Registry:
+    """A function to start recording metrics.
+
+    Cached clients are discarded so that every client from now on has the
+    botocore hooks. The sinks are flushed again when the process exits.
+
+    Args:
+        *sinks: where to send measurements, e.g. CallbackSink(print).
+
+    Returns:
+        registry (Registry): the registry now in use.
+    """
+
+    global _registry, _atexit_registered
+
+    from src.client import reset_clients
+
+    _registry = Registry(sinks)
+    reset_clients()
+
+    if not _atexit_registered:
+        atexit.register(flush)
+        _atexit_registered = True
+
+    return _registry
+
+
+def disable():
+    """A function to flush the sinks and stop recording metrics."""
+
+    global _registry
+
+    from src.client import reset_clients
+
+    flush()
+    _registry = None
+    reset_clients()
+
+
+def enabled() -> bool:
+    """A function to report whether metrics are being recorded."""
+
+    return _registry is not None
+
+
+def get_registry() -> Registry:
+    """A function to return the registry in use, or None when metrics are disabled."""
+
+    return _registry
+
+
+def increment(name: str, value: float = 1, **labels):
+    """A function to add to a counter, if metrics are enabled."""
+
+    registry = _registry
+    if registry is not None:
+        registry.increment(name, value, **labels)
+
+
+def observe(name: str, value: float, **labels):
+    """A function to record a histogram observation, if metrics are enabled."""
+
+    registry = _registry
+    if registry is not None:
+        registry.observe(name, value, **labels)
+
+
+def flush():
+    """A function to flush the sinks, if metrics are enabled."""
+
+    registry = _registry
+    if registry is not None:
+        registry.flush()
+
+
+def instrument(operation: str):
+    """A decorator to count and time an operation and record the class of its errors.
+
+    Args:
+        operation (str): the label to record the operation under.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            registry = _registry
+            if registry is None:
+                return func(*args, **kwargs)
+
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                registry.increment(
+                    "operation_calls_total", operation=operation, outcome="error"
+                )
+                registry.increment(
+                    "operation_errors_total",
+                    operation=operation,
+                    error=type(e).__name__,
+                )
+                raise
+            finally:
+                registry.observe(
+                    "operation_duration_seconds",
+                    time.perf_counter() - start,
+                    operation=operation,
+                )
+
+            registry.increment(
+                "operation_calls_total", operation=operation, outcome="ok"
+            )
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def instrument_client(client):
+    """A function to hook a client's botocore events, if metrics are enabled.
+
+    Each API call is split into request time (serialising, signing, and
+    the network round trip) and parse time, and its request and response
+    sizes and any error code are recorded.
+
+    Args:
+        client: a boto3 secretsmanager client.
+    """
+
+    if _registry is None:
+        return
+
+    events = client.meta.events
+    events.register("before-call.secrets-manager", _before_call)
+    events.register("before-parse.secrets-manager", _before_parse)
+    events.register("after-call.secrets-manager", _after_call)
+    events.register("after-call-error.secrets-manager", _after_call_error)
+
+
+def _before_call(model, params, context, **kwargs):
+    context["metrics_start"] = time.perf_counter()
+    body = params.get("body") or b""
+    observe("api_request_bytes", len(body), api=model.name)
+
+
+def _before_parse(**kwargs):
+    # before-parse carries no request context; it runs on the calling thread.
+    _local.parse_start = time.perf_counter()
+
+
+def _after_call(http_response, parsed, model, context, **kwargs):
+    registry = _registry
+    start = context.get("metrics_start")
+    if registry is None or start is None:
+        return
+
+    now = time.perf_counter()
+    parse_start = getattr(_local, "parse_start", None) or now
+    _local.parse_start = None
+
+    api = model.name
+    registry.increment("api_calls_total", api=api)
+    registry.observe("api_request_seconds", parse_start - start, api=api)
+    registry.observe("api_parse_seconds", now - parse_start, api=api)
+    registry.observe("api_response_bytes", len(http_response.content or b""), api=api)
+
+    if http_response.status_code >= 300:
+        code = parsed.get("Error", {}).get("Code", "Unknown")
+        registry.increment("api_errors_total", api=api, code=code)
+
+        from src.rate_limit import THROTTLING_ERRORS
+
+        if code in THROTTLING_ERRORS:
+            registry.increment("api_throttles_total", api=api)
+
+
+def _after_call_error(exception, context, **kwargs):
+    increment("api_connection_errors_total", error=type(exception).__name__)
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
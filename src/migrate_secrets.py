@@ -0,0 +1,82 @@
+"""This module contains the definitions for `migrate_secret()` and `migrate_secrets()`.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from src import events, rate_limit
+from src.client import get_client
+from src.get_secret import get_secret
+from src.list_secrets import iter_secrets
+from src.secret_codec import decode_secret, encode_secret, is_legacy
+
+MIGRATED = "migrated"
+CURRENT = "current"
+FAILED = "failed"
+
+DEFAULT_MAX_WORKERS = 8
+
+
+def migrate_secret(secret_id: str) -> bool:
+    """A function to rewrite a secret stored in the legacy string format as JSON.
+
+    Args:
+        secret_id (str): the name of the secret to migrate.
+
+    Returns:
+        migrated (bool): True if a new JSON version was written, False if
+        the secret was already in a current format.
+
+    Raises:
+        BlankArgumentError: if passed a blank secret_id.
+        ResourceNotFoundException: if secret not found in AWS Secrets Manager.
+        SecretFormatError: if the stored value cannot be decoded.
+    """
+
+    secret_string = get_secret(secret_id)
+
+    if not is_legacy(secret_string):
+        return False
+
+    fields = decode_secret(secret_string)
+
+    sm = get_client()
+    rate_limit.call(
+        "PutSecretValue",
+        sm.put_secret_value,
+        SecretId=secret_id,
+        SecretString=encode_secret(fields["user_id"], fields["password"]),
+    )
+
+    events.notify(events.UPDATED, secret_id)
+
+    return True
+
+
+def migrate_secrets(
+    secret_ids: list = None, max_workers: int = DEFAULT_MAX_WORKERS
+) -> dict:
+    """A function to migrate many secrets from the legacy string format concurrently.
+
+    Args:
+        secret_ids (list): the secrets to migrate. Defaults to every secret.
+        max_workers (int): the maximum number of secrets migrated at once.
+
+    Returns:
+        results (dict): a mapping of secret name to "migrated", "current"
+        or "failed".
+    """
+
+    if secret_ids is None:
+        secret_ids = list(iter_secrets())
+
+    def migrate(secret_id):
+        try:
+            return MIGRATED if migrate_secret(secret_id) else CURRENT
+        except Exception:
+            return FAILED
+
+    if not secret_ids:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(secret_ids))) as executor:
+        return dict(zip(secret_ids, executor.map(migrate, secret_ids)))
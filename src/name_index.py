@@ -0,0 +1,161 @@
+"""This module contains `NameIndex`, an in-memory prefix index of secret names."""
+
+import bisect
+import difflib
+import threading
+from fnmatch import fnmatchcase
+
+from src import events
+from src.list_secrets import iter_secrets
+
+_GLOB_CHARACTERS = "*?["
+_NEIGHBOURS = 32
+_FULL_SCAN_LIMIT = 5000
+
+
+class NameIndex:
+    """A sorted array of secret names answering prefix, glob and fuzzy queries locally.
+
+    Prefix lookups are two binary searches, so they stay fast with tens of
+    thousands of names. Creates and deletes made through this library are
+    applied incrementally.
+
+    Args:
+        names (iterable): the names to index. Defaults to none.
+    """
+
+    def __init__(self, names=()):
+        self._lock = threading.Lock()
+        self._names = sorted(set(names))
+
+        events.subscribe(self._on_change)
+
+    @classmethod
+    def from_listing(cls, **filters):
+        """A method to build an index from the paginated AWS Secrets Manager listing.
+
+        Args:
+            **filters: any of the keyword arguments accepted by `iter_secrets()`.
+
+        Returns:
+            index (NameIndex): an index of every listed name.
+        """
+
+        return cls(iter_secrets(**filters))
+
+    def complete(self, prefix: str, limit: int = None) -> list:
+        """A method to return the names starting with a prefix, in order.
+
+        Args:
+            prefix (str): the text typed so far.
+            limit (int): the most names to return, or None for all of them.
+
+        Returns:
+            names (list): the matching names.
+        """
+
+        with self._lock:
+            start = bisect.bisect_left(self._names, prefix)
+            end = bisect.bisect_left(self._names, prefix + "\U0010ffff", lo=start)
+            if limit is not None:
+                end = min(end, start + limit)
+            return self._names[start:end]
+
+    def search(self, pattern: str) -> list:
+        """A method to return names matching a glob pattern or containing plain text.
+
+        A pattern with no glob characters matches any name containing it.
+        A glob's literal leading characters narrow the scan to one prefix
+        range before matching.
+
+        Args:
+            pattern (str): a glob such as "prod/*/db", or plain text.
+
+        Returns:
+            names (list): the matching names, in order.
+        """
+
+        if not any(c in pattern for c in _GLOB_CHARACTERS):
+            with self._lock:
+                return [name for name in self._names if pattern in name]
+
+        literal_prefix = pattern
+        for i, character in enumerate(pattern):
+            if character in _GLOB_CHARACTERS:
+                literal_prefix = pattern[:i]
+                break
+
+        return [
+            name for name in self.complete(literal_prefix) if fnmatchcase(name, pattern)
+        ]
+
+    def suggest(self, name: str, n: int = 3, cutoff: float = 0.6) -> list:
+        """A method to suggest indexed names close to a mistyped one.
+
+        Large indexes compare only against names sorted near the input or
+        sharing its first characters, which keeps suggestions quick.
+
+        Args:
+            name (str): the name that was not found.
+            n (int): the most suggestions to return.
+            cutoff (float): the lowest similarity (0-1) worth suggesting.
+
+        Returns:
+            names (list): the closest names, best first.
+        """
+
+        with self._lock:
+            if len(self._names) <= _FULL_SCAN_LIMIT:
+                candidates = list(self._names)
+            else:
+                position = bisect.bisect_left(self._names, name)
+                candidates = set(
+                    self._names[max(0, position - _NEIGHBOURS) : position + _NEIGHBOURS]
+                )
+
+        if isinstance(candidates, set):
+            for length in (2, 1):
+                candidates.update(self.complete(name[:length], limit=_FULL_SCAN_LIMIT))
+
+        return difflib.get_close_matches(name, candidates, n=n, cutoff=cutoff)
+
+    def add(self, name: str):
+        """A method to add a name to the index, keeping it sorted."""
+
+        with self._lock:
+            position = bisect.bisect_left(self._names, name)
+            if position == len(self._names) or self._names[position] != name:
+                self._names.insert(position, name)
+
+    def remove(self, name: str):
+        """A method to remove a name from the index, if present."""
+
+        with self._lock:
+            position = bisect.bisect_left(self._names, name)
+            if position < len(self._names) and self._names[position] == name:
+                del self._names[position]
+
+    def completer(self, text: str, state: int):
+        """A readline completer returning the state-th name that starts with text."""
+
+        matches = self.complete(text, limit=state + 1)
+        return matches[state] if state < len(matches) else None
+
+    def close(self):
+        """A method to stop listening for changes."""
+
+        events.unsubscribe(self._on_change)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name):
+        with self._lock:
+            position = bisect.bisect_left(self._names, name)
+            return position < len(self._names) and self._names[position] == name
+
+    def _on_change(self, action, secret_id):
+        if action == events.DELETED:
+            self.remove(secret_id)
+        else:
+            self.add(secret_id)
@@ -1,23 +1,49 @@
 """This module contains the definition for `password_manager()`."""
 
+import contextlib
+import os
+import sys
+
+try:
+    import readline
+except ImportError:
+    readline = None
+
+from src.client import prewarm as prewarm_client
 from src.create_secret import create_secret
 from src.delete_secret import delete_secret
+from src.delete_secrets import delete_secrets
+from src.export_secrets import write_secret_file
 from src.get_secret import get_secret
+from src.import_secrets import detect_format, import_secrets
 from src.list_secrets import list_secrets
-from src.write_secret import write_secret
+from src.metadata_index import MetadataIndex
+from src.name_index import NameIndex
 
 
-def password_manager():
+def password_manager(prewarm: bool = False):
     """
     A function to manage user_names and passwords in AWS Secrets Manager.
 
+    boto3 is only loaded by the first operation. With prewarm set, it is
+    loaded on a background thread while the user reads the menu instead.
 
+    Args:
+        prewarm (bool): whether to create the AWS client in the background.
     """
     print("\n\nWelome to Password Manager 🕵️")
     print("-----------------------------")
 
+    if prewarm:
+        prewarm_client()
+
+    _enable_completion()
+
     while True:
-        print("\nPlease specify [e]ntry, [r]etrieval, [d]eletion, [l]isting or e[x]it:")
+        print(
+            "\nPlease specify [e]ntry, [r]etrieval, [d]eletion, [l]isting, [i]mport, "
+            "[b]ulk deletion, [s]earch or e[x]it:"
+        )
 
         choice = input("Enter your choice: ")
 
@@ -39,16 +65,19 @@ def password_manager():
                 print("❌ Secret not saved.")
 
         elif choice == "r":
+            secret_id = ""
             try:
                 secret_id = input("Specify secret to retrieve: ")
                 secret_string = get_secret(secret_id)
-                write_secret(secret_id, secret_string)
-                print(f"✅ Secret stored in local file {secret_id}.txt")
+                path = write_secret_file(".", secret_id, secret_string)
+                print(f"✅ Secret stored in local file {os.path.basename(path)}")
 
             except Exception:
                 print("❌ Secret not retrieved.")
+                _print_suggestions(secret_id)
 
         elif choice == "d":
+            secret_id = ""
             try:
                 secret_id = input("Specify secret to delete: ")
                 response = delete_secret(secret_id)
@@ -57,15 +86,77 @@ def password_manager():
 
             except Exception:
                 print("❌ Unable to delete.")
+                _print_suggestions(secret_id)
 
         elif choice == "l":
-            secret_list = list_secrets()
-            if len(secret_list) > 0:
-                print(f"{len(secret_list)} secret(s) available: ")
-                for secret in secret_list:
+            try:
+                secret_list = _list_secrets()
+                if len(secret_list) > 0:
+                    print(f"{len(secret_list)} secret(s) available: ")
+                    for secret in secret_list:
+                        print(f"> {secret}")
+                else:
+                    print("0 secrets available.")
+
+            except Exception:
+                print("❌ Unable to list.")
+
+        elif choice == "i":
+            try:
+                path = input("Specify a CSV or JSON-lines file to import: ")
+                report = sys.stdout
+                # create_secret() prints its own diagnostics; keep them out
+                # of the JSON-lines report.
+                with open(path, "r", encoding="utf-8", newline="") as f:
+                    with contextlib.redirect_stdout(sys.stderr):
+                        summary = import_secrets(
+                            f, fmt=detect_format(path), report=report
+                        )
+                print(
+                    f"✅ {summary['created']} created, "
+                    f"{summary['already exists']} already existed, "
+                    f"{summary['invalid']} invalid, {summary['failed']} failed."
+                )
+
+            except Exception:
+                print("❌ Unable to import.")
+
+        elif choice == "b":
+            try:
+                selector = input("Specify a name prefix or glob pattern to delete: ")
+                if any(c in selector for c in "*?["):
+                    selection = {"pattern": selector}
+                else:
+                    selection = {"name_prefix": selector}
+
+                targets = delete_secrets(**selection, dry_run=True)
+                if not targets:
+                    print("No matching secrets.")
+                    continue
+
+                confirm = input(f"Delete {len(targets)} secret(s)? [y/n]: ")
+
+                if confirm == "y":
+                    results = delete_secrets(list(targets))
+                    deleted = list(results.values()).count("deleted")
+                    print(f"✅ Deleted {deleted} of {len(results)} secret(s).")
+                    for secret_id, status in results.items():
+                        if status != "deleted":
+                            print(f"❌ {secret_id}: {status}")
+
+            except Exception:
+                print("❌ Unable to delete.")
+
+        elif choice == "s":
+            try:
+                pattern = input("Specify a search pattern: ")
+                matches = _get_name_index().search(pattern)
+                print(f"{len(matches)} secret(s) found: ")
+                for secret in matches:
                     print(f"> {secret}")
-            else:
-                print("0 secrets available.")
+
+            except Exception:
+                print("❌ Unable to search.")
 
         elif choice == "x":
             print("\nThankyou for using Password Manager. Goodbye. 🕵️")
@@ -74,9 +165,80 @@ def password_manager():
 
         else:
             print(
-                "❌ Invalid input. Please specify [e]ntry, [r]etrieval, [d]eletion, [l]isting or e[x]it:"
+                "❌ Invalid input. Please specify [e]ntry, [r]etrieval, [d]eletion, "
+                "[l]isting, [i]mport, [b]ulk deletion, [s]earch or e[x]it:"
             )
 
 
+_index = None
+
+
+def _list_secrets():
+    # Listings are answered from the local metadata index, which only goes
+    # back to the API once its last sync is older than its staleness bound.
+    # If the index fails for any reason, list straight from the API.
+    global _index
+
+    try:
+        if _index is None:
+            _index = MetadataIndex()
+        return _index.list_secrets()
+
+    except Exception:
+        return list_secrets()
+
+
+_name_index = None
+
+
+def _get_name_index():
+    # Built once, on first use, from the local listing; kept current
+    # afterwards by the change events.
+    global _name_index
+
+    if _name_index is None:
+        _name_index = NameIndex(_list_secrets())
+    return _name_index
+
+
+def _enable_completion():
+    if readline is None:
+        return
+
+    readline.set_completer(lambda text, state: _get_name_index().completer(text, state))
+    readline.set_completer_delims(" \t\n")
+    readline.parse_and_bind("tab: complete")
+
+
+def _print_suggestions(secret_id):
+    if not secret_id:
+        return
+
+    try:
+        index = _get_name_index()
+    except Exception:
+        return
+
+    if secret_id not in index:
+        suggestions = index.suggest(secret_id)
+        if suggestions:
+            print(f"Did you mean: {', '.join(suggestions)}?")
+
+
+def main(argv: list = None) -> int:
+    """A function to run the command line interface; see `src.cli.main()`.
+
+    Args:
+        argv (list): the command line arguments, defaulting to sys.argv[1:].
+
+    Returns:
+        exit_code (int): 0 on success, 1 if any command failed.
+    """
+
+    from src.cli import main as cli_main
+
+    return cli_main(argv)
+
+
 if __name__ == "__main__":
-    password_manager()
+    sys.exit(main())
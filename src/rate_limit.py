@@ -0,0 +1,307 @@
+"""This module contains the shared rate control and retry layer for every operation."""
+
+import random
+import threading
+import time
+import uuid
+
+from src import metrics
+
+# Requests per second, from the Secrets Manager service quotas.
+DEFAULT_RATES = {
+    "GetSecretValue": 10000,
+    "DescribeSecret": 10000,
+    "BatchGetSecretValue": 100,
+    "ListSecrets": 100,
+    "CreateSecret": 50,
+    "PutSecretValue": 50,
+    "UpdateSecret": 50,
+    "DeleteSecret": 50,
+}
+DEFAULT_RATE = 50
+
+THROTTLING_ERRORS = {
+    "ThrottlingException",
+    "Throttling",
+    "TooManyRequestsException",
+    "RequestLimitExceeded",
+}
+TRANSIENT_ERRORS = {
+    "InternalServiceError",
+    "InternalFailure",
+    "ServiceUnavailable",
+    "RequestTimeout",
+}
+TRANSIENT_EXCEPTIONS = {
+    "ConnectionClosedError",
+    "ConnectTimeoutError",
+    "EndpointConnectionError",
+    "ReadTimeoutError",
+}
+# APIs that change data, which a retry must send with the same token so that
+# a request the service already applied is not applied a second time.
+IDEMPOTENT_OPERATIONS = {"CreateSecret", "PutSecretValue"}
+
+
+class TokenBucket:
+    """A thread-safe token bucket that callers block on until a request may be sent.
+
+    Tokens are reserved under the lock and waited for outside it, so
+    concurrent callers queue up at the bucket's rate rather than spinning.
+
+    Args:
+        rate (float): tokens added per second.
+        capacity (float): the most tokens that can accumulate. Defaults to
+        one second's worth.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float = None,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be positive.")
+
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """A method to take one token, sleeping until it is available.
+
+        Returns:
+            wait (float): the number of seconds spent waiting.
+        """
+
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+
+        if wait:
+            self._sleep(wait)
+
+        return wait
+
+    def set_rate(self, rate: float):
+        """A method to change the refill rate, keeping the tokens already earned."""
+
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self.rate = rate
+
+
+class RateController:
+    """Per-API token buckets with retries and AIMD rate adaptation, shared by threads.
+
+    Each call waits for a token from its API's bucket. Throttling and
+    transient errors are retried with exponential backoff and full jitter.
+    A throttle multiplies that API's rate by `decrease_factor`; each
+    success adds `increase_step` back, up to the configured rate.
+
+    Args:
+        rates (dict): requests per second for each API name, overriding
+        DEFAULT_RATES.
+        max_attempts (int): the most times one call is tried.
+        base_delay (float): the backoff ceiling in seconds for the first retry.
+        max_delay (float): the largest backoff ceiling in seconds.
+        decrease_factor (float): the multiplier applied to a rate on a throttle.
+        increase_step (float): requests per second added back on a success.
+        min_rate (float): the lowest rate adaptation will go to.
+    """
+
+    def __init__(
+        self,
+        rates: dict = None,
+        max_attempts: int = 5,
+        base_delay: float = 0.1,
+        max_delay: float = 5.0,
+        decrease_factor: float = 0.5,
+        increase_step: float = 1.0,
+        min_rate: float = 1.0,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1.")
+
+        self.rates = {**DEFAULT_RATES, **(rates or {})}
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+        self.min_rate = min_rate
+
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._stats = {}
+
+    def call(self, operation: str, func, *args, **kwargs):
+        """A method to call an API function under the rate limit, retrying failures.
+
+        Args:
+            operation (str): the API name, e.g. "GetSecretValue".
+            func (callable): the client method to call.
+            *args, **kwargs: passed through to func.
+
+        Returns:
+            response: whatever func returns.
+
+        Raises:
+            Exception: the last error from func, once it is not retryable or
+            max_attempts has been reached.
+        """
+
+        bucket, stats = self._bucket(operation)
+
+        if operation in IDEMPOTENT_OPERATIONS:
+            # botocore generates a fresh token per call, so without this a
+            # retry after a read timeout could create a second version.
+            kwargs.setdefault("ClientRequestToken", str(uuid.uuid4()))
+
+        for attempt in range(self.max_attempts):
+            bucket.acquire()
+            self._count(stats, "calls")
+
+            try:
+                response = func(*args, **kwargs)
+
+            except Exception as e:
+                # Errors are classified by name so that botocore is not
+                # imported before the first client is created.
+                code = _error_code(e)
+                if code in THROTTLING_ERRORS:
+                    self._count(stats, "throttles")
+                    self._adapt(operation, bucket, throttled=True)
+                elif code not in TRANSIENT_ERRORS:
+                    raise
+                if attempt == self.max_attempts - 1:
+                    self._count(stats, "failures")
+                    metrics.increment("api_retries_exhausted_total", api=operation)
+                    raise
+
+            else:
+                self._adapt(operation, bucket, throttled=False)
+                return response
+
+            self._count(stats, "retries")
+            metrics.increment("api_retries_total", api=operation)
+            self._sleep(self._backoff(attempt))
+
+    @property
+    def stats(self) -> dict:
+        """dict: per-API counts of calls, retries, throttles and failures, and rate."""
+
+        with self._lock:
+            return {
+                operation: {**counts, "rate": self._buckets[operation][0].rate}
+                for operation, counts in self._stats.items()
+            }
+
+    def _bucket(self, operation):
+        # The bucket and its stats are stored as one entry so that a thread
+        # on the unlocked fast path never sees one without the other.
+        entry = self._buckets.get(operation)
+        if entry is not None:
+            return entry
+
+        with self._lock:
+            if operation not in self._buckets:
+                stats = {
+                    "calls": 0,
+                    "retries": 0,
+                    "throttles": 0,
+                    "failures": 0,
+                }
+                self._stats[operation] = stats
+                self._buckets[operation] = (
+                    TokenBucket(
+                        self.rates.get(operation, DEFAULT_RATE),
+                        clock=self._clock,
+                        sleep=self._sleep,
+                    ),
+                    stats,
+                )
+            return self._buckets[operation]
+
+    def _count(self, stats, name):
+        with self._lock:
+            stats[name] += 1
+
+    def _adapt(self, operation, bucket, throttled):
+        ceiling = self.rates.get(operation, DEFAULT_RATE)
+        if throttled:
+            rate = max(self.min_rate, bucket.rate * self.decrease_factor)
+        elif bucket.rate < ceiling:
+            rate = min(ceiling, bucket.rate + self.increase_step)
+        else:
+            return
+        bucket.set_rate(rate)
+
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+def _error_code(error):
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):
+        return response.get("Error", {}).get("Code")
+
+    for cls in type(error).__mro__:
+        if cls.__name__ in TRANSIENT_EXCEPTIONS:
+            return "RequestTimeout"
+
+    return None
+
+
+_controller = RateController()
+
+
+def get_rate_controller() -> RateController:
+    """A function to return the RateController shared by every operation."""
+
+    return _controller
+
+
+def set_rate_controller(controller: RateController):
+    """A function to replace the RateController shared by every operation.
+
+    Args:
+        controller (RateController): the controller to use from now on.
+    """
+
+    global _controller
+    _controller = controller
+
+
+def call(operation: str, func, *args, **kwargs):
+    """A function to call an API function through the shared RateController.
+
+    Args:
+        operation (str): the API name, e.g. "GetSecretValue".
+        func (callable): the client method to call.
+        *args, **kwargs: passed through to func.
+
+    Returns:
+        response: whatever func returns.
+    """
+
+    return _controller.call(operation, func, *args, **kwargs)
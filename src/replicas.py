@@ -0,0 +1,267 @@
+"""This module contains `ReplicaRouter` and `replicate_secret()`.
+
+`ReplicaRouter` reads replicated secrets from the fastest healthy region.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src import metrics, rate_limit
+from src.client import get_client
+from src.get_secret import secret_string_from
+from src.secret_codec import decode_secret
+from src.validation import validate_secret_id
+
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_COOLDOWN = 30.0
+DEFAULT_SMOOTHING = 0.3
+
+# Answers from a working region: another region may still hold the secret
+# (replication lag, a per-region KMS key), but this one is not unhealthy.
+ANSWERED_ERRORS = {
+    "ResourceNotFoundException",
+    "InvalidRequestException",
+    "InvalidParameterException",
+    "DecryptionFailure",
+    "AccessDeniedException",
+}
+
+
+def replicate_secret(secret_id: str, regions: list) -> list:
+    """A function to replicate an existing secret to more regions.
+
+    Args:
+        secret_id (str): the name or ARN of the primary secret.
+        regions (list): the regions to add replicas in.
+
+    Returns:
+        statuses (list): the ReplicationStatus of every replica, each with
+        its "Region" and "Status".
+
+    Raises:
+        BlankArgumentError: if passed a blank secret_id.
+        ResourceNotFoundException: if the secret is not found.
+    """
+
+    validate_secret_id(secret_id)
+
+    sm = get_client()
+    response = rate_limit.call(
+        "ReplicateSecretToRegions",
+        sm.replicate_secret_to_regions,
+        SecretId=secret_id,
+        AddReplicaRegions=[{"Region": region} for region in regions],
+    )
+    return response["ReplicationStatus"]
+
+
+class ReplicaRouter:
+    """Reads secrets from the fastest healthy region, failing over on errors.
+
+    Each region has its own pooled client from `get_client()`. Latency is
+    a moving average of successful calls, seeded on first use by probing
+    every region at once. Reads go to the healthy region with the lowest
+    latency and move on to the next on any error or timeout. A region that
+    fails `failure_threshold` times in a row is skipped for `cooldown`
+    seconds, then tried again.
+
+    Calls are rate limited per region and not retried within a region.
+    Timeouts are those of the clients; lower them with
+    `configure_clients()` to fail over sooner.
+
+    Args:
+        regions (list): the regions holding the secret or its replicas, in
+        order of preference before any latency is known.
+        failure_threshold (int): consecutive failures before a region is skipped.
+        cooldown (float): seconds a failing region is skipped for.
+        smoothing (float): the weight of each new latency in the moving average.
+    """
+
+    def __init__(
+        self,
+        regions: list,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        cooldown: float = DEFAULT_COOLDOWN,
+        smoothing: float = DEFAULT_SMOOTHING,
+        clock=time.monotonic,
+    ):
+        if not regions:
+            raise ValueError("regions cannot be empty.")
+
+        self.regions = list(dict.fromkeys(regions))
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.smoothing = smoothing
+
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._health = {region: _RegionHealth() for region in self.regions}
+        # Quotas are per region, and a failing region is better left for the
+        # next one than retried, so each region gets a single-attempt controller.
+        self._controllers = {
+            region: rate_limit.RateController(max_attempts=1) for region in self.regions
+        }
+        self._probed = False
+
+    @metrics.instrument("replica_get_secret")
+    def get_secret(self, secret_id: str) -> str:
+        """A method to retrieve a secret's string from the best available region.
+
+        Args:
+            secret_id (str): the name of the secret to be retrieved.
+
+        Returns:
+            secret_string (str): the secret's string value.
+
+        Raises:
+            BlankArgumentError: if passed a blank secret_id.
+            Exception: the last region's error, if every region fails.
+        """
+
+        secret_string, _ = self.get_secret_version(secret_id)
+        return secret_string
+
+    def get_secret_fields(self, secret_id: str) -> dict:
+        """A method to retrieve a secret's parsed fields from the best region."""
+
+        return decode_secret(self.get_secret(secret_id))
+
+    def get_secret_version(self, secret_id: str) -> tuple:
+        """A method to retrieve a secret's string and version id from the best region.
+
+        Args:
+            secret_id (str): the name of the secret to be retrieved.
+
+        Returns:
+            secret_string (str): the secret's string value.
+            version_id (str): the VersionId of the retrieved value.
+
+        Raises:
+            BlankArgumentError: if passed a blank secret_id.
+            Exception: the last region's error, if every region fails.
+        """
+
+        validate_secret_id(secret_id)
+
+        if not self._probed:
+            self.probe()
+
+        error = None
+
+        for region in self.ranked_regions():
+            sm = get_client(region_name=region)
+            start = time.perf_counter()
+
+            try:
+                response = self._controllers[region].call(
+                    "GetSecretValue", sm.get_secret_value, SecretId=secret_id
+                )
+
+            except Exception as e:
+                self._record_failure(region, e)
+                metrics.increment("replica_read_errors_total", region=region)
+                error = e
+                continue
+
+            self._record_success(region, time.perf_counter() - start)
+            return secret_string_from(response), response["VersionId"]
+
+        raise error
+
+    def probe(self):
+        """A method to measure every region's latency at once with a small ListSecrets.
+
+        Called automatically before the first read; call it again to refresh
+        the measurements.
+        """
+
+        def measure(region):
+            sm = get_client(region_name=region)
+            start = time.perf_counter()
+            try:
+                self._controllers[region].call(
+                    "ListSecrets", sm.list_secrets, MaxResults=1
+                )
+            except Exception as e:
+                self._record_failure(region, e)
+            else:
+                self._record_success(region, time.perf_counter() - start)
+
+        with ThreadPoolExecutor(max_workers=len(self.regions)) as executor:
+            list(executor.map(measure, self.regions))
+
+        self._probed = True
+
+    def ranked_regions(self) -> list:
+        """A method to order the regions for the next read.
+
+        Returns:
+            regions (list): healthy regions by latency (unmeasured ones in
+            their given order), then skipped regions, so a read still
+            succeeds if every region is marked down.
+        """
+
+        now = self._clock()
+
+        with self._lock:
+            keys = {}
+            for index, region in enumerate(self.regions):
+                health = self._health[region]
+                skipped = (
+                    health.skipped_until is not None and now < health.skipped_until
+                )
+                latency = health.latency if health.latency is not None else float("inf")
+                keys[region] = (skipped, latency, index)
+
+        return sorted(self.regions, key=keys.get)
+
+    @property
+    def health(self) -> dict:
+        """dict: per-region "latency", consecutive "failures" and "healthy" flag.
+
+        The latency is in seconds, or None until measured.
+        """
+
+        now = self._clock()
+
+        with self._lock:
+            return {
+                region: {
+                    "latency": health.latency,
+                    "failures": health.failures,
+                    "healthy": health.skipped_until is None
+                    or now >= health.skipped_until,
+                }
+                for region, health in self._health.items()
+            }
+
+    def _record_success(self, region, latency):
+        with self._lock:
+            health = self._health[region]
+            if health.latency is None:
+                health.latency = latency
+            else:
+                health.latency += self.smoothing * (latency - health.latency)
+            health.failures = 0
+            health.skipped_until = None
+
+    def _record_failure(self, region, error):
+        code = (getattr(error, "response", None) or {}).get("Error", {}).get("Code")
+        if code in ANSWERED_ERRORS:
+            return
+
+        with self._lock:
+            health = self._health[region]
+            health.failures += 1
+            if health.failures >= self.failure_threshold:
+                health.skipped_until = self._clock() + self.cooldown
+
+
+class _RegionHealth:
+    __slots__ = ("latency", "failures", "skipped_until")
+
+    def __init__(self):
+        self.latency = None
+        self.failures = 0
+        self.skipped_until = None
@@ -0,0 +1,328 @@
+"""This module contains `rotate_secret()` and `rotate_secrets()`, for new passwords.
+
+A rotation follows the Secrets Manager staging-label protocol: the new
+value is written as a version labelled AWSPENDING, optionally applied to
+the system that uses it, and only then made AWSCURRENT, with the old value
+kept as AWSPREVIOUS. A rotation that stops part way is finished, not
+repeated, by the next attempt.
+"""
+
+import json
+import os
+import secrets
+import string
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from src import events, metrics, rate_limit
+from src.client import get_client
+from src.list_secrets import iter_secrets
+from src.secret_codec import decode_secret, encode_secret
+from src.validation import validate_secret_id, validate_secret_size
+
+ROTATED = "rotated"
+SKIPPED = "skipped"
+FAILED = "failed"
+PENDING = "pending"
+
+CURRENT_STAGE = "AWSCURRENT"
+PENDING_STAGE = "AWSPENDING"
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_ROTATIONS_PER_SECOND = 10
+DEFAULT_PASSWORD_LENGTH = 32
+
+PUNCTUATION = "!#%+-.:=@^_~"
+
+_CLASSES = (string.ascii_lowercase, string.ascii_uppercase, string.digits, PUNCTUATION)
+
+
+def generate_password(length: int = DEFAULT_PASSWORD_LENGTH) -> str:
+    """A function to generate a random password from a cryptographically secure source.
+
+    Args:
+        length (int): the number of characters, at least 8.
+
+    Returns:
+        password (str): lower and upper case letters, digits and
+        punctuation, with at least one of each.
+
+    Raises:
+        ValueError: if length is under 8.
+    """
+
+    if length < 8:
+        raise ValueError("length must be at least 8.")
+
+    alphabet = "".join(_CLASSES)
+    while True:
+        password = "".join(secrets.choice(alphabet) for _ in range(length))
+        if all(any(c in characters for c in password) for characters in _CLASSES):
+            return password
+
+
+@metrics.instrument("rotate_secret")
+def rotate_secret(
+    secret_id: str,
+    generate=generate_password,
+    apply=None,
+    completed_version: str = None,
+    on_pending=None,
+) -> str:
+    """A function to give one secret a new password, keeping its user_id.
+
+    If an earlier attempt left an AWSPENDING version, that version is
+    finished instead of a new one being generated.
+
+    Args:
+        secret_id (str): the name of the secret to rotate.
+        generate (callable): called with no arguments for the new password.
+        apply (callable): called as apply(secret_id, user_id, password)
+        before the new password is made current, e.g. to set it on the
+        database that uses it. If it raises, the rotation stops with the
+        new version left pending.
+        completed_version (str): a version an earlier attempt was finishing.
+        If it is already current, the rotation is complete and nothing is done.
+        on_pending (callable): called with the pending VersionId once it is
+        written, e.g. to record it in a journal.
+
+    Returns:
+        version_id (str): the VersionId that is now AWSCURRENT.
+
+    Raises:
+        BlankArgumentError: if passed a blank secret_id.
+        ResourceNotFoundException: if the secret is not found.
+        SecretFormatError: if the current value cannot be decoded.
+    """
+
+    validate_secret_id(secret_id)
+
+    sm = get_client()
+    current, pending = _stages(sm, secret_id)
+
+    if completed_version is not None and completed_version == current:
+        if pending == current:
+            _remove_pending(sm, secret_id, current)
+        return current
+
+    if pending is None or pending == current:
+        if pending is not None:
+            _remove_pending(sm, secret_id, pending)
+
+        response = rate_limit.call(
+            "GetSecretValue",
+            sm.get_secret_value,
+            SecretId=secret_id,
+            VersionStage=CURRENT_STAGE,
+        )
+        user_id = decode_secret(_value(response))["user_id"]
+        secret_string = encode_secret(user_id, generate())
+        validate_secret_size(secret_string)
+
+        pending = rate_limit.call(
+            "PutSecretValue",
+            sm.put_secret_value,
+            SecretId=secret_id,
+            SecretString=secret_string,
+            ClientRequestToken=str(uuid.uuid4()),
+            VersionStages=[PENDING_STAGE],
+        )["VersionId"]
+
+    if on_pending is not None:
+        on_pending(pending)
+
+    if apply is not None:
+        response = rate_limit.call(
+            "GetSecretValue", sm.get_secret_value, SecretId=secret_id, VersionId=pending
+        )
+        fields = decode_secret(_value(response))
+        apply(secret_id, fields["user_id"], fields["password"])
+
+    kwargs = {"RemoveFromVersionId": current} if current else {}
+    rate_limit.call(
+        "UpdateSecretVersionStage",
+        sm.update_secret_version_stage,
+        SecretId=secret_id,
+        VersionStage=CURRENT_STAGE,
+        MoveToVersionId=pending,
+        **kwargs,
+    )
+    _remove_pending(sm, secret_id, pending)
+
+    events.notify(events.UPDATED, secret_id)
+    return pending
+
+
+def rotate_secrets(
+    secret_ids: list = None,
+    name_prefix: str = None,
+    tags: dict = None,
+    journal: str = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    rotations_per_second: float = DEFAULT_ROTATIONS_PER_SECOND,
+    generate=generate_password,
+    apply=None,
+) -> dict:
+    """A function to rotate many secrets concurrently, checkpointing to a journal.
+
+    Secrets are selected by explicit ids, a name prefix and/or tags. Up to
+    `max_workers` rotations run at once, starting no faster than
+    `rotations_per_second`, and every API call also goes through the shared
+    rate controller.
+
+    With a journal, every step is appended to it as a JSON line and
+    flushed to disk. Running again with the same journal skips the secrets
+    it records as rotated, and finishes rather than repeats any rotation
+    it records as pending.
+
+    Args:
+        secret_ids (list): secret names to rotate as given.
+        name_prefix (str): rotate every secret whose name starts with this.
+        tags (dict): rotate every secret carrying these tags.
+        journal (str): the checkpoint file to resume from and append to.
+        max_workers (int): the maximum number of rotations at once.
+        rotations_per_second (float): the most rotations started per second.
+        generate (callable): called with no arguments for each new password.
+        apply (callable): passed to `rotate_secret()`.
+
+    Returns:
+        results (dict): a mapping of secret name to "rotated", "skipped"
+        (rotated by an earlier run) or "failed".
+
+    Raises:
+        ValueError: if no selector is passed, or name_prefix starts with "!".
+    """
+
+    if not secret_ids and not name_prefix and not tags:
+        raise ValueError("Specify secret_ids, name_prefix or tags.")
+
+    selected = dict.fromkeys(secret_ids or [])
+    if name_prefix or tags:
+        selected.update(dict.fromkeys(iter_secrets(name_prefix=name_prefix, tags=tags)))
+
+    checkpoint = _Journal(journal) if journal else None
+    done = checkpoint.state() if checkpoint else {}
+    bucket = rate_limit.TokenBucket(rotations_per_second)
+
+    results = {}
+    targets = []
+    for secret_id in selected:
+        status, version_id = done.get(secret_id, (None, None))
+        if status == ROTATED:
+            results[secret_id] = SKIPPED
+        else:
+            targets.append((secret_id, version_id if status == PENDING else None))
+
+    def rotate(target):
+        secret_id, completed_version = target
+        bucket.acquire()
+
+        def record_pending(version_id):
+            if checkpoint:
+                checkpoint.write(secret_id, PENDING, version_id=version_id)
+
+        try:
+            version_id = rotate_secret(
+                secret_id,
+                generate=generate,
+                apply=apply,
+                completed_version=completed_version,
+                on_pending=record_pending,
+            )
+        except Exception as e:
+            if checkpoint:
+                checkpoint.write(secret_id, FAILED, error=type(e).__name__)
+            return FAILED
+
+        if checkpoint:
+            checkpoint.write(secret_id, ROTATED, version_id=version_id)
+        return ROTATED
+
+    try:
+        if targets:
+            with ThreadPoolExecutor(
+                max_workers=min(max_workers, len(targets))
+            ) as executor:
+                for (secret_id, _), status in zip(
+                    targets, executor.map(rotate, targets)
+                ):
+                    results[secret_id] = status
+    finally:
+        if checkpoint:
+            checkpoint.close()
+
+    return {secret_id: results[secret_id] for secret_id in selected}
+
+
+def _stages(sm, secret_id):
+    response = rate_limit.call("DescribeSecret", sm.describe_secret, SecretId=secret_id)
+
+    current = pending = None
+    for version_id, stages in response.get("VersionIdsToStages", {}).items():
+        if CURRENT_STAGE in stages:
+            current = version_id
+        if PENDING_STAGE in stages:
+            pending = version_id
+    return current, pending
+
+
+def _remove_pending(sm, secret_id, version_id):
+    rate_limit.call(
+        "UpdateSecretVersionStage",
+        sm.update_secret_version_stage,
+        SecretId=secret_id,
+        VersionStage=PENDING_STAGE,
+        RemoveFromVersionId=version_id,
+    )
+
+
+def _value(response):
+    return (
+        response["SecretString"]
+        if "SecretString" in response
+        else response["SecretBinary"]
+    )
+
+
+class _Journal:
+    """An append-only JSON-lines checkpoint, safe to write from many threads."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        fd = os.open(path, os.O_CREAT | os.O_RDWR | os.O_APPEND, 0o600)
+        self._file = os.fdopen(fd, "a+", encoding="utf-8")
+
+        # Start on a fresh line if a crash left the last one unfinished.
+        size = os.fstat(fd).st_size
+        if size and os.pread(fd, 1, size - 1) != b"\n":
+            self._file.write("\n")
+            self._file.flush()
+
+    def state(self) -> dict:
+        """dict: the last (status, version_id) recorded for each secret."""
+
+        state = {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A line torn by a crash; the step it recorded is redone.
+                    continue
+                state[entry["secret_id"]] = (entry["status"], entry.get("version_id"))
+        return state
+
+    def write(self, secret_id, status, **details):
+        line = json.dumps(
+            {"time": time.time(), "secret_id": secret_id, "status": status, **details}
+        )
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
@@ -0,0 +1,244 @@
+"""This module contains `SecretCache`, a read-through cache for `get_secret()`."""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from src import events, rate_limit
+from src.client import get_client
+from src.get_secret import get_secret_version
+
+DEFAULT_TTL = 300
+DEFAULT_MAX_SIZE = 128
+
+
+class SecretCache:
+    """An in-process, thread-safe LRU cache of secret values with a TTL.
+
+    Values are held XOR-masked in mutable buffers that are zeroed as soon as
+    an entry expires, is evicted or is invalidated. Expired entries are wiped
+    on the next access to the cache, or by calling `purge_expired()`.
+
+    When `revalidate` is set, an entry older than `ttl` is not refetched
+    straight away: DescribeSecret is called instead and, if the cached
+    VersionId is still AWSCURRENT, the entry is kept for another `ttl`. No
+    value is ever held for longer than `max_age`.
+
+    Creates and deletes made through this library invalidate the affected
+    entry automatically.
+
+    Args:
+        ttl (float): seconds a value is served without going back to the API.
+        max_size (int): the maximum number of secrets held at once.
+        revalidate (bool): whether to confirm stale entries with DescribeSecret.
+        max_age (float): seconds a value may be held in total when revalidating.
+        Defaults to four times the ttl.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        max_size: int = DEFAULT_MAX_SIZE,
+        revalidate: bool = False,
+        max_age: float = None,
+    ):
+        if ttl <= 0 or max_size <= 0:
+            raise ValueError("ttl and max_size must be positive.")
+
+        self.ttl = ttl
+        self.max_size = max_size
+        self.revalidate = revalidate
+        self.max_age = ttl if not revalidate else (max_age or ttl * 4)
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._by_expiry = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._revalidations = 0
+        self._generation = 0
+
+        events.subscribe(self._on_change)
+
+    def get_secret(self, secret_id: str) -> str:
+        """A method to return a secret's value, from the cache when possible.
+
+        Args:
+            secret_id (str): the name of the secret to be retrieved.
+
+        Returns:
+            secret_string (str): a string of the retrieved secret user_id and password.
+
+        Raises:
+            BlankArgumentError: if passed a blank secret_id.
+            ResourceNotFoundException: if secret not found in AWS Secrets Manager.
+        """
+
+        now = time.monotonic()
+
+        with self._lock:
+            generation = self._generation
+            self._purge(now)
+            entry = self._entries.get(secret_id)
+            if entry is not None:
+                self._entries.move_to_end(secret_id)
+                if now < entry.fresh_until:
+                    self._hits += 1
+                    return entry.value()
+
+        if entry is not None and self._still_current(secret_id, entry.version_id):
+            with self._lock:
+                if self._entries.get(secret_id) is entry:
+                    entry.fresh_until = min(now + self.ttl, entry.expires_at)
+                    self._revalidations += 1
+                    self._hits += 1
+                    return entry.value()
+
+        secret_string, version_id = get_secret_version(secret_id)
+
+        with self._lock:
+            self._misses += 1
+            if generation != self._generation:
+                # The secret changed while it was being fetched, so the value
+                # may already be out of date and is not cached.
+                return secret_string
+            self._discard(secret_id)
+            entry = _Entry(
+                secret_string, version_id, now + self.ttl, now + self.max_age
+            )
+            self._entries[secret_id] = entry
+            self._by_expiry[secret_id] = entry
+            while len(self._entries) > self.max_size:
+                self._discard(next(iter(self._entries)))
+                self._evictions += 1
+
+        return secret_string
+
+    def invalidate(self, secret_id: str = None):
+        """A method to drop one secret, or every secret, from the cache.
+
+        Args:
+            secret_id (str): the secret to drop, or None to clear the cache.
+        """
+
+        with self._lock:
+            self._generation += 1
+            if secret_id is None:
+                for entry in self._entries.values():
+                    entry.wipe()
+                self._entries.clear()
+                self._by_expiry.clear()
+            else:
+                self._discard(secret_id)
+
+    def purge_expired(self):
+        """A method to wipe every entry that has outlived its maximum age."""
+
+        with self._lock:
+            self._purge(time.monotonic())
+
+    @property
+    def stats(self) -> dict:
+        """dict: the cache's hit, miss, eviction, expiration and revalidation counts."""
+
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "revalidations": self._revalidations,
+                "size": len(self._entries),
+            }
+
+    def close(self):
+        """A method to clear the cache and stop listening for changes."""
+
+        events.unsubscribe(self._on_change)
+        self.invalidate()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _on_change(self, action, secret_id):
+        self.invalidate(secret_id)
+
+    def _still_current(self, secret_id, version_id):
+        if not self.revalidate:
+            return False
+
+        sm = get_client()
+
+        try:
+            response = rate_limit.call(
+                "DescribeSecret", sm.describe_secret, SecretId=secret_id
+            )
+        except sm.exceptions.ClientError:
+            return False
+
+        stages = response.get("VersionIdsToStages", {}).get(version_id, [])
+        return "AWSCURRENT" in stages
+
+    def _discard(self, secret_id):
+        entry = self._entries.pop(secret_id, None)
+        self._by_expiry.pop(secret_id, None)
+        if entry is not None:
+            entry.wipe()
+
+    def _purge(self, now):
+        # Every entry lives for the same max_age, so insertion order is
+        # expiry order and only the expired head of _by_expiry is visited.
+        while self._by_expiry:
+            secret_id, entry = next(iter(self._by_expiry.items()))
+            if now < entry.expires_at:
+                break
+            self._discard(secret_id)
+            self._expirations += 1
+
+
+class _Entry:
+    """A cached secret value, masked with a one-time pad until it is read."""
+
+    __slots__ = ("_masked", "_pad", "version_id", "fresh_until", "expires_at")
+
+    def __init__(self, secret_string, version_id, fresh_until, expires_at):
+        data = secret_string.encode("utf-8")
+        self._pad = bytearray(os.urandom(len(data)))
+        self._masked = bytearray(b ^ p for b, p in zip(data, self._pad))
+        self.version_id = version_id
+        self.fresh_until = fresh_until
+        self.expires_at = expires_at
+
+    def value(self):
+        return bytes(b ^ p for b, p in zip(self._masked, self._pad)).decode("utf-8")
+
+    def wipe(self):
+        for buffer in (self._masked, self._pad):
+            buffer[:] = bytes(len(buffer))
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_cached_secret(secret_id: str) -> str:
+    """A function to retrieve a secret through a shared, default `SecretCache`.
+
+    Args:
+        secret_id (str): the name of the secret to be retrieved.
+
+    Returns:
+        secret_string (str): a string of the retrieved secret user_id and password.
+    """
+
+    global _default_cache
+
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = SecretCache()
+
+    return _default_cache.get_secret(secret_id)
@@ -0,0 +1,152 @@
+"""This module contains the codec used to store and read user_id/password secrets."""
+
+import json
+import zlib
+
+BINARY_MAGIC = b"PMS"
+BINARY_VERSION = 1
+FLAG_ZLIB = 0x01
+
+_HEADER_SIZE = len(BINARY_MAGIC) + 2
+_LEGACY_PREFIX = "{'user_id':"
+_LEGACY_SEPARATOR = ", 'password':"
+
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+_decoder = json.JSONDecoder()
+
+
+def encode_secret(user_id: str, password: str) -> str:
+    """A function to encode a user_id and password as a JSON SecretString.
+
+    Args:
+        user_id (str): user_id to be saved.
+        password (str): password to be saved.
+
+    Returns:
+        secret_string (str): a JSON object with "user_id" and "password" keys.
+    """
+
+    return _encoder.encode({"user_id": user_id, "password": password})
+
+
+def encode_secret_binary(user_id: str, password: str, compress: bool = True) -> bytes:
+    """A function to encode a user_id and password as a versioned SecretBinary payload.
+
+    The payload is the JSON from `encode_secret()` behind a five byte
+    header: the magic bytes b"PMS", a format version and a flags byte.
+
+    Args:
+        user_id (str): user_id to be saved.
+        password (str): password to be saved.
+        compress (bool): whether to zlib-compress the JSON.
+
+    Returns:
+        secret_binary (bytes): the encoded payload.
+    """
+
+    data = encode_secret(user_id, password).encode("utf-8")
+    flags = 0
+
+    if compress:
+        data = zlib.compress(data)
+        flags |= FLAG_ZLIB
+
+    return BINARY_MAGIC + bytes((BINARY_VERSION, flags)) + data
+
+
+def decode_secret(secret) -> dict:
+    """A function to decode a stored secret into its fields.
+
+    JSON strings, SecretBinary payloads and the legacy
+    "{'user_id':..., 'password':...}" strings are all accepted.
+
+    Args:
+        secret (str | bytes): a SecretString or SecretBinary value.
+
+    Returns:
+        fields (dict): the secret's "user_id" and "password".
+
+    Raises:
+        SecretFormatError: if the value is in none of the supported formats.
+    """
+
+    if isinstance(secret, (bytes, bytearray, memoryview)):
+        secret = binary_to_string(bytes(secret))
+
+    if secret.startswith(_LEGACY_PREFIX):
+        return _decode_legacy(secret)
+
+    try:
+        fields = _decoder.decode(secret)
+    except json.JSONDecodeError as e:
+        raise SecretFormatError(
+            print("SecretFormatError: secret is not in a recognised format.")
+        ) from e
+
+    if not isinstance(fields, dict):
+        raise SecretFormatError(
+            print("SecretFormatError: secret is not in a recognised format.")
+        )
+
+    return fields
+
+
+def binary_to_string(secret_binary: bytes) -> str:
+    """A function to unwrap a SecretBinary payload into its JSON SecretString.
+
+    Args:
+        secret_binary (bytes): a payload from `encode_secret_binary()`.
+
+    Returns:
+        secret_string (str): the JSON the payload holds.
+
+    Raises:
+        SecretFormatError: if the header is missing, short or of an unknown
+        version, or the data does not decompress or decode.
+    """
+
+    header = secret_binary[:_HEADER_SIZE]
+    if len(header) < _HEADER_SIZE or header[: len(BINARY_MAGIC)] != BINARY_MAGIC:
+        raise SecretFormatError(
+            print("SecretFormatError: SecretBinary has no password-manager header.")
+        )
+
+    version, flags = header[len(BINARY_MAGIC) :]
+    if version != BINARY_VERSION:
+        raise SecretFormatError(
+            print(f"SecretFormatError: unsupported SecretBinary version {version}.")
+        )
+
+    data = secret_binary[_HEADER_SIZE:]
+    try:
+        if flags & FLAG_ZLIB:
+            data = zlib.decompress(data)
+        return data.decode("utf-8")
+    except (zlib.error, UnicodeDecodeError) as e:
+        raise SecretFormatError(
+            print(f"SecretFormatError: SecretBinary is corrupt ({e}).")
+        ) from e
+
+
+def is_legacy(secret_string: str) -> bool:
+    """A function to tell whether a SecretString uses the legacy, non-JSON format."""
+
+    return secret_string.startswith(_LEGACY_PREFIX)
+
+
+def _decode_legacy(secret_string):
+    # Legacy values were written as f"{{'user_id':{user_id}, 'password':{password}}}"
+    # with nothing escaped, so the first separator is taken as the split point.
+    body = secret_string[len(_LEGACY_PREFIX) : -1]
+    user_id, separator, password = body.partition(_LEGACY_SEPARATOR)
+
+    if not separator or not secret_string.endswith("}"):
+        raise SecretFormatError(
+            print("SecretFormatError: secret is not in a recognised format.")
+        )
+
+    return {"user_id": user_id, "password": password}
+
+
+class SecretFormatError(Exception):
+    """Traps errors where a stored secret cannot be decoded."""
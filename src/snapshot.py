@@ -0,0 +1,625 @@
+"""This module contains `snapshot_secrets()` and `restore_snapshot()`.
+
+They make and restore encrypted point-in-time backups of every secret.
+
+A snapshot is a single file of frames, each compressed with zlib and
+sealed with AES-256-GCM:
+
+    b"PMSNAP" | format version | 16-byte snapshot id
+    frame* , each: length (4 bytes) | kind (1 byte) | nonce | ciphertext
+
+The first frame is a header and the last is the manifest, with the number
+of secrets, any that could not be read, and a SHA-256 digest over every
+record. Secrets that could not be read are also written to errors frames
+as they happen, so a resumed snapshot still reports them. Each record
+carries the SHA-256 of its value. Every frame is bound to the snapshot
+id, its position and its kind, so frames cannot be reordered, spliced in
+from another snapshot or dropped without detection.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from src.get_secrets import get_secrets, BATCH_SIZE
+from src.list_secrets import iter_secret_metadata, iter_secrets
+from src.local_vault import decode_key, generate_key
+from src.upsert_secret import (
+    client_request_token,
+    upsert_secret_string,
+    CURRENT_STAGE,
+    FAILED,
+    UNCHANGED,
+)
+
+KEY_VARIABLE = "PASSWORD_MANAGER_SNAPSHOT_KEY"
+
+MAGIC = b"PMSNAP"
+FORMAT_VERSION = 1
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_FRAME_SIZE = 256
+
+FILE_MODE = 0o600
+
+_HEADER, _RECORDS, _MANIFEST, _ERRORS = 0, 1, 2, 3
+
+_ID_SIZE = 16
+_NONCE_SIZE = 12
+_PREFIX_SIZE = len(MAGIC) + 1 + _ID_SIZE
+_FRAME_HEADER = struct.Struct(">IB")
+
+# Frames are far smaller than this; a larger length means a corrupt file.
+_MAX_FRAME = 64 * 1024 * 1024
+
+
+class SnapshotError(Exception):
+    """Traps errors where a snapshot is corrupt, truncated or under another key."""
+
+
+def load_key(key: str = None, key_file: str = None, create: bool = False) -> bytes:
+    """A function to find the snapshot key.
+
+    Args:
+        key (str): a key from `local_vault.generate_key()`. Defaults to
+        PASSWORD_MANAGER_SNAPSHOT_KEY, then the contents of key_file.
+        key_file (str): a file holding the key.
+        create (bool): whether to create key_file, owner-only, if missing.
+
+    Returns:
+        key (bytes): the raw key.
+
+    Raises:
+        SnapshotError: if no key is given.
+        VaultKeyError: if the key is malformed.
+    """
+
+    key = key or os.environ.get(KEY_VARIABLE)
+
+    if not key and key_file:
+        if create and not os.path.exists(key_file):
+            fd = os.open(key_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY, FILE_MODE)
+            with os.fdopen(fd, "w", encoding="ascii") as f:
+                f.write(generate_key() + "\n")
+        with open(key_file, "r", encoding="ascii") as f:
+            key = f.read().strip()
+
+    if not key:
+        raise SnapshotError(
+            print(
+                f"SnapshotError: no snapshot key; set {KEY_VARIABLE} "
+                "or pass a key file."
+            )
+        )
+
+    return decode_key(key)
+
+
+def snapshot_secrets(
+    path: str,
+    key: bytes,
+    secret_ids: list = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    frame_size: int = DEFAULT_FRAME_SIZE,
+    resume: bool = True,
+) -> dict:
+    """A function to back up many secrets into one encrypted, compressed snapshot file.
+
+    Secrets are fetched in BatchGetSecretValue chunks by a bounded worker
+    pool and written as they arrive, `frame_size` secrets to a frame, so
+    at most 2 * max_workers chunks and one frame are held in memory.
+
+    The snapshot is written to path + ".partial", fsynced after every
+    frame, and renamed to path once the manifest is written. If a
+    ".partial" file is left by an interrupted run, it is checked, cut back
+    to its last complete frame and continued, skipping every secret it
+    already holds or could not read.
+
+    SecretBinary values are stored, and later restored, as the JSON
+    SecretString they hold.
+
+    Args:
+        path (str): the snapshot file to write.
+        key (bytes): the raw key, e.g. from `load_key()`.
+        secret_ids (list): the secrets to back up. Defaults to every secret.
+        max_workers (int): the maximum number of chunks fetched at once.
+        frame_size (int): the number of secrets sealed together in a frame.
+        resume (bool): whether to continue an interrupted snapshot.
+
+    Returns:
+        summary (dict): the number of "secrets" written (including any
+        "resumed" from an earlier run), an "errors" mapping of secret id to
+        error code, the file's "bytes", the "seconds" taken and
+        "secrets_per_second".
+
+    Raises:
+        SnapshotError: if a partial snapshot cannot be continued with this key.
+    """
+
+    start = time.perf_counter()
+    partial = path + ".partial"
+
+    if resume and os.path.exists(partial) and os.path.getsize(partial) > _PREFIX_SIZE:
+        writer = _SnapshotWriter.resume(partial, key)
+    else:
+        writer = _SnapshotWriter.create(partial, key)
+
+    resumed = writer.count
+    ids = iter_secrets() if secret_ids is None else iter(secret_ids)
+    ids = (
+        secret_id
+        for secret_id in ids
+        if secret_id not in writer.names and secret_id not in writer.errors
+    )
+
+    with writer, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = set()
+        records = []
+
+        def drain(futures):
+            for future in futures:
+                secrets, errors = future.result()
+                records.extend(secrets.items())
+                if errors:
+                    writer.write_errors(
+                        {
+                            secret_id: error["ErrorCode"]
+                            for secret_id, error in errors.items()
+                        }
+                    )
+                while len(records) >= frame_size:
+                    writer.write_records(records[:frame_size])
+                    del records[:frame_size]
+
+        for chunk in _chunks(ids, BATCH_SIZE):
+            if len(in_flight) >= max_workers * 2:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                drain(done)
+            in_flight.add(executor.submit(get_secrets, chunk, 1))
+
+        drain(wait(in_flight).done)
+        if records:
+            writer.write_records(records)
+
+        writer.write_manifest()
+
+    os.replace(partial, path)
+    _fsync_directory(os.path.dirname(os.path.abspath(path)))
+
+    return _summary(
+        start,
+        secrets=writer.count,
+        resumed=resumed,
+        errors=writer.errors,
+        bytes=os.path.getsize(path),
+    )
+
+
+def read_snapshot(path: str, key: bytes):
+    """A function to stream a snapshot's secrets, checking every frame and checksum.
+
+    The manifest is checked once the last record has been read, so a
+    truncated snapshot raises only at the end; see `verify_snapshot()`
+    to check a file before acting on it.
+
+    Args:
+        path (str): the snapshot file.
+        key (bytes): the raw key it was written with.
+
+    Yields:
+        record (tuple): a (secret_id, secret_string) pair.
+
+    Raises:
+        SnapshotError: if the file is corrupt, truncated or the key is wrong.
+    """
+
+    for _, records in _read_frames(path, key):
+        yield from records
+
+
+def verify_snapshot(path: str, key: bytes) -> dict:
+    """A function to check a whole snapshot without keeping its secrets.
+
+    Args:
+        path (str): the snapshot file.
+        key (bytes): the raw key it was written with.
+
+    Returns:
+        manifest (dict): the snapshot's "secrets" count, "errors", "digest"
+        and "created" time.
+
+    Raises:
+        SnapshotError: if the file is corrupt, truncated or the key is wrong.
+    """
+
+    reader = _SnapshotReader(path, key)
+    for _, kind, data in reader.frames():
+        if kind == _RECORDS:
+            reader.records(data)
+    return reader.manifest
+
+
+def restore_snapshot(
+    path: str,
+    key: bytes,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    resume: bool = True,
+) -> dict:
+    """A function to write a snapshot's secrets back, skipping unchanged ones.
+
+    The snapshot is verified in full before anything is written. Frames
+    are then replayed in order, with up to `max_workers` secrets of a
+    frame written at once by `upsert_secret_string()`. A secret whose
+    current version or value already matches is not written. Each frame
+    restored without failures is recorded in path + ".restore", so an
+    interrupted or partly failed restore replays only the other frames;
+    the journal is removed once a restore finishes without failures.
+
+    Args:
+        path (str): the snapshot file.
+        key (bytes): the raw key it was written with.
+        max_workers (int): the maximum number of secrets written at once.
+        resume (bool): whether to skip frames an interrupted restore completed.
+
+    Returns:
+        summary (dict): the number of secrets "created", "updated",
+        "unchanged" and "failed", an "errors" mapping of secret id to error
+        class, the "seconds" taken and "secrets_per_second".
+
+    Raises:
+        SnapshotError: if the file is corrupt, truncated or the key is wrong.
+    """
+
+    start = time.perf_counter()
+    verify_snapshot(path, key)
+
+    journal_path = path + ".restore"
+    completed = set()
+    if resume and os.path.exists(journal_path):
+        with open(journal_path, "r", encoding="ascii") as f:
+            completed = {int(line) for line in f if line.strip().isdigit()}
+
+    current_versions = {}
+    for secret in iter_secret_metadata():
+        for version_id, stages in secret.get("SecretVersionsToStages", {}).items():
+            if CURRENT_STAGE in stages:
+                current_versions[secret["Name"]] = version_id
+
+    counts = {"created": 0, "updated": 0, "unchanged": 0, "failed": 0}
+    errors = {}
+
+    def restore(record):
+        secret_id, secret_string = record
+        try:
+            return upsert_secret_string(
+                secret_id, secret_string, current_versions.get(secret_id)
+            )
+        except Exception as e:
+            errors[secret_id] = type(e).__name__
+            return FAILED
+
+    # Without resume, frames recorded by an earlier restore are forgotten.
+    mode = os.O_APPEND if resume else os.O_TRUNC
+    fd = os.open(journal_path, os.O_CREAT | os.O_WRONLY | mode, FILE_MODE)
+    with os.fdopen(fd, "w", encoding="ascii") as journal, ThreadPoolExecutor(
+        max_workers=max_workers
+    ) as executor:
+        for index, records in _read_frames(path, key):
+            if index in completed:
+                continue
+
+            changed = _changed(records, current_versions)
+            counts[UNCHANGED] += len(records) - len(changed)
+            statuses = list(executor.map(restore, changed))
+            for status in statuses:
+                counts[status] += 1
+
+            # A frame with a failure is replayed by the next restore.
+            if FAILED not in statuses:
+                journal.write(f"{index}\n")
+                journal.flush()
+
+    if not counts[FAILED]:
+        os.remove(journal_path)
+
+    return _summary(start, **counts, errors=errors)
+
+
+def _changed(records, current_versions):
+    # A secret whose current version id is the token of its snapshot value
+    # holds that value. Any others are read, one batch call per 20, as
+    # that is much cheaper than writing them again.
+    unknown = [
+        secret_id
+        for secret_id, secret_string in records
+        if secret_id in current_versions
+        and current_versions[secret_id]
+        != client_request_token(secret_id, secret_string)
+    ]
+    current, _ = get_secrets(unknown, 1) if unknown else ({}, {})
+
+    return [
+        (secret_id, secret_string)
+        for secret_id, secret_string in records
+        if current.get(secret_id) != secret_string
+        and current_versions.get(secret_id)
+        != client_request_token(secret_id, secret_string)
+    ]
+
+
+def _read_frames(path, key):
+    reader = _SnapshotReader(path, key)
+    for index, kind, data in reader.frames():
+        if kind == _RECORDS:
+            yield index, reader.records(data)
+
+
+def _summary(start, **summary):
+    seconds = time.perf_counter() - start
+    total = summary.get("secrets")
+    if total is None:
+        total = sum(
+            summary[status] for status in ("created", "updated", "unchanged", "failed")
+        )
+    summary["seconds"] = round(seconds, 3)
+    summary["secrets_per_second"] = round(total / seconds, 1) if seconds else None
+    return summary
+
+
+def _chunks(ids, size):
+    chunk = []
+    for secret_id in ids:
+        chunk.append(secret_id)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _fsync_directory(directory):
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _record_line(secret_id, secret_string):
+    checksum = hashlib.sha256(secret_string.encode("utf-8")).hexdigest()
+    return checksum, json.dumps(
+        {"secret_id": secret_id, "secret_string": secret_string, "sha256": checksum},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+
+class _Frames:
+    """The sealing shared by the writer and the reader."""
+
+    def __init__(self, key, snapshot_id):
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+        self._aead = AESGCM(key)
+        self.snapshot_id = snapshot_id
+        self.index = 0
+        self.digest = hashlib.sha256()
+        self.count = 0
+
+    def seal(self, kind, data):
+        nonce = os.urandom(_NONCE_SIZE)
+        sealed = nonce + self._aead.encrypt(
+            nonce, zlib.compress(data), self._associated_data(kind)
+        )
+        self.index += 1
+        return _FRAME_HEADER.pack(len(sealed), kind) + sealed
+
+    def unseal(self, kind, sealed):
+        from cryptography.exceptions import InvalidTag
+
+        try:
+            data = self._aead.decrypt(
+                sealed[:_NONCE_SIZE], sealed[_NONCE_SIZE:], self._associated_data(kind)
+            )
+        except InvalidTag:
+            raise SnapshotError(
+                print(
+                    f"SnapshotError: frame {self.index} is corrupt or the key is wrong."
+                )
+            )
+        self.index += 1
+        return zlib.decompress(data)
+
+    def add(self, secret_id, checksum):
+        self.digest.update(f"{secret_id}\0{checksum}\n".encode("utf-8"))
+        self.count += 1
+
+    def _associated_data(self, kind):
+        return self.snapshot_id + struct.pack(">QB", self.index, kind)
+
+
+class _SnapshotWriter(_Frames):
+    def __init__(self, f, key, snapshot_id):
+        super().__init__(key, snapshot_id)
+        self._file = f
+        self.names = set()
+        self.errors = {}
+
+    @classmethod
+    def create(cls, path, key):
+        snapshot_id = os.urandom(_ID_SIZE)
+        fd = os.open(path, os.O_CREAT | os.O_TRUNC | os.O_WRONLY, FILE_MODE)
+        f = os.fdopen(fd, "wb")
+        f.write(MAGIC + bytes((FORMAT_VERSION,)) + snapshot_id)
+
+        writer = cls(f, key, snapshot_id)
+        writer._write(
+            _HEADER,
+            json.dumps({"format": FORMAT_VERSION, "created": time.time()}).encode(),
+        )
+        return writer
+
+    @classmethod
+    def resume(cls, path, key):
+        reader = _SnapshotReader(path, key, partial=True)
+        writer = None
+
+        for index, kind, data in reader.frames():
+            if writer is None:
+                writer = cls(None, key, reader.snapshot_id)
+            elif kind == _RECORDS:
+                writer.names.update(secret_id for secret_id, _ in reader.records(data))
+            elif kind == _ERRORS:
+                writer.errors.update(json.loads(data))
+            writer.index = index + 1
+
+        if writer is None:
+            return cls.create(path, key)
+
+        # The reader rebuilt the digest and count from the records it read.
+        writer.count, writer.digest = reader.count, reader.digest
+        f = open(path, "r+b")
+        f.truncate(reader.offset)
+        f.seek(reader.offset)
+        writer._file = f
+        return writer
+
+    def write_records(self, records):
+        lines = []
+        for secret_id, secret_string in records:
+            checksum, line = _record_line(secret_id, secret_string)
+            self.add(secret_id, checksum)
+            self.names.add(secret_id)
+            lines.append(line)
+        self._write(_RECORDS, "\n".join(lines).encode("utf-8"))
+
+    def write_errors(self, errors):
+        self.errors.update(errors)
+        self._write(_ERRORS, json.dumps(errors).encode("utf-8"))
+
+    def write_manifest(self):
+        manifest = {
+            "secrets": self.count,
+            "errors": self.errors,
+            "digest": self.digest.hexdigest(),
+            "created": time.time(),
+        }
+        self._write(_MANIFEST, json.dumps(manifest).encode("utf-8"))
+
+    def _write(self, kind, data):
+        self._file.write(self.seal(kind, data))
+        # Each frame is durable before the next is started, so an
+        # interrupted snapshot can be continued from its last frame.
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._file.close()
+
+
+class _SnapshotReader(_Frames):
+    def __init__(self, path, key, partial=False):
+        self.path = path
+        self.partial = partial
+        self.manifest = None
+        self.offset = _PREFIX_SIZE
+
+        with open(path, "rb") as f:
+            prefix = f.read(_PREFIX_SIZE)
+
+        if len(prefix) < _PREFIX_SIZE or not prefix.startswith(MAGIC):
+            raise SnapshotError(print(f"SnapshotError: {path} is not a snapshot."))
+        if prefix[len(MAGIC)] != FORMAT_VERSION:
+            raise SnapshotError(
+                print(
+                    f"SnapshotError: unsupported snapshot version {prefix[len(MAGIC)]}."
+                )
+            )
+
+        super().__init__(key, prefix[len(MAGIC) + 1 :])
+
+    def frames(self):
+        """Yields (index, kind, data) for each frame, checking the manifest at the end.
+
+        In partial mode a torn last frame, or a manifest, ends the frames
+        quietly, and `offset` is left at the end of the last frame yielded.
+        """
+
+        with open(self.path, "rb") as f:
+            f.seek(_PREFIX_SIZE)
+
+            while True:
+                header = f.read(_FRAME_HEADER.size)
+                if not header:
+                    break
+
+                length, kind, sealed = 0, None, b""
+                if len(header) == _FRAME_HEADER.size:
+                    length, kind = _FRAME_HEADER.unpack(header)
+                    if 0 < length <= _MAX_FRAME:
+                        sealed = f.read(length)
+
+                if not sealed or len(sealed) != length:
+                    if self.partial:
+                        return
+                    raise SnapshotError(
+                        print(f"SnapshotError: {self.path} is truncated.")
+                    )
+
+                index = self.index
+                if (index == 0) != (kind == _HEADER):
+                    raise SnapshotError(
+                        print(f"SnapshotError: {self.path} is corrupt.")
+                    )
+
+                data = self.unseal(kind, sealed)
+
+                if kind == _MANIFEST:
+                    self.manifest = json.loads(data)
+                    if f.read(1):
+                        raise SnapshotError(
+                            print(
+                                f"SnapshotError: {self.path} has data "
+                                "after its manifest."
+                            )
+                        )
+                    break
+
+                self.offset = f.tell()
+                yield index, kind, data
+
+        if self.manifest is None:
+            if self.partial:
+                return
+            raise SnapshotError(print(f"SnapshotError: {self.path} is truncated."))
+
+        if (
+            self.manifest["secrets"] != self.count
+            or self.manifest["digest"] != self.digest.hexdigest()
+        ):
+            raise SnapshotError(
+                print(f"SnapshotError: {self.path} does not match its manifest.")
+            )
+
+    def records(self, data):
+        """Returns a records frame's (secret_id, secret_string) pairs, checked."""
+
+        records = []
+        for line in data.decode("utf-8").split("\n"):
+            record = json.loads(line)
+            secret_id, secret_string = record["secret_id"], record["secret_string"]
+            checksum = hashlib.sha256(secret_string.encode("utf-8")).hexdigest()
+            if checksum != record["sha256"]:
+                raise SnapshotError(
+                    print(f"SnapshotError: the checksum of {secret_id} does not match.")
+                )
+            self.add(secret_id, checksum)
+            records.append((secret_id, secret_string))
+        return records
@@ -0,0 +1,100 @@
+"""This module contains `profile_startup()`, a report of where CLI startup time goes."""
+
+import json
+import os
+import subprocess
+import sys
+
+STARTUP_BUDGET_SECONDS = 0.3
+
+_PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = """
+import json, sys, time
+stages = []
+start = time.perf_counter()
+import src.password_manager
+stages.append(["import src.password_manager", time.perf_counter() - start])
+stages.append(["boto3 loaded by the CLI import", "boto3" in sys.modules])
+start = time.perf_counter()
+import boto3
+stages.append(["import boto3", time.perf_counter() - start])
+FIRST_CLIENT = "first client (session, service model, credentials)"
+start = time.perf_counter()
+try:
+    from src.client import get_client
+    get_client()
+    stages.append([FIRST_CLIENT, time.perf_counter() - start])
+except Exception as e:
+    stages.append([FIRST_CLIENT, type(e).__name__])
+print(json.dumps(stages))
+"""
+
+
+def profile_startup(top: int = 10) -> dict:
+    """A function to measure CLI startup in a fresh interpreter.
+
+    A child Python process imports the CLI, then boto3, then creates the
+    first client, timing each stage. It runs with `-X importtime` so the
+    slowest individual imports can be reported too.
+
+    Args:
+        top (int): how many of the slowest imports to report.
+
+    Returns:
+        profile (dict): "stages", a list of [stage, seconds or result]
+        pairs, and "imports", a list of [module, cumulative seconds] pairs,
+        slowest first.
+    """
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [_PACKAGE_ROOT, env.get("PYTHONPATH")])
+    )
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=_PACKAGE_ROOT,
+        check=True,
+    )
+
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        if cumulative.strip().isdigit():
+            imports.append([module.strip(), int(cumulative) / 1e6])
+
+    imports.sort(key=lambda entry: entry[1], reverse=True)
+
+    return {
+        "stages": json.loads(result.stdout.strip().splitlines()[-1]),
+        "imports": imports[:top],
+    }
+
+
+def print_startup_profile(top: int = 10):
+    """A function to print `profile_startup()`'s report in a readable form.
+
+    Args:
+        top (int): how many of the slowest imports to report.
+    """
+
+    profile = profile_startup(top)
+
+    print("Startup stages:")
+    for stage, value in profile["stages"]:
+        if isinstance(value, float):
+            value = f"{value * 1000:.1f} ms"
+        print(f"  {stage}: {value}")
+
+    print(
+        "Slowest imports (cumulative, budget for the CLI import is "
+        f"{STARTUP_BUDGET_SECONDS * 1000:.0f} ms):"
+    )
+    for module, seconds in profile["imports"]:
+        print(f"  {seconds * 1000:8.1f} ms  {module}")
@@ -0,0 +1,425 @@
+"""This module contains `plan_sync()` and `apply_sync()`, for directory sync.
+
+They reconcile a directory of files in the `export_secrets()` "dir" format,
+one per secret, with the store. Each stored secret carries a HASH_TAG of
+the HMAC-SHA-256 of its SecretString and the VersionId that hash
+describes, so most secrets are compared from the listing alone, without
+their values being read. The HMAC key is the locally held
+`upsert_secret.load_token_key()`, so the tag cannot be used to test
+guesses at a value. The tag also names the key, and a host with another
+key reads the value rather than trust the tag.
+"""
+
+import hashlib
+import hmac
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src import rate_limit
+from src.client import get_client
+from src.delete_secret import delete_secret
+from src.export_secrets import (
+    secret_filename,
+    secret_id_from_filename,
+    _DirectoryWriter,
+)
+from src.get_secret import secret_string_from
+from src.get_secrets import BATCH_SIZE
+from src.inventory import scan_inventory
+from src.secret_codec import SecretFormatError
+from src.upsert_secret import client_request_token, load_token_key, upsert_secret_string
+
+PUSH = "push"
+PULL = "pull"
+DIRECTIONS = (PUSH, PULL)
+
+ADD = "add"
+UPDATE = "update"
+DELETE = "delete"
+UNCHANGED = "unchanged"
+
+HASH_TAG = "password-manager:hmac-sha256"
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_FSYNC_BATCH = 64
+
+
+def content_hash(secret_string: str) -> str:
+    """A function to return a SecretString's hex HMAC-SHA-256, as kept in HASH_TAG."""
+
+    return hmac.new(
+        load_token_key(), secret_string.encode("utf-8"), hashlib.sha256
+    ).hexdigest()
+
+
+class SyncPlan:
+    """The changes `apply_sync()` will make, as worked out by `plan_sync()`.
+
+    Each of add, update, delete and unchanged is a sorted list of secret
+    names; errors maps the names that could not be compared to an error code.
+    """
+
+    def __init__(self, directory, direction, name_prefix):
+        self.directory = directory
+        self.direction = direction
+        self.name_prefix = name_prefix
+        self.add = []
+        self.update = []
+        self.delete = []
+        self.unchanged = []
+        self.errors = {}
+        # Known values by name: the directory's for a push, any read from
+        # the store for a pull. Current VersionIds and tags to (re)write.
+        self._values = {}
+        self._versions = {}
+        self._tags = {}
+
+    def changes(self) -> list:
+        """A method to return (action, secret_id) pairs for every planned change."""
+
+        return [
+            (action, secret_id)
+            for action in (ADD, UPDATE, DELETE)
+            for secret_id in getattr(self, action)
+        ]
+
+    def as_dict(self) -> dict:
+        """A method to return the number of secrets per action, e.g. for JSON output."""
+
+        counts = {
+            action: len(getattr(self, action))
+            for action in (ADD, UPDATE, DELETE, UNCHANGED)
+        }
+        return {"direction": self.direction, **counts, "errors": dict(self.errors)}
+
+    def __repr__(self):
+        return f"SyncPlan({self.directory!r}, {self.direction!r})"
+
+
+def plan_sync(
+    directory: str,
+    direction: str = PUSH,
+    name_prefix: str = "",
+    delete: bool = False,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    allow_empty: bool = False,
+) -> SyncPlan:
+    """A function to work out which secrets differ between a directory and the store.
+
+    Neither side is changed.
+
+    The directory's files are hashed locally and the store's hashes come
+    from a sharded listing: a secret is known to match when its current
+    VersionId is the `client_request_token()` of the file's content, or
+    when its HASH_TAG was written for its current VersionId. Only secrets
+    with neither are read, in BatchGetSecretValue chunks, to compare them.
+
+    Args:
+        directory (str): the directory of `secret_filename()` files.
+        direction (str): "push" to make the store match the directory, or
+        "pull" to make the directory match the store.
+        name_prefix (str): only sync secrets whose name starts with this.
+        delete (bool): whether to plan deleting secrets missing from the
+        source side. Deleted secrets keep the default recovery window.
+        max_workers (int): the maximum number of listing shards or reads at once.
+        allow_empty (bool): whether a push with delete may go ahead when
+        the directory holds no secrets under name_prefix, which would
+        delete every secret under it.
+
+    Returns:
+        plan (SyncPlan): the changes to pass to `apply_sync()`.
+
+    Raises:
+        ValueError: if direction is not one of DIRECTIONS, or a push with
+        delete would start from an empty directory without allow_empty.
+        FileNotFoundError: if a push's directory does not exist.
+    """
+
+    if direction not in DIRECTIONS:
+        raise ValueError(f"Unsupported sync direction: {direction}.")
+
+    if direction == PUSH and not os.path.isdir(directory):
+        raise FileNotFoundError(f"No such directory: {directory}")
+
+    plan = SyncPlan(directory, direction, name_prefix)
+    local = _read_directory(directory, name_prefix)
+
+    if direction == PUSH and delete and not local and not allow_empty:
+        raise ValueError(
+            f"{directory} holds no secrets to push; refusing to delete every "
+            "secret under the prefix without allow_empty."
+        )
+
+    remote = {}
+    for record in scan_inventory(name_prefix, max_workers=max_workers):
+        plan._versions[record.name] = record.current_version
+        remote[record.name] = _tagged_hash(dict(record.tags), record.current_version)
+
+    unknown = []
+    for secret_id in local.keys() & remote.keys():
+        version_id = plan._versions[secret_id]
+        if version_id == client_request_token(secret_id, local[secret_id]):
+            remote[secret_id] = content_hash(local[secret_id])
+        elif remote[secret_id] is None:
+            unknown.append(secret_id)
+
+    values, errors = _read_values(unknown, max_workers)
+    plan.errors.update(errors)
+    for secret_id, (secret_string, version_id) in values.items():
+        remote[secret_id] = content_hash(secret_string)
+        plan._tags[secret_id] = _tag(remote[secret_id], version_id)
+        plan._versions[secret_id] = version_id
+        if direction == PULL:
+            plan._values[secret_id] = secret_string
+
+    source, target = (local, remote) if direction == PUSH else (remote, local)
+    if direction == PUSH:
+        plan._values.update(local)
+
+    for secret_id in sorted(source.keys() | target.keys()):
+        if secret_id in plan.errors:
+            continue
+        if secret_id not in target:
+            plan.add.append(secret_id)
+        elif secret_id not in source:
+            if delete:
+                plan.delete.append(secret_id)
+        elif content_hash(local[secret_id]) == remote[secret_id]:
+            plan.unchanged.append(secret_id)
+        else:
+            plan.update.append(secret_id)
+
+    return plan
+
+
+def apply_sync(plan: SyncPlan, max_workers: int = DEFAULT_MAX_WORKERS) -> dict:
+    """A function to make the changes in a `plan_sync()` plan, many at once.
+
+    A push writes each added or changed secret with `upsert_secret_string()`
+    and then tags it with the hash of its new value. A pull reads the
+    changed secrets in BatchGetSecretValue chunks and writes their files
+    atomically. Secrets whose hash tag was missing are tagged either way,
+    so the next plan needs no reads. A secret that fails does not stop
+    the others.
+
+    Args:
+        plan (SyncPlan): the plan to apply.
+        max_workers (int): the maximum number of secrets written at once.
+
+    Returns:
+        summary (dict): the number of secrets added, updated, deleted,
+        unchanged and failed, an "errors" mapping of secret name to error
+        code, and the time taken.
+    """
+
+    start = time.perf_counter()
+    errors = dict(plan.errors)
+    counts = {ADD: 0, UPDATE: 0, DELETE: 0, UNCHANGED: len(plan.unchanged)}
+
+    if plan.direction == PUSH:
+        _push(plan, counts, errors, max_workers)
+    else:
+        _pull(plan, counts, errors, max_workers)
+
+    seconds = time.perf_counter() - start
+    return {
+        "added": counts[ADD],
+        "updated": counts[UPDATE],
+        "deleted": counts[DELETE],
+        "unchanged": counts[UNCHANGED],
+        "failed": len(errors),
+        "errors": errors,
+        "seconds": round(seconds, 3),
+    }
+
+
+def _push(plan, counts, errors, max_workers):
+    sm = get_client()
+
+    def push(change):
+        action, secret_id = change
+        if action == DELETE:
+            delete_secret(secret_id)
+            return
+
+        secret_string = plan._values[secret_id]
+        upsert_secret_string(secret_id, secret_string, plan._versions.get(secret_id))
+        version_id = client_request_token(secret_id, secret_string)
+        _write_tag(sm, secret_id, _tag(content_hash(secret_string), version_id))
+
+    _run(push, plan.changes(), counts, errors, max_workers)
+
+    retag = [
+        (secret_id, plan._tags[secret_id])
+        for secret_id in plan.unchanged
+        if secret_id in plan._tags
+    ]
+    _retag(sm, retag, errors, max_workers)
+
+
+def _pull(plan, counts, errors, max_workers):
+    sm = get_client()
+    wanted = [
+        secret_id
+        for secret_id in plan.add + plan.update
+        if secret_id not in plan._values
+    ]
+
+    values, read_errors = _read_values(wanted, max_workers)
+    errors.update(read_errors)
+    for secret_id, (secret_string, version_id) in values.items():
+        plan._values[secret_id] = secret_string
+        plan._tags[secret_id] = _tag(content_hash(secret_string), version_id)
+
+    with _DirectoryWriter(plan.directory, DEFAULT_FSYNC_BATCH) as writer:
+        for action, secret_id in plan.changes():
+            if secret_id in errors:
+                continue
+            try:
+                if action == DELETE:
+                    os.remove(os.path.join(plan.directory, secret_filename(secret_id)))
+                else:
+                    writer.write(secret_id, plan._values[secret_id])
+            except OSError as e:
+                errors[secret_id] = type(e).__name__
+                continue
+            counts[action] += 1
+
+    _retag(sm, list(plan._tags.items()), errors, max_workers)
+
+
+def _run(function, changes, counts, errors, max_workers):
+    def run(change):
+        try:
+            function(change)
+        except Exception as e:
+            return type(e).__name__
+        return None
+
+    if not changes:
+        return
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(changes))) as executor:
+        for (action, secret_id), error in zip(changes, executor.map(run, changes)):
+            if error is None:
+                counts[action] += 1
+            else:
+                errors[secret_id] = error
+
+
+def _retag(sm, tags, errors, max_workers):
+    tags = [(secret_id, value) for secret_id, value in tags if secret_id not in errors]
+    if not tags:
+        return
+
+    def retag(item):
+        secret_id, value = item
+        try:
+            _write_tag(sm, secret_id, value)
+        except Exception:
+            # Only a cache: the next plan reads the secret again instead.
+            pass
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tags))) as executor:
+        list(executor.map(retag, tags))
+
+
+def _write_tag(sm, secret_id, value):
+    rate_limit.call(
+        "TagResource",
+        sm.tag_resource,
+        SecretId=secret_id,
+        Tags=[{"Key": HASH_TAG, "Value": value}],
+    )
+
+
+def _key_id():
+    # Names the token key without revealing it, so a host holding another
+    # key knows not to compare its hashes with the tag's.
+    return hmac.new(load_token_key(), b"key id", hashlib.sha256).hexdigest()[:16]
+
+
+def _tag(digest, version_id):
+    return f"{_key_id()}:{digest}:{version_id}"
+
+
+def _tagged_hash(tags, current_version):
+    # A tag written under another key, or for an older version, says
+    # nothing about the current value.
+    fields = (tags.get(HASH_TAG) or "").split(":")
+    if len(fields) != 3:
+        return None
+    key_id, digest, version_id = fields
+    if key_id == _key_id() and current_version and version_id == current_version:
+        return digest
+    return None
+
+
+def _read_directory(directory, name_prefix):
+    values = {}
+    if not os.path.isdir(directory):
+        return values
+
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.startswith(".") or not entry.name.endswith(".txt"):
+                continue
+            if not entry.is_file():
+                continue
+            secret_id = secret_id_from_filename(entry.name)
+            if not secret_id.startswith(name_prefix or ""):
+                continue
+            with open(entry.path, "r", encoding="utf-8") as f:
+                values[secret_id] = f.read()
+    return values
+
+
+def _read_values(secret_ids, max_workers):
+    # Like `get_secrets()`, but keeping the VersionId each value was read at.
+    values = {}
+    errors = {}
+    chunks = [
+        secret_ids[i : i + BATCH_SIZE] for i in range(0, len(secret_ids), BATCH_SIZE)
+    ]
+    if not chunks:
+        return values, errors
+
+    sm = get_client()
+
+    def read(chunk):
+        kwargs = {"SecretIdList": chunk}
+        while True:
+            response = rate_limit.call(
+                "BatchGetSecretValue", sm.batch_get_secret_value, **kwargs
+            )
+            for value in response.get("SecretValues", []):
+                try:
+                    values[value["Name"]] = (
+                        secret_string_from(value),
+                        value["VersionId"],
+                    )
+                except SecretFormatError:
+                    errors[value["Name"]] = "SecretFormatError"
+            for error in response.get("Errors", []):
+                errors[error["SecretId"]] = error.get("ErrorCode")
+            if not response.get("NextToken"):
+                return
+            kwargs["NextToken"] = response["NextToken"]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        for chunk, future in [
+            (chunk, executor.submit(read, chunk)) for chunk in chunks
+        ]:
+            try:
+                future.result()
+            except Exception as e:
+                for secret_id in chunk:
+                    if secret_id not in values:
+                        errors.setdefault(secret_id, type(e).__name__)
+
+    for secret_id in secret_ids:
+        if secret_id not in values and secret_id not in errors:
+            errors[secret_id] = "ResourceNotFoundException"
+
+    return values, errors
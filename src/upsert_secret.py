@@ -0,0 +1,333 @@
+"""This module contains `upsert_secret()`, `update_secret()` and their variants.
+
+Those are `upsert_secret_string()` and `upsert_secrets()`.
+"""
+
+import hashlib
+import hmac
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from src import events, metrics, rate_limit
+from src.client import get_client
+from src.list_secrets import iter_secret_metadata
+from src.local_vault import decode_key, generate_key
+from src.secret_codec import encode_secret
+from src.validation import (
+    validate_secret,
+    validate_secret_id,
+    validate_secret_size,
+    FIELDS,
+)
+
+CREATED = "created"
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+FAILED = "failed"
+
+CURRENT_STAGE = "AWSCURRENT"
+
+DEFAULT_MAX_WORKERS = 8
+
+TOKEN_KEY_VARIABLE = "PASSWORD_MANAGER_TOKEN_KEY"
+
+_key_lock = threading.Lock()
+_key_files = {}
+
+
+def default_token_key_file() -> str:
+    """A function to return where the token key is kept by default.
+
+    PASSWORD_MANAGER_TOKEN_KEY overrides it.
+
+    Returns:
+        path (str): $XDG_CONFIG_HOME (or ~/.config)/password-manager/token.key.
+    """
+
+    config_dir = os.environ.get("XDG_CONFIG_HOME") or os.path.join(
+        os.path.expanduser("~"), ".config"
+    )
+    return os.path.join(config_dir, "password-manager", "token.key")
+
+
+def load_token_key() -> bytes:
+    """A function to return the key behind `client_request_token()`.
+
+    Its file is created if needed.
+
+    Returns:
+        key (bytes): the raw key, from PASSWORD_MANAGER_TOKEN_KEY or
+        `default_token_key_file()`.
+
+    Raises:
+        VaultKeyError: if the key is malformed.
+    """
+
+    key = os.environ.get(TOKEN_KEY_VARIABLE)
+    if key:
+        return decode_key(key)
+
+    key_file = default_token_key_file()
+    key = _key_files.get(key_file)
+    if key is not None:
+        return key
+
+    with _key_lock:
+        if key_file not in _key_files:
+            if not os.path.exists(key_file):
+                os.makedirs(os.path.dirname(key_file), mode=0o700, exist_ok=True)
+                try:
+                    fd = os.open(key_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+                except FileExistsError:
+                    # Created by another process since the check.
+                    pass
+                else:
+                    with os.fdopen(fd, "w", encoding="ascii") as f:
+                        f.write(generate_key() + "\n")
+            with open(key_file, "r", encoding="ascii") as f:
+                _key_files[key_file] = decode_key(f.read().strip())
+        return _key_files[key_file]
+
+
+def client_request_token(secret_id: str, secret_string: str) -> str:
+    """A function to derive the ClientRequestToken, and so the VersionId, for content.
+
+    The same name and content always give the same token, so a request
+    retried after a timeout cannot create a second version, and a secret
+    whose current VersionId equals the token already holds that content.
+
+    VersionIds can be read by anyone allowed to list or describe secrets,
+    so the token is an HMAC under a key that is never sent to the store:
+    PASSWORD_MANAGER_TOKEN_KEY, or the file at `default_token_key_file()`,
+    created readable only by you on first use. Without the key a VersionId
+    cannot be used to test guesses at a password.
+
+    Args:
+        secret_id (str): the name of the secret.
+        secret_string (str): the SecretString to be stored.
+
+    Returns:
+        token (str): a UUID string derived from an HMAC-SHA-256 of both.
+
+    Raises:
+        VaultKeyError: if the token key is malformed.
+    """
+
+    digest = hmac.new(
+        load_token_key(),
+        f"{secret_id}\0{secret_string}".encode("utf-8"),
+        hashlib.sha256,
+    ).digest()
+    return str(uuid.UUID(bytes=digest[:16], version=4))
+
+
+@metrics.instrument("upsert_secret")
+def upsert_secret(
+    secret_id: str, user_id: str, password: str, current_version: str = None
+) -> str:
+    """A function to store a user_id and password, creating the secret if needed.
+
+    An existing secret gets a new version from a single PutSecretValue;
+    a missing one is created. Both use `client_request_token()`, so
+    repeating a call is safe. Without current_version, one DescribeSecret
+    call finds the current version first, so content that is already
+    current is not written again.
+
+    Args:
+        secret_id (str): the name of the secret.
+        user_id (str): user_id to be saved.
+        password (str): password to be saved.
+        current_version (str): the secret's AWSCURRENT VersionId, if known,
+        e.g. from a listing, which saves the DescribeSecret call. When it
+        matches the new content nothing is sent.
+
+    Returns:
+        status (str): "created", "updated" or "unchanged".
+
+    Raises:
+        BlankArgumentError: if any argument is blank.
+        InvalidCharacterError: if secret_id contains any invalid characters.
+    """
+
+    return _write(secret_id, user_id, password, current_version, create=True)
+
+
+@metrics.instrument("update_secret")
+def update_secret(
+    secret_id: str, user_id: str, password: str, current_version: str = None
+) -> str:
+    """A function to store a new user_id and password in an existing secret.
+
+    Args:
+        secret_id (str): the name of the secret.
+        user_id (str): user_id to be saved.
+        password (str): password to be saved.
+        current_version (str): the secret's AWSCURRENT VersionId, if known.
+
+    Returns:
+        status (str): "updated" or "unchanged".
+
+    Raises:
+        BlankArgumentError: if any argument is blank.
+        InvalidCharacterError: if secret_id contains any invalid characters.
+        ResourceNotFoundException: if secret not found in AWS Secrets Manager.
+    """
+
+    return _write(secret_id, user_id, password, current_version, create=False)
+
+
+@metrics.instrument("upsert_secret_string")
+def upsert_secret_string(
+    secret_id: str, secret_string: str, current_version: str = None
+) -> str:
+    """A function to store an encoded SecretString, creating the secret if needed.
+
+    This is `upsert_secret()` for values that are replayed rather than
+    built from a user_id and password, e.g. by `snapshot.restore_snapshot()`.
+
+    Args:
+        secret_id (str): the name of the secret.
+        secret_string (str): the SecretString to be stored.
+        current_version (str): the secret's AWSCURRENT VersionId, if known.
+
+    Returns:
+        status (str): "created", "updated" or "unchanged".
+
+    Raises:
+        BlankArgumentError: if secret_id is blank.
+        SecretTooLargeError: if secret_string is over MAX_SECRET_SIZE bytes.
+    """
+
+    validate_secret_id(secret_id)
+    validate_secret_size(secret_string)
+    return _put(secret_id, secret_string, current_version, create=True)
+
+
+def upsert_secrets(rows, max_workers: int = DEFAULT_MAX_WORKERS) -> dict:
+    """A function to reconcile many secrets with one call per changed secret.
+
+    The current version of every secret is read from the listing first,
+    a page of up to 100 secrets per call, so secrets whose content is
+    unchanged are skipped without a request of their own.
+
+    Args:
+        rows (iterable): dicts with secret_identifier, user_id and password fields.
+        max_workers (int): the maximum number of secrets written at once.
+
+    Returns:
+        results (dict): a mapping of secret name to "created", "updated",
+        "unchanged" or "failed".
+    """
+
+    rows = [tuple(str(row.get(f) or "") for f in FIELDS) for row in rows]
+
+    current_versions = {}
+    for secret in iter_secret_metadata():
+        for version_id, stages in secret.get("SecretVersionsToStages", {}).items():
+            if CURRENT_STAGE in stages:
+                current_versions[secret["Name"]] = version_id
+
+    def upsert(row):
+        secret_id, user_id, password = row
+        try:
+            return upsert_secret(
+                secret_id, user_id, password, current_versions.get(secret_id)
+            )
+        except Exception:
+            return FAILED
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        statuses = executor.map(upsert, rows)
+        return {row[0]: status for row, status in zip(rows, statuses)}
+
+
+def _write(secret_id, user_id, password, current_version, create):
+    validate_secret(secret_id, user_id, password)
+    return _put(secret_id, encode_secret(user_id, password), current_version, create)
+
+
+def _put(secret_id, secret_string, current_version, create):
+    token = client_request_token(secret_id, secret_string)
+
+    if current_version == token:
+        return UNCHANGED
+
+    sm = get_client()
+
+    if current_version is None:
+        # One metadata call tells whether the content is already current,
+        # and whether the secret exists at all.
+        try:
+            current_version = _current_version(sm, secret_id)
+        except sm.exceptions.ResourceNotFoundException:
+            if not create:
+                print(f"ResourceNotFoundError: {secret_id} not found.")
+                raise
+            return _create(sm, secret_id, secret_string, token)
+
+        if current_version == token:
+            return UNCHANGED
+
+    try:
+        response = rate_limit.call(
+            "PutSecretValue",
+            sm.put_secret_value,
+            SecretId=secret_id,
+            SecretString=secret_string,
+            ClientRequestToken=token,
+        )
+
+    except sm.exceptions.ResourceNotFoundException:
+        if not create:
+            print(f"ResourceNotFoundError: {secret_id} not found.")
+            raise
+        return _create(sm, secret_id, secret_string, token)
+
+    if CURRENT_STAGE not in response.get("VersionStages", []):
+        # The content matches an older version, so the put was ignored;
+        # make that version current again.
+        _make_current(sm, secret_id, token)
+
+    events.notify(events.UPDATED, secret_id)
+    return UPDATED
+
+
+def _create(sm, secret_id, secret_string, token):
+    try:
+        rate_limit.call(
+            "CreateSecret",
+            sm.create_secret,
+            Name=secret_id,
+            SecretString=secret_string,
+            ClientRequestToken=token,
+        )
+    except sm.exceptions.ResourceExistsException:
+        # Created by someone else since the check; write over it instead.
+        return _put(secret_id, secret_string, None, create=False)
+
+    events.notify(events.CREATED, secret_id)
+    return CREATED
+
+
+def _current_version(sm, secret_id):
+    response = rate_limit.call("DescribeSecret", sm.describe_secret, SecretId=secret_id)
+
+    for version_id, stages in response.get("VersionIdsToStages", {}).items():
+        if CURRENT_STAGE in stages:
+            return version_id
+    return None
+
+
+def _make_current(sm, secret_id, version_id):
+    current = _current_version(sm, secret_id)
+    kwargs = {"RemoveFromVersionId": current} if current else {}
+    rate_limit.call(
+        "UpdateSecretVersionStage",
+        sm.update_secret_version_stage,
+        SecretId=secret_id,
+        VersionStage=CURRENT_STAGE,
+        MoveToVersionId=version_id,
+        **kwargs,
+    )
@@ -0,0 +1,201 @@
+"""This module contains the validation rules and errors shared by every operation.
+
+Checks run locally, before any request is made. `validate_batch()` checks
+many rows in one pass and reports every problem instead of raising.
+"""
+
+import re
+
+from src.secret_codec import encode_secret
+
+# Secrets Manager's limits on secret names and on the size of a value.
+MAX_NAME_LENGTH = 512
+MAX_SECRET_SIZE = 65536
+
+NAME_PATTERN = re.compile(r"[A-Za-z0-9/_+=.@-]+")
+
+FIELDS = ("secret_identifier", "user_id", "password")
+
+_ENVELOPE_SIZE = len(encode_secret("", ""))
+
+
+class ValidationError(Exception):
+    """Traps errors where input is rejected before any request is made."""
+
+
+class BlankArgumentError(ValidationError):
+    """Traps errors where blank arguments are passed."""
+
+
+class InvalidCharacterError(ValidationError):
+    """Traps errors where invalid characters are used in secret_identifier."""
+
+
+class NameTooLongError(ValidationError):
+    """Traps errors where secret_identifier is longer than MAX_NAME_LENGTH."""
+
+
+class SecretTooLargeError(ValidationError):
+    """Traps errors where a secret value is larger than MAX_SECRET_SIZE bytes."""
+
+
+class DuplicateSecretError(ValidationError):
+    """Traps errors where one batch names the same secret more than once."""
+
+
+def validate_secret_id(secret_id: str):
+    """A function to check a secret id, name or ARN, given to a read or delete.
+
+    Args:
+        secret_id (str): the name or ARN of the secret.
+
+    Raises:
+        BlankArgumentError: if secret_id is blank.
+    """
+
+    if len(secret_id) == 0:
+        raise BlankArgumentError(
+            print("BlankArgumentError: secret_id cannot be blank.")
+        )
+
+
+def validate_secret_ids(secret_ids: list):
+    """A function to check every id in a batch read.
+
+    Args:
+        secret_ids (list): the names or ARNs of the secrets.
+
+    Raises:
+        BlankArgumentError: if any secret_id is blank.
+    """
+
+    if not all(secret_ids):
+        raise BlankArgumentError(
+            print("BlankArgumentError: secret_id cannot be blank.")
+        )
+
+
+def validate_secret(secret_identifier: str, user_id: str, password: str):
+    """A function to check the arguments for a new secret.
+
+    Args:
+        secret_identifier (str): the name of the secret.
+        user_id (str): user_id to be saved.
+        password (str): password to be saved.
+
+    Raises:
+        BlankArgumentError: if any argument is blank.
+        NameTooLongError: if secret_identifier is over MAX_NAME_LENGTH characters.
+        InvalidCharacterError: if secret_identifier contains any invalid
+        characters.
+        SecretTooLargeError: if the stored value would be over MAX_SECRET_SIZE bytes.
+    """
+
+    problem = _check(secret_identifier, user_id, password)
+    if problem is not None:
+        error, message = problem
+        raise error(print(f"{error.__name__}: {message}"))
+
+
+def validate_secret_size(value):
+    """A function to check the size of an encoded SecretString or SecretBinary.
+
+    Args:
+        value (str | bytes): the value to be stored.
+
+    Raises:
+        SecretTooLargeError: if the value is over MAX_SECRET_SIZE bytes.
+    """
+
+    size = len(value.encode("utf-8")) if isinstance(value, str) else len(value)
+    if size > MAX_SECRET_SIZE:
+        raise SecretTooLargeError(print(f"SecretTooLargeError: {_too_large(size)}"))
+
+
+def validate_batch(rows) -> dict:
+    """A function to check many new secrets in one pass, without raising.
+
+    Each row is checked as `validate_secret()` would check it, and a name
+    already seen earlier in the batch is reported as a duplicate.
+
+    Args:
+        rows (iterable): dicts with secret_identifier, user_id and password
+        fields, e.g. from `import_secrets.iter_rows()`.
+
+    Returns:
+        report (dict): the number of "valid" and "invalid" rows, and
+        "errors", a list with the "row" number (from 1),
+        "secret_identifier", "error" class name and "message" of each
+        invalid row.
+    """
+
+    report = {"valid": 0, "invalid": 0, "errors": []}
+    seen = set()
+
+    for row_number, row in enumerate(rows, start=1):
+        secret_identifier, user_id, password = (str(row.get(f) or "") for f in FIELDS)
+
+        problem = _check(secret_identifier, user_id, password)
+        if problem is None and secret_identifier in seen:
+            problem = DuplicateSecretError, "secret_identifier appears more than once."
+
+        if problem is None:
+            seen.add(secret_identifier)
+            report["valid"] += 1
+            continue
+
+        error, message = problem
+        report["invalid"] += 1
+        report["errors"].append(
+            {
+                "row": row_number,
+                "secret_identifier": secret_identifier,
+                "error": error.__name__,
+                "message": message,
+            }
+        )
+
+    return report
+
+
+def check_secret(secret_identifier: str, user_id: str, password: str):
+    """A function to check the arguments for a new secret without raising or printing.
+
+    Returns:
+        error (type): the ValidationError subclass `validate_secret()`
+        would raise, or None if the arguments are valid.
+    """
+
+    problem = _check(secret_identifier, user_id, password)
+    return None if problem is None else problem[0]
+
+
+def _check(secret_identifier, user_id, password):
+    if not secret_identifier or not user_id or not password:
+        return BlankArgumentError, "arguments cannot be blank."
+
+    if len(secret_identifier) > MAX_NAME_LENGTH:
+        return (
+            NameTooLongError,
+            f"secret_identity cannot be longer than {MAX_NAME_LENGTH} characters.",
+        )
+
+    if NAME_PATTERN.fullmatch(secret_identifier) is None:
+        return (
+            InvalidCharacterError,
+            "secret_identity can only contain ASCII letters, numbers "
+            "and the following characters: /_+=.@-",
+        )
+
+    # No character encodes to more than 6 bytes (a \u00XX escape), so only
+    # values that could be near the limit are encoded to be measured.
+    if (len(user_id) + len(password)) * 6 + _ENVELOPE_SIZE > MAX_SECRET_SIZE:
+        size = len(encode_secret(user_id, password).encode("utf-8"))
+        if size > MAX_SECRET_SIZE:
+            return SecretTooLargeError, _too_large(size)
+
+    return None
+
+
+def _too_large(size):
+    return f"the secret is {size} bytes; the limit is {MAX_SECRET_SIZE}."
@@ -0,0 +1,43 @@
+"""Fixtures shared by the test suites that run against every backend."""
+
+import os
+
+import pytest
+from moto import mock_aws
+
+from src.client import get_client, reset_clients, BACKEND_VARIABLE, VAULT_VARIABLE
+from src.local_vault import generate_key
+from src.upsert_secret import TOKEN_KEY_VARIABLE
+
+
+@pytest.fixture(autouse=True)
+def token_key(monkeypatch):
+    """A token key per test, so no test creates one in the user's config directory"""
+    monkeypatch.setenv(TOKEN_KEY_VARIABLE, generate_key())
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    """Mocked AWS Credentials for moto"""
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+
+
+@pytest.fixture(params=["aws", "local"])
+def backend(request, aws_credentials, tmp_path, monkeypatch):
+    """The client of each backend, selected the way users select it"""
+    if request.param == "aws":
+        with mock_aws():
+            yield get_client()
+        return
+
+    monkeypatch.setenv(BACKEND_VARIABLE, "local")
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    monkeypatch.setenv(VAULT_VARIABLE, str(tmp_path / "vault" / "vault.db"))
+    reset_clients()
+    yield get_client()
+    get_client().close()
+    reset_clients()
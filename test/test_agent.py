@@ -0,0 +1,206 @@
+"""This module contains the test suite for `serve_agent()` and `AgentClient`."""
+
+import os
+import socket
+import stat
+import threading
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from src import client as client_module
+from src.agent import serve_agent, AgentClient, AgentError
+from src.create_secret import create_secret
+from src.get_secret import get_secret
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    """Mocked AWS Credentials for moto"""
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+
+
+@pytest.fixture
+def mock_secretsmanager(aws_credentials):
+    """Mock secretsmanager client"""
+    with mock_aws():
+        yield boto3.client("secretsmanager", region_name="eu-west-2")
+
+
+def start_agent(path, **kwargs):
+    ready = threading.Event()
+    thread = threading.Thread(
+        target=serve_agent,
+        args=(path,),
+        kwargs={"ready": lambda _: ready.set(), **kwargs},
+        daemon=True,
+    )
+    thread.start()
+    assert ready.wait(10)
+    return thread
+
+
+@pytest.fixture
+def agent(mock_secretsmanager, tmp_path):
+    """A running agent and a client connected to it"""
+    path = str(tmp_path / "agent.sock")
+    thread = start_agent(path)
+    client = AgentClient(path)
+    yield client
+    if thread.is_alive():
+        client.stop()
+    thread.join(10)
+
+
+@pytest.mark.describe("AgentClient")
+@pytest.mark.it("should create, get, list and delete secrets through the agent")
+def test_operations(agent):
+    """The client should return what the library functions return."""
+    assert agent.create_secret("test_secret", "test_id", "test_password") == 200
+    assert agent.get_secret("test_secret") == get_secret("test_secret")
+    assert agent.upsert_secret("test_secret", "test_id", "changed") == "updated"
+    assert agent.list_secrets() == ["test_secret"]
+    assert agent.delete_secret("test_secret", force_delete=True) == 200
+    assert agent.list_secrets() == []
+
+
+@pytest.mark.describe("AgentClient")
+@pytest.mark.it("should serve repeated reads from the cache and see its own writes")
+def test_cache(agent):
+    """Reads should hit the agent's cache until a write through it invalidates it."""
+    create_secret("test_secret", "test_id", "test_password")
+    for _ in range(5):
+        agent.get_secret("test_secret")
+    assert agent.ping()["cache"]["hits"] == 4
+
+    agent.upsert_secret("test_secret", "test_id", "changed")
+    assert (
+        agent.get_secret("test_secret") == '{"user_id":"test_id","password":"changed"}'
+    )
+
+
+@pytest.mark.describe("AgentClient")
+@pytest.mark.it("should raise AgentError with the agent's error class")
+def test_errors(agent):
+    """Failed requests should name the error raised in the agent."""
+    with pytest.raises(AgentError) as e:
+        agent.get_secret("missing")
+    assert e.value.error == "ResourceNotFoundException"
+
+    with pytest.raises(AgentError) as e:
+        agent.get_secret("")
+    assert e.value.error == "BlankArgumentError"
+
+    assert agent.call({"op": "unknown"})["error"] == "ValueError"
+
+
+@pytest.mark.describe("AgentClient")
+@pytest.mark.it("should be usable from many threads at once")
+def test_threads(agent):
+    """One client should serialise concurrent requests on its connection."""
+    create_secret("test_secret", "test_id", "test_password")
+    results = []
+
+    def read():
+        results.append(agent.get_secret("test_secret"))
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(results)) == 1 and len(results) == 8
+
+
+@pytest.mark.describe("AgentClient")
+@pytest.mark.it("should not send a request again after its response times out")
+def test_no_retry_after_timeout(tmp_path):
+    """A request the agent may still be running should not be repeated."""
+    path = str(tmp_path / "agent.sock")
+    received = []
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(path)
+        server.listen()
+
+        def accept():
+            # Read requests without ever answering, as a slow agent would.
+            server.settimeout(5)
+            try:
+                while True:
+                    conn, _ = server.accept()
+                    received.append(conn.recv(4096))
+            except OSError:
+                pass
+
+        thread = threading.Thread(target=accept, daemon=True)
+        thread.start()
+
+        with pytest.raises(AgentError) as e:
+            AgentClient(path, timeout=0.2).delete_secret("test_secret")
+        assert e.value.error == "TimeoutError"
+    thread.join(10)
+    assert len(received) == 1
+
+
+@pytest.mark.describe("serve_agent()")
+@pytest.mark.it("should create the socket with the configured permissions")
+def test_socket_mode(mock_secretsmanager, tmp_path):
+    """serve_agent() should chmod the socket and remove it on exit."""
+    path = str(tmp_path / "agent.sock")
+    thread = start_agent(path, mode=0o660)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o660
+
+    with pytest.raises(AgentError):
+        serve_agent(path)
+
+    AgentClient(path).stop()
+    thread.join(10)
+    assert not os.path.exists(path)
+
+
+@pytest.mark.describe("serve_agent()")
+@pytest.mark.it("should exit after the idle timeout and replace a stale socket")
+def test_idle_timeout(mock_secretsmanager, tmp_path):
+    """serve_agent() should shut down when idle, and clients then fail cleanly."""
+    path = str(tmp_path / "agent.sock")
+    thread = start_agent(path, idle_timeout=0.5)
+    client = AgentClient(path)
+    assert client.ping()["pid"] == os.getpid()
+
+    thread.join(10)
+    assert not thread.is_alive()
+    with pytest.raises(AgentError):
+        client.ping()
+
+    # A socket left behind by a crashed agent does not block a new one.
+    with open(path, "w"):
+        pass
+    thread = start_agent(path)
+    assert client.ping()["cache"]["size"] == 0
+    client.stop()
+    thread.join(10)
+
+
+@pytest.mark.describe("serve_agent()")
+@pytest.mark.it("should report a failed warm-up on stderr and keep serving")
+def test_warm_up_failure(mock_secretsmanager, tmp_path, monkeypatch, capsys):
+    """serve_agent() should not hide a credentials problem until the first request."""
+
+    def broken_client(*args, **kwargs):
+        raise RuntimeError("no credentials")
+
+    monkeypatch.setattr(client_module, "get_client", broken_client)
+    path = str(tmp_path / "agent.sock")
+    thread = start_agent(path)
+    assert "no credentials" in capsys.readouterr().err
+
+    client = AgentClient(path)
+    assert client.ping()["pid"] == os.getpid()
+    client.stop()
+    thread.join(10)
@@ -0,0 +1,171 @@
+"""This module contains the test suite for the `async_secrets` module."""
+
+import asyncio
+import os
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from src import async_secrets
+from src.create_secret import BlankArgumentError, InvalidCharacterError
+from src.get_secret import BlankArgumentError as GetBlankArgumentError
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    """Mocked AWS Credentials for moto"""
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+
+
+@pytest.fixture
+def mock_secretsmanager(aws_credentials):
+    """Mock secretsmanager client"""
+    with mock_aws():
+        yield boto3.client("secretsmanager", region_name="eu-west-2")
+
+
+@pytest.mark.describe("async_secrets")
+@pytest.mark.it("should create, get, list and delete secrets")
+def test_round_trip(mock_secretsmanager):
+    """the async operations should behave like their sync counterparts."""
+
+    async def main():
+        assert (
+            await async_secrets.create_secret("test_secret", "test_id", "test_password")
+            == 200
+        )
+        assert await async_secrets.list_secrets() == ["test_secret"]
+        assert (
+            await async_secrets.get_secret("test_secret")
+            == '{"user_id":"test_id","password":"test_password"}'
+        )
+        assert await async_secrets.delete_secret("test_secret") == 200
+        assert await async_secrets.list_secrets() == []
+
+    asyncio.run(main())
+
+
+@pytest.mark.describe("async_secrets")
+@pytest.mark.it("should accept the sync functions' optional arguments")
+def test_optional_arguments(mock_secretsmanager):
+    """create_secret() and delete_secret() should pass optional arguments through."""
+
+    async def main():
+        assert (
+            await async_secrets.create_secret(
+                "test_secret",
+                "test_id",
+                "test_password",
+                binary=True,
+                replica_regions=["eu-west-1"],
+            )
+            == 200
+        )
+        response = mock_secretsmanager.describe_secret(SecretId="test_secret")
+        assert [replica["Region"] for replica in response["ReplicationStatus"]] == [
+            "eu-west-1"
+        ]
+        assert "SecretBinary" in mock_secretsmanager.get_secret_value(
+            SecretId="test_secret"
+        )
+
+        await async_secrets.create_secret(
+            "recoverable_secret", "test_id", "test_password"
+        )
+        assert (
+            await async_secrets.delete_secret(
+                "recoverable_secret", recovery_window_in_days=7
+            )
+            == 200
+        )
+        assert "DeletedDate" in mock_secretsmanager.describe_secret(
+            SecretId="recoverable_secret"
+        )
+
+        await async_secrets.create_secret("other_secret", "test_id", "test_password")
+        assert (
+            await async_secrets.delete_secret("other_secret", force_delete=True) == 200
+        )
+        with pytest.raises(mock_secretsmanager.exceptions.ResourceNotFoundException):
+            mock_secretsmanager.describe_secret(SecretId="other_secret")
+        with pytest.raises(ValueError):
+            await async_secrets.delete_secret(
+                "test_secret", recovery_window_in_days=7, force_delete=True
+            )
+
+    asyncio.run(main())
+
+
+@pytest.mark.describe("async_secrets")
+@pytest.mark.it("should raise the same errors as the sync functions")
+def test_same_errors(mock_secretsmanager):
+    """the async operations should raise the sync functions' exceptions."""
+
+    async def main():
+        with pytest.raises(BlankArgumentError):
+            await async_secrets.create_secret("", "test_id", "test_password")
+        with pytest.raises(InvalidCharacterError):
+            await async_secrets.create_secret("±±±", "test_id", "test_password")
+        with pytest.raises(GetBlankArgumentError):
+            await async_secrets.get_secret("")
+        with pytest.raises(mock_secretsmanager.exceptions.ResourceNotFoundException):
+            await async_secrets.get_secret("missile_codes")
+
+    asyncio.run(main())
+
+
+@pytest.mark.describe("async_secrets.get_secrets()")
+@pytest.mark.it("should batch fetch secrets and report missing ids")
+def test_get_secrets(mock_secretsmanager):
+    """get_secrets() should return values and per-id errors."""
+    names = [f"test_secret{i}" for i in range(45)]
+
+    async def main():
+        await asyncio.gather(
+            *(
+                async_secrets.create_secret(name, "test_id", "test_password")
+                for name in names
+            )
+        )
+        return await async_secrets.get_secrets(names + ["missile_codes"])
+
+    secrets, errors = asyncio.run(main())
+    assert sorted(secrets) == sorted(names)
+    assert errors["missile_codes"]["ErrorCode"] == "ResourceNotFoundException"
+
+
+@pytest.mark.describe("async_secrets.gather_secrets()")
+@pytest.mark.it("should fetch secrets concurrently within the concurrency limit")
+def test_gather_secrets(mock_secretsmanager):
+    """gather_secrets() should respect the configured concurrency limit."""
+    async_secrets.set_concurrency(2)
+    try:
+
+        async def main():
+            await async_secrets.create_secret("test_secret", "test_id", "test_password")
+            return await async_secrets.gather_secrets(
+                ["test_secret", "missile_codes"] * 5
+            )
+
+        secrets, errors = asyncio.run(main())
+        assert list(secrets) == ["test_secret"]
+        assert isinstance(
+            errors["missile_codes"],
+            mock_secretsmanager.exceptions.ResourceNotFoundException,
+        )
+        assert async_secrets._executor._max_workers == 2
+    finally:
+        async_secrets.set_concurrency(async_secrets.DEFAULT_CONCURRENCY)
+
+
+@pytest.mark.describe("async_secrets.set_concurrency()")
+@pytest.mark.it("should error when passed a limit below 1")
+def test_set_concurrency_invalid():
+    """set_concurrency() should raise ValueError for limits below 1."""
+    with pytest.raises(ValueError):
+        async_secrets.set_concurrency(0)
@@ -0,0 +1,81 @@
+"""This module contains the test suite for the benchmark suite."""
+
+import json
+
+import pytest
+
+from src.benchmark import compare, main, summarise
+
+
+def report(**results):
+    return {"environment": {}, "results": results}
+
+
+@pytest.mark.describe("summarise()")
+@pytest.mark.it("should report nearest-rank percentiles and throughput")
+def test_summarise():
+    """summarise() should convert seconds to milliseconds."""
+    samples = [i / 1000 for i in range(1, 101)]
+    summary = summarise(samples, elapsed=2.0)
+    assert summary["n"] == 100
+    assert summary["p50_ms"] == pytest.approx(50)
+    assert summary["p90_ms"] == pytest.approx(90)
+    assert summary["p99_ms"] == pytest.approx(99)
+    assert summary["max_ms"] == pytest.approx(100)
+    assert summary["ops_per_second"] == 50
+
+
+@pytest.mark.describe("summarise()")
+@pytest.mark.it("should handle a single sample")
+def test_summarise_single():
+    """summarise() should use the one sample for every percentile."""
+    summary = summarise([0.25], elapsed=0.25)
+    assert summary["p50_ms"] == summary["p99_ms"] == pytest.approx(250)
+
+
+@pytest.mark.describe("compare()")
+@pytest.mark.it(
+    "should flag slower latencies and lower throughput beyond the threshold"
+)
+def test_compare():
+    """compare() should only report metrics that got worse by over the threshold."""
+    baseline = report(
+        **{
+            "100/single/get": {"p50_ms": 10, "p99_ms": 20, "ops_per_second": 100},
+            "100/single/list": {"p50_ms": 10, "p99_ms": 20, "ops_per_second": 100},
+            "1000/single/get": {"p50_ms": 10, "p99_ms": 20, "ops_per_second": 100},
+        }
+    )
+    current = report(
+        **{
+            "100/single/get": {"p50_ms": 10.5, "p99_ms": 30, "ops_per_second": 80},
+            "100/single/list": {"p50_ms": 5, "p99_ms": 10, "ops_per_second": 200},
+        }
+    )
+    regressions = compare(baseline, current, threshold=0.10)
+    assert [(r["key"], r["metric"]) for r in regressions] == [
+        ("100/single/get", "p99_ms"),
+        ("100/single/get", "ops_per_second"),
+    ]
+    assert regressions[0]["change"] == pytest.approx(0.5)
+
+
+@pytest.mark.describe("main()")
+@pytest.mark.it(
+    "should benchmark against a local moto server and compare with a baseline"
+)
+def test_main(tmp_path):
+    """main() should write a report and pass against itself as the baseline."""
+    pytest.importorskip("flask")
+    output = tmp_path / "report.json"
+    assert main(["--counts", "5", "--workers", "2", "--output", str(output)]) == 0
+    results = json.loads(output.read_text())["results"]
+    assert set(results) == {
+        f"5/{mode}/{op}"
+        for mode in ("single", "batch", "concurrent")
+        for op in ("create", "get", "list", "delete")
+    }
+    assert results["5/single/get"]["n"] == 5
+    assert (
+        main(["--counts", "5", "--baseline", str(output), "--threshold", "1000"]) == 0
+    )
@@ -0,0 +1,278 @@
+"""This module contains the test suite for the command line interface."""
+
+import io
+import json
+import os
+import threading
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from src import metrics
+from src.agent import serve_agent, AgentClient
+from src.cli import main, run_batch, run_command
+from src.create_secret import create_secret
+from src.get_secret import get_secret
+from src.list_secrets import list_secrets
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    """Mocked AWS Credentials for moto"""
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+
+
+@pytest.fixture
+def mock_secretsmanager(aws_credentials):
+    """Mock secretsmanager client"""
+    with mock_aws():
+        yield boto3.client("secretsmanager", region_name="eu-west-2")
+
+
+def output_lines(capsys):
+    """parse the JSON lines written to stdout"""
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+@pytest.mark.describe("main()")
+@pytest.mark.it("should create, get, list and delete secrets with subcommands")
+def test_subcommands(mock_secretsmanager, monkeypatch, capsys):
+    """main() should run each subcommand and print a JSON result."""
+    monkeypatch.setattr("sys.stdin", io.StringIO("test_password\n"))
+    assert main(["create", "test_secret", "test_id", "--password-stdin"]) == 0
+    assert main(["get", "test_secret"]) == 0
+    assert main(["list", "--prefix", "test_"]) == 0
+    assert main(["delete", "test_secret", "--force"]) == 0
+    results = output_lines(capsys)
+    assert [r["ok"] for r in results] == [True, True, True, True]
+    assert results[1]["result"] == '{"user_id":"test_id","password":"test_password"}'
+    assert results[2]["result"] == ["test_secret"]
+
+
+@pytest.mark.describe("main()")
+@pytest.mark.it("should exit 1 and report the error class when a command fails")
+def test_subcommand_failure(mock_secretsmanager, capsys):
+    """main() should print the error as JSON and keep diagnostics off stdout."""
+    assert main(["get", "missile_codes"]) == 1
+    captured = capsys.readouterr()
+    assert json.loads(captured.out)["error"] == "ResourceNotFoundException"
+    assert "missile_codes not found" in captured.err
+
+
+@pytest.mark.describe("main()")
+@pytest.mark.it("should read the password from stdin when asked")
+def test_password_stdin(mock_secretsmanager, monkeypatch):
+    """main() should take the password from stdin with --password-stdin."""
+    monkeypatch.setattr("sys.stdin", io.StringIO("s3cret\n"))
+    assert main(["create", "test_secret", "test_id", "--password-stdin"]) == 0
+    assert json.loads(get_secret("test_secret"))["password"] == "s3cret"
+
+
+@pytest.mark.describe("main()")
+@pytest.mark.it("should prompt for the password when it is not given")
+def test_password_prompt(mock_secretsmanager, monkeypatch):
+    """main() should ask for the password with getpass by default."""
+    prompts = []
+    monkeypatch.setattr(
+        "getpass.getpass", lambda prompt: prompts.append(prompt) or "s3cret"
+    )
+    assert main(["create", "test_secret", "test_id"]) == 0
+    assert prompts == ["Password: "]
+    assert json.loads(get_secret("test_secret"))["password"] == "s3cret"
+
+
+@pytest.mark.describe("main()")
+@pytest.mark.it("should warn when the password is passed as an argument")
+def test_password_argument(mock_secretsmanager, capsys):
+    """main() should still accept --password, but warn that it is visible to others."""
+    assert main(["create", "test_secret", "test_id", "--password", "s3cret"]) == 0
+    assert "--password-stdin" in capsys.readouterr().err
+    assert json.loads(get_secret("test_secret"))["password"] == "s3cret"
+
+
+@pytest.mark.describe("run_command()")
+@pytest.mark.it("should report unknown operations")
+def test_unknown_op():
+    """run_command() should fail cleanly for an unknown op."""
+    result = run_command({"op": "rotate"})
+    assert result["ok"] is False
+    assert result["error"] == "ValueError"
+
+
+@pytest.mark.describe("run_batch()")
+@pytest.mark.it("should run many commands in input order with concurrency")
+def test_batch(mock_secretsmanager):
+    """run_batch() should write one ordered JSON result per command."""
+    create_secret("existing", "test_id", "test_password")
+    commands = [
+        {
+            "op": "create",
+            "secret_id": f"test_secret{i}",
+            "user_id": "u",
+            "password": "p",
+        }
+        for i in range(20)
+    ]
+    commands += [
+        {"op": "get", "secret_id": "existing"},
+        {"op": "get", "secret_id": "missing"},
+    ]
+    stream = io.StringIO("\n".join(json.dumps(c) for c in commands) + "\nnot json\n")
+    out = io.StringIO()
+    failures = run_batch(stream, out, max_workers=4)
+    results = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["line"] for r in results] == list(range(1, 24))
+    assert all(r["ok"] for r in results[:21])
+    assert results[21]["error"] == "ResourceNotFoundException"
+    assert results[22]["error"] == "InvalidCommand"
+    assert failures == 2
+
+
+@pytest.mark.describe("main()")
+@pytest.mark.it("should run a batch file")
+def test_batch_file(mock_secretsmanager, tmp_path, capsys):
+    """main() should read batch commands from a file."""
+    path = tmp_path / "commands.jsonl"
+    path.write_text(json.dumps({"op": "list"}) + "\n", encoding="utf-8")
+    assert main(["batch", str(path), "--workers", "2"]) == 0
+    assert output_lines(capsys) == [{"line": 1, "op": "list", "ok": True, "result": []}]
+
+
+@pytest.mark.describe("main()")
+@pytest.mark.it("should export secrets")
+def test_export(mock_secretsmanager, tmp_path, capsys):
+    """main() should print the export summary."""
+    create_secret("test_secret", "test_id", "test_password")
+    target = tmp_path / "export.jsonl"
+    assert main(["export", str(target), "--format", "jsonl"]) == 0
+    assert output_lines(capsys) == [{"exported": 1, "errors": {}}]
+    assert target.exists()
+
+
+@pytest.mark.describe("main()")
+@pytest.mark.it("should record metrics when asked")
+def test_metrics_file(mock_secretsmanager, tmp_path, capsys):
+    """main() should enable metrics with a Prometheus text-file sink."""
+    path = tmp_path / "password_manager.prom"
+    try:
+        assert main(["--metrics-file", str(path), "list"]) == 0
+        metrics.flush()
+    finally:
+        metrics.disable()
+    assert 'operation="list_secrets"' in path.read_text()
+
+
+@pytest.mark.describe("main()")
+@pytest.mark.it("should upsert a secret")
+def test_upsert(mock_secretsmanager, monkeypatch, capsys):
+    """main() should create a secret and then add a version to it."""
+    passwords = iter(["first", "second"])
+    monkeypatch.setattr("getpass.getpass", lambda prompt: next(passwords))
+    assert main(["upsert", "test_secret", "test_id"]) == 0
+    assert main(["upsert", "test_secret", "test_id"]) == 0
+    assert [line["result"] for line in output_lines(capsys)] == ["created", "updated"]
+    assert get_secret("test_secret") == '{"user_id":"test_id","password":"second"}'
+
+
+@pytest.mark.describe("main()")
+@pytest.mark.it("should print an inventory")
+def test_inventory(mock_secretsmanager, capsys):
+    """main() should print one metadata line per secret."""
+    create_secret("test_secret", "test_id", "test_password")
+    assert main(["inventory", "--describe", "--workers", "2"]) == 0
+    lines = output_lines(capsys)
+    assert [line["name"] for line in lines] == ["test_secret"]
+    assert lines[0]["replica_regions"] == []
+
+
+@pytest.mark.describe("main()")
+@pytest.mark.it("should snapshot and restore secrets")
+def test_snapshot_restore(mock_secretsmanager, tmp_path, capsys, monkeypatch):
+    """main() should print the snapshot and restore summaries."""
+    monkeypatch.delenv("PASSWORD_MANAGER_SNAPSHOT_KEY", raising=False)
+    create_secret("test_secret", "test_id", "test_password")
+    path, key_file = str(tmp_path / "backup.snap"), str(tmp_path / "snapshot.key")
+
+    assert main(["snapshot", path, "--key-file", key_file]) == 0
+    assert output_lines(capsys)[0]["secrets"] == 1
+
+    assert main(["restore", path, "--key-file", key_file]) == 0
+    assert output_lines(capsys)[0]["unchanged"] == 1
+
+
+@pytest.mark.describe("main()")
+@pytest.mark.it("should rotate the selected secrets")
+def test_rotate(mock_secretsmanager, tmp_path, capsys):
+    """main() should print one status line per rotated secret."""
+    create_secret("prod/db", "test_id", "test_password")
+    journal = str(tmp_path / "rotation.jsonl")
+    assert main(["rotate", "--prefix", "prod/", "--journal", journal]) == 0
+    assert output_lines(capsys) == [{"secret_id": "prod/db", "status": "rotated"}]
+    assert main(["rotate", "--prefix", "prod/", "--journal", journal]) == 0
+    assert output_lines(capsys) == [{"secret_id": "prod/db", "status": "skipped"}]
+
+
+@pytest.mark.describe("main()")
+@pytest.mark.it("should list sync changes and make them only with --apply")
+def test_sync(mock_secretsmanager, tmp_path, capsys):
+    """main() should print the plan, then apply it when asked."""
+    with open(tmp_path / "test_secret.txt", "w") as f:
+        f.write('{"user_id":"test_id","password":"test_password"}')
+
+    assert main(["sync", str(tmp_path)]) == 0
+    lines = output_lines(capsys)
+    assert lines[0] == {"action": "add", "secret_id": "test_secret"}
+    assert lines[1]["add"] == 1
+    assert list_secrets() == []
+
+    assert main(["sync", str(tmp_path), "--apply"]) == 0
+    assert output_lines(capsys)[1]["added"] == 1
+    assert (
+        get_secret("test_secret") == '{"user_id":"test_id","password":"test_password"}'
+    )
+
+    with pytest.raises(SystemExit):
+        main(["sync", str(tmp_path / "typo"), "--delete", "--apply"])
+    assert get_secret("test_secret")
+
+
+@pytest.mark.describe("main()")
+@pytest.mark.it("should send commands to the agent with --agent")
+def test_agent(mock_secretsmanager, tmp_path, capsys):
+    """main() should route simple commands through a running agent."""
+    path = str(tmp_path / "agent.sock")
+    ready = threading.Event()
+    thread = threading.Thread(
+        target=serve_agent,
+        args=(path,),
+        kwargs={"ready": lambda _: ready.set()},
+        daemon=True,
+    )
+    thread.start()
+    assert ready.wait(10)
+
+    create_secret("test_secret", "test_id", "test_password")
+    assert main(["--agent", path, "get", "test_secret"]) == 0
+    assert output_lines(capsys)[0]["result"] == get_secret("test_secret")
+    assert AgentClient(path).ping()["cache"]["size"] == 1
+
+    AgentClient(path).stop()
+    thread.join(10)
+    assert main(["--agent", path, "get", "test_secret"]) == 1
+    assert output_lines(capsys)[0]["error"] == "AgentError"
+
+
+@pytest.mark.describe("main()")
+@pytest.mark.it("should reject --agent for subcommands the agent does not serve")
+def test_agent_unsupported(capsys):
+    """main() should exit with a usage error rather than ignore --agent."""
+    for argv in (["export", "out"], ["batch"], []):
+        with pytest.raises(SystemExit) as e:
+            main(["--agent", "agent.sock", *argv])
+        assert e.value.code == 2
+        assert "--agent only applies to" in capsys.readouterr().err
@@ -0,0 +1,105 @@
+"""This module contains the test suite for `get_client()`."""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from src import client as client_module
+from src.client import (
+    configure_clients,
+    get_client,
+    prewarm,
+    reset_clients,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_MAX_POOL_CONNECTIONS,
+    DEFAULT_READ_TIMEOUT,
+)
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    """Mocked AWS Credentials for moto"""
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+
+
+@pytest.fixture
+def mock_secretsmanager(aws_credentials):
+    """Mock secretsmanager client"""
+    with mock_aws():
+        yield boto3.client("secretsmanager", region_name="eu-west-2")
+
+
+@pytest.fixture
+def default_settings():
+    """restore default client settings after the test"""
+    yield
+    configure_clients(
+        max_pool_connections=DEFAULT_MAX_POOL_CONNECTIONS,
+        connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+        read_timeout=DEFAULT_READ_TIMEOUT,
+    )
+
+
+@pytest.mark.describe("get_client()")
+@pytest.mark.it("should reuse the same client on repeated calls")
+def test_reuses_client(mock_secretsmanager):
+    """get_client() should return the same client object every time."""
+    assert get_client() is get_client()
+
+
+@pytest.mark.describe("get_client()")
+@pytest.mark.it("should keep one client per region")
+def test_one_client_per_region(mock_secretsmanager):
+    """get_client() should create separate clients for separate regions."""
+    london = get_client(region_name="eu-west-2")
+    ireland = get_client(region_name="eu-west-1")
+    assert london is not ireland
+    assert ireland.meta.region_name == "eu-west-1"
+    assert get_client(region_name="eu-west-1") is ireland
+
+
+@pytest.mark.describe("get_client()")
+@pytest.mark.it("should share one client between concurrent callers")
+def test_thread_safe(mock_secretsmanager):
+    """get_client() should hand every thread the same client."""
+    reset_clients()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        clients = list(executor.map(lambda _: get_client(), range(32)))
+    assert all(client is clients[0] for client in clients)
+
+
+@pytest.mark.describe("configure_clients()")
+@pytest.mark.it("should apply pool size and timeouts to new clients")
+def test_configure_clients(mock_secretsmanager, default_settings):
+    """configure_clients() should replace cached clients with reconfigured ones."""
+    before = get_client()
+    configure_clients(max_pool_connections=50, connect_timeout=2, read_timeout=5)
+    after = get_client()
+    assert after is not before
+    assert after.meta.config.max_pool_connections == 50
+    assert after.meta.config.connect_timeout == 2
+    assert after.meta.config.read_timeout == 5
+
+
+@pytest.mark.describe("configure_clients()")
+@pytest.mark.it("should error when passed a non-positive setting")
+def test_configure_clients_invalid(mock_secretsmanager, default_settings):
+    """configure_clients() should raise ValueError for settings below 1."""
+    with pytest.raises(ValueError):
+        configure_clients(max_pool_connections=0)
+
+
+@pytest.mark.describe("prewarm()")
+@pytest.mark.it("should create the shared client on a background thread")
+def test_prewarm(mock_secretsmanager):
+    """prewarm() should leave a ready client behind for the first operation."""
+    reset_clients()
+    prewarm().join()
+    assert (None, None) in client_module._clients
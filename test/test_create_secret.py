@@ -1,29 +1,14 @@
 """This module contains the test suite for `create_secret()`."""
 
-import os
-
-import boto3
 import pytest
-from moto import mock_aws
 
 from src.create_secret import create_secret, BlankArgumentError, InvalidCharacterError
 
 
-@pytest.fixture(scope="function")
-def aws_credentials():
-    """Mocked AWS Credentials for moto"""
-    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
-    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
-    os.environ["AWS_SECURITY_TOKEN"] = "testing"
-    os.environ["AWS_SESSION_TOKEN"] = "testing"
-    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
-
-
 @pytest.fixture
-def mock_secretsmanager(aws_credentials):
-    """Mock secretsmanager client"""
-    with mock_aws():
-        yield boto3.client("secretsmanager", region_name="eu-west-2")
+def mock_secretsmanager(backend):
+    """The client of each backend, so every test runs against AWS and the local vault"""
+    return backend
 
 
 @pytest.fixture
@@ -60,7 +45,7 @@ def test_secret_created_correctly(
     """create_secret() should create new secret with the correct SecretString."""
     create_secret(secret_identifier, user_id, password)
     response = mock_secretsmanager.get_secret_value(SecretId=secret_identifier)
-    expected = "{'user_id':test_id, 'password':test_password}"
+    expected = '{"user_id":"test_id","password":"test_password"}'
     assert response["SecretString"] == expected
 
 
@@ -101,3 +86,15 @@ def test_invalid_character_error(
     invalid_secret_identifier = "±±±"
     with pytest.raises(InvalidCharacterError):
         create_secret(invalid_secret_identifier, user_id, password)
+
+
+@pytest.mark.describe("create_secret()")
+@pytest.mark.it("should store SecretBinary with a version header when binary is set")
+def test_secret_created_binary(
+    mock_secretsmanager, secret_identifier, user_id, password
+):
+    """create_secret() should store a compressed, versioned SecretBinary."""
+    create_secret(secret_identifier, user_id, password, binary=True)
+    response = mock_secretsmanager.get_secret_value(SecretId=secret_identifier)
+    assert "SecretString" not in response
+    assert response["SecretBinary"][:4] == b"PMS\x01"
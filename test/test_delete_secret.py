@@ -1,31 +1,16 @@
 """This module contains the test suite for `delete_secret()`."""
 
-import os
-
-import boto3
 import pytest
-from moto import mock_aws
 
 from src.create_secret import create_secret
 from src.list_secrets import list_secrets
 from src.delete_secret import delete_secret, BlankArgumentError
 
 
-@pytest.fixture(scope="function")
-def aws_credentials():
-    """Mocked AWS Credentials for moto"""
-    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
-    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
-    os.environ["AWS_SECURITY_TOKEN"] = "testing"
-    os.environ["AWS_SESSION_TOKEN"] = "testing"
-    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
-
-
 @pytest.fixture
-def mock_secretsmanager(aws_credentials):
-    """Mock secretsmanager client"""
-    with mock_aws():
-        yield boto3.client("secretsmanager", region_name="eu-west-2")
+def mock_secretsmanager(backend):
+    """The client of each backend, so every test runs against AWS and the local vault"""
+    return backend
 
 
 @pytest.fixture
@@ -80,3 +65,21 @@ def test_errors_when_passed_secret_id_is_blank(
     """delete_secret() raise an error when passed secret_id is blank."""
     with pytest.raises(BlankArgumentError):
         delete_secret("")
+
+
+@pytest.mark.describe("delete_secret()")
+@pytest.mark.it("should force delete a secret without a recovery window")
+def test_force_delete(mock_secretsmanager, secret_identifier, user_id, password):
+    """delete_secret() should remove the secret immediately when force_delete is set."""
+    create_secret(secret_identifier, user_id, password)
+    delete_secret(secret_identifier, force_delete=True)
+    response = mock_secretsmanager.list_secrets(IncludePlannedDeletion=True)
+    assert response["SecretList"] == []
+
+
+@pytest.mark.describe("delete_secret()")
+@pytest.mark.it("should error when passed a recovery window and force_delete")
+def test_recovery_window_with_force_delete(mock_secretsmanager):
+    """delete_secret() should raise ValueError for conflicting options."""
+    with pytest.raises(ValueError):
+        delete_secret("test_secret", recovery_window_in_days=7, force_delete=True)
@@ -0,0 +1,109 @@
+"""This module contains the test suite for `delete_secrets()`."""
+
+import os
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from src.create_secret import create_secret
+from src.delete_secrets import delete_secrets, select_secrets
+from src.list_secrets import list_secrets
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    """Mocked AWS Credentials for moto"""
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+
+
+@pytest.fixture
+def mock_secretsmanager(aws_credentials):
+    """Mock secretsmanager client"""
+    with mock_aws():
+        yield boto3.client("secretsmanager", region_name="eu-west-2")
+
+
+@pytest.fixture
+def secrets(mock_secretsmanager):
+    """create mock secrets across two environments"""
+    names = ["test/api/db", "test/web/db", "test/web/cache", "prod/api/db"]
+    for name in names:
+        create_secret(name, "test_id", "test_password")
+    return names
+
+
+@pytest.mark.describe("select_secrets()")
+@pytest.mark.it("should select secrets by explicit id, prefix and glob")
+def test_select_secrets(secrets):
+    """select_secrets() should combine every selector without duplicates."""
+    assert select_secrets(name_prefix="test/web/") == ["test/web/db", "test/web/cache"]
+    assert select_secrets(pattern="*/db") == [
+        "test/api/db",
+        "test/web/db",
+        "prod/api/db",
+    ]
+    assert select_secrets(["prod/api/db"], pattern="prod/*") == ["prod/api/db"]
+
+
+@pytest.mark.describe("select_secrets()")
+@pytest.mark.it("should error when passed no selector")
+def test_select_secrets_no_selector(mock_secretsmanager):
+    """select_secrets() should refuse to select everything implicitly."""
+    with pytest.raises(ValueError):
+        select_secrets()
+
+
+@pytest.mark.describe("select_secrets()")
+@pytest.mark.it("should match prefixes exactly and reject a negated prefix")
+def test_select_secrets_exact_prefix(secrets):
+    """select_secrets() should not trust the API's case-insensitive name filter."""
+    create_secret("TEST/web/db", "test_id", "test_password")
+    assert select_secrets(name_prefix="test/web/") == ["test/web/db", "test/web/cache"]
+    with pytest.raises(ValueError):
+        delete_secrets(name_prefix="!prod")
+    assert select_secrets(pattern="!*") == []
+
+
+@pytest.mark.describe("delete_secrets()")
+@pytest.mark.it("should delete every selected secret")
+def test_deletes_selected(secrets):
+    """delete_secrets() should delete matching secrets and leave the rest."""
+    results = delete_secrets(pattern="test/*", max_workers=2)
+    assert results == {
+        "test/api/db": "deleted",
+        "test/web/db": "deleted",
+        "test/web/cache": "deleted",
+    }
+    assert list_secrets() == ["prod/api/db"]
+
+
+@pytest.mark.describe("delete_secrets()")
+@pytest.mark.it("should report secrets that cannot be found")
+def test_reports_not_found(secrets):
+    """delete_secrets() should carry on past missing secrets."""
+    results = delete_secrets(["prod/api/db", "missile_codes"])
+    assert results == {"prod/api/db": "deleted", "missile_codes": "not found"}
+
+
+@pytest.mark.describe("delete_secrets()")
+@pytest.mark.it("should only print targets on a dry run")
+def test_dry_run(secrets, capsys):
+    """delete_secrets() should not delete anything when dry_run is set."""
+    results = delete_secrets(name_prefix="prod/", dry_run=True)
+    assert results == {"prod/api/db": "would delete"}
+    assert "Would delete: prod/api/db" in capsys.readouterr().out
+    assert len(list_secrets()) == 4
+
+
+@pytest.mark.describe("delete_secrets()")
+@pytest.mark.it("should force delete without recovery")
+def test_force_delete(secrets, mock_secretsmanager):
+    """delete_secrets() should pass force_delete through to each deletion."""
+    delete_secrets(name_prefix="test/", force_delete=True)
+    response = mock_secretsmanager.list_secrets(IncludePlannedDeletion=True)
+    assert [s["Name"] for s in response["SecretList"]] == ["prod/api/db"]
@@ -0,0 +1,40 @@
+"""This module contains the test suite for the `events` module."""
+
+import pytest
+
+from src import events
+
+
+@pytest.mark.describe("notify()")
+@pytest.mark.it("should call every subscribed listener")
+def test_notifies_listeners():
+    """notify() should pass the action and secret_id to each listener."""
+    received = []
+
+    def listener(action, secret_id):
+        received.append((action, secret_id))
+
+    events.subscribe(listener)
+    events.notify(events.CREATED, "test_secret")
+    events.unsubscribe(listener)
+    events.notify(events.DELETED, "test_secret")
+    assert received == [("created", "test_secret")]
+
+
+@pytest.mark.describe("subscribe()")
+@pytest.mark.it("should not keep subscribed objects alive")
+def test_bound_methods_held_weakly():
+    """subscribe() should drop bound methods once their object is collected."""
+
+    class Listener:
+        calls = 0
+
+        def on_change(self, action, secret_id):
+            Listener.calls += 1
+
+    listener = Listener()
+    events.subscribe(listener.on_change)
+    events.notify(events.UPDATED, "test_secret")
+    del listener
+    events.notify(events.UPDATED, "test_secret")
+    assert Listener.calls == 1
@@ -0,0 +1,138 @@
+"""This module contains the test suite for `export_secrets()`."""
+
+import json
+import os
+import stat
+import tarfile
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from src.create_secret import create_secret
+from src.export_secrets import (
+    export_secrets,
+    secret_filename,
+    secret_id_from_filename,
+    write_secret_file,
+)
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    """Mocked AWS Credentials for moto"""
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+
+
+@pytest.fixture
+def mock_secretsmanager(aws_credentials):
+    """Mock secretsmanager client"""
+    with mock_aws():
+        yield boto3.client("secretsmanager", region_name="eu-west-2")
+
+
+@pytest.fixture
+def secrets(mock_secretsmanager):
+    """create mock secrets, including one with a slash in its name"""
+    names = [f"test_secret{i}" for i in range(45)] + ["prod/db"]
+    for name in names:
+        create_secret(name, "test_id", "test_password")
+    return names
+
+
+@pytest.mark.describe("secret_filename()")
+@pytest.mark.it("should map every secret id to one safe, reversible file name")
+def test_secret_filename():
+    """secret_filename() should encode slashes and dot-only names."""
+    assert secret_filename("test_secret") == "test_secret.txt"
+    assert secret_filename("prod/db") == "prod%2Fdb.txt"
+    assert secret_filename("..") == "%2E%2E.txt"
+    for name in ("prod/db", "..", "a+b=c@d.e-f"):
+        filename = secret_filename(name)
+        assert "/" not in filename
+        assert secret_id_from_filename(filename) == name
+
+
+@pytest.mark.describe("write_secret_file()")
+@pytest.mark.it("should write a file only the owner can read")
+def test_write_secret_file(tmp_path):
+    """write_secret_file() should leave a 0600 file and no temporary files."""
+    path = write_secret_file(str(tmp_path), "prod/db", "test_string")
+    assert path == str(tmp_path / "prod%2Fdb.txt")
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert os.listdir(tmp_path) == ["prod%2Fdb.txt"]
+    with open(path, "r", encoding="utf-8") as f:
+        assert f.read() == "test_string"
+
+
+@pytest.mark.describe("export_secrets()")
+@pytest.mark.it("should write one file per secret to a directory")
+def test_export_directory(secrets, tmp_path):
+    """export_secrets() should export every secret when no ids are given."""
+    target = tmp_path / "export"
+    summary = export_secrets(str(target), fmt="dir", max_workers=2, fsync_batch=8)
+    assert summary == {"exported": len(secrets), "errors": {}}
+    files = sorted(os.listdir(target))
+    assert sorted(map(secret_id_from_filename, files)) == sorted(secrets)
+    for name in files:
+        assert stat.S_IMODE(os.stat(target / name).st_mode) == 0o600
+    with open(target / "prod%2Fdb.txt", "r", encoding="utf-8") as f:
+        assert json.loads(f.read()) == {
+            "user_id": "test_id",
+            "password": "test_password",
+        }
+
+
+@pytest.mark.describe("export_secrets()")
+@pytest.mark.it("should write a JSON-lines file and report missing secrets")
+def test_export_jsonl(secrets, tmp_path):
+    """export_secrets() should write one JSON object per exported secret."""
+    target = tmp_path / "export.jsonl"
+    summary = export_secrets(str(target), ["test_secret1", "missing"], fmt="jsonl")
+    assert summary == {
+        "exported": 1,
+        "errors": {"missing": "ResourceNotFoundException"},
+    }
+    assert stat.S_IMODE(os.stat(target).st_mode) == 0o600
+    with open(target, "r", encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert [line["secret_id"] for line in lines] == ["test_secret1"]
+
+
+@pytest.mark.describe("export_secrets()")
+@pytest.mark.it("should write a tar stream")
+def test_export_tar(secrets, tmp_path):
+    """export_secrets() should add one 0600 member per secret."""
+    target = tmp_path / "export.tar"
+    export_secrets(str(target), secrets, fmt="tar")
+    with tarfile.open(target) as tar:
+        members = tar.getmembers()
+    assert sorted(secret_id_from_filename(m.name) for m in members) == sorted(secrets)
+    assert all(m.mode == 0o600 for m in members)
+
+
+@pytest.mark.describe("export_secrets()")
+@pytest.mark.it("should leave nothing behind when the export fails")
+def test_export_failure(mock_secretsmanager, tmp_path, monkeypatch):
+    """export_secrets() should remove its temporary file on error."""
+    create_secret("test_secret", "test_id", "test_password")
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr("src.export_secrets.get_secrets", fail)
+    with pytest.raises(RuntimeError):
+        export_secrets(str(tmp_path / "export.jsonl"), ["test_secret"], fmt="jsonl")
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.describe("export_secrets()")
+@pytest.mark.it("should error on an unknown format")
+def test_export_unknown_format(tmp_path):
+    """export_secrets() should raise ValueError for an unsupported format."""
+    with pytest.raises(ValueError):
+        export_secrets(str(tmp_path), [], fmt="zip")
@@ -1,30 +1,15 @@
 """This module contains the test suite for `get_secret()`."""
 
-import os
-
-import boto3
 import pytest
-from moto import mock_aws
 
 from src.create_secret import create_secret
-from src.get_secret import get_secret, BlankArgumentError
-
-
-@pytest.fixture(scope="function")
-def aws_credentials():
-    """Mocked AWS Credentials for moto"""
-    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
-    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
-    os.environ["AWS_SECURITY_TOKEN"] = "testing"
-    os.environ["AWS_SESSION_TOKEN"] = "testing"
-    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+from src.get_secret import get_secret, get_secret_fields, BlankArgumentError
 
 
 @pytest.fixture
-def mock_secretsmanager(aws_credentials):
-    """Mock secretsmanager client"""
-    with mock_aws():
-        yield boto3.client("secretsmanager", region_name="eu-west-2")
+def mock_secretsmanager(backend):
+    """The client of each backend, so every test runs against AWS and the local vault"""
+    return backend
 
 
 @pytest.fixture
@@ -70,7 +55,7 @@ def test_returns_correct_string(
     """get_secret() should return string of correct user_id and password."""
     create_secret(secret_id, user_id, password)
     result = get_secret(secret_id)
-    assert result == "{'user_id':test_id, 'password':test_password}"
+    assert result == '{"user_id":"test_id","password":"test_password"}'
 
 
 @pytest.mark.describe("get_secret()")
@@ -93,3 +78,21 @@ def test_errors_on_secret_not_found(mock_secretsmanager):
     """get_secret() should raise ResourceNotFoundException when secret not found."""
     with pytest.raises(mock_secretsmanager.exceptions.ResourceNotFoundException):
         get_secret("missile_codes")
+
+
+@pytest.mark.describe("get_secret_fields()")
+@pytest.mark.it("should return the parsed user_id and password")
+def test_returns_fields(mock_secretsmanager, secret_id, user_id):
+    """get_secret_fields() should decode passwords containing quotes and braces."""
+    password = "p'a\"s{s},"
+    create_secret(secret_id, user_id, password)
+    assert get_secret_fields(secret_id) == {"user_id": user_id, "password": password}
+
+
+@pytest.mark.describe("get_secret()")
+@pytest.mark.it("should unwrap secrets stored as SecretBinary")
+def test_reads_binary_secrets(mock_secretsmanager, secret_id, user_id, password):
+    """get_secret() should return the JSON held in a binary secret."""
+    create_secret(secret_id, user_id, password, binary=True)
+    assert get_secret(secret_id) == '{"user_id":"test_id","password":"test_password"}'
+    assert get_secret_fields(secret_id)["password"] == password
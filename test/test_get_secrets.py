@@ -0,0 +1,118 @@
+"""This module contains the test suite for `get_secrets()`."""
+
+import os
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from src.create_secret import create_secret
+from src.get_secrets import get_secrets, BlankArgumentError, BATCH_SIZE
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    """Mocked AWS Credentials for moto"""
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+
+
+@pytest.fixture
+def mock_secretsmanager(aws_credentials):
+    """Mock secretsmanager client"""
+    with mock_aws():
+        yield boto3.client("secretsmanager", region_name="eu-west-2")
+
+
+@pytest.fixture
+def user_id():
+    """create mock user_id"""
+    return "test_id"
+
+
+@pytest.fixture
+def password():
+    """create mock password"""
+    return "test_password"
+
+
+@pytest.mark.describe("get_secrets()")
+@pytest.mark.it("should return a mapping of secret id to secret string")
+def test_returns_mapping(mock_secretsmanager, user_id, password):
+    """get_secrets() should return the SecretString of every requested secret."""
+    create_secret("test_secret1", user_id, password)
+    create_secret("test_secret2", "other_id", password)
+    secrets, errors = get_secrets(["test_secret1", "test_secret2"])
+    assert secrets == {
+        "test_secret1": '{"user_id":"test_id","password":"test_password"}',
+        "test_secret2": '{"user_id":"other_id","password":"test_password"}',
+    }
+    assert errors == {}
+
+
+@pytest.mark.describe("get_secrets()")
+@pytest.mark.it("should fetch more secrets than fit in one API call")
+def test_chunks_requests(mock_secretsmanager, user_id, password):
+    """get_secrets() should split ids into chunks and fetch them all."""
+    secret_ids = [f"test_secret{i}" for i in range(BATCH_SIZE * 2 + 5)]
+    for secret_id in secret_ids:
+        create_secret(secret_id, user_id, password)
+    secrets, errors = get_secrets(secret_ids, max_workers=3)
+    assert sorted(secrets) == sorted(secret_ids)
+    assert errors == {}
+
+
+@pytest.mark.describe("get_secrets()")
+@pytest.mark.it("should report missing secrets per id without failing the batch")
+def test_reports_missing_secrets(mock_secretsmanager, user_id, password):
+    """get_secrets() should report ResourceNotFoundException for missing ids."""
+    create_secret("test_secret", user_id, password)
+    secrets, errors = get_secrets(["test_secret", "missile_codes"])
+    assert list(secrets) == ["test_secret"]
+    assert errors["missile_codes"]["ErrorCode"] == "ResourceNotFoundException"
+
+
+@pytest.mark.describe("get_secrets()")
+@pytest.mark.it("should report corrupt SecretBinary per id without failing the batch")
+def test_reports_corrupt_binary(mock_secretsmanager, user_id, password):
+    """get_secrets() should report SecretFormatError for values it cannot decode."""
+    create_secret("test_secret", user_id, password)
+    mock_secretsmanager.create_secret(Name="short", SecretBinary=b"PMS\x01")
+    mock_secretsmanager.create_secret(
+        Name="corrupt", SecretBinary=b"PMS\x01\x01not zlib"
+    )
+    secrets, errors = get_secrets(["test_secret", "short", "corrupt"])
+    assert list(secrets) == ["test_secret"]
+    assert (
+        errors["short"]["ErrorCode"]
+        == errors["corrupt"]["ErrorCode"]
+        == "SecretFormatError"
+    )
+
+
+@pytest.mark.describe("get_secrets()")
+@pytest.mark.it("should accept ARNs as well as names")
+def test_accepts_arns(mock_secretsmanager, user_id, password):
+    """get_secrets() should key results by the id form the caller used."""
+    create_secret("test_secret", user_id, password)
+    arn = mock_secretsmanager.describe_secret(SecretId="test_secret")["ARN"]
+    secrets, _ = get_secrets([arn])
+    assert list(secrets) == [arn]
+
+
+@pytest.mark.describe("get_secrets()")
+@pytest.mark.it("should return empty mappings when passed no ids")
+def test_no_ids(mock_secretsmanager):
+    """get_secrets() should make no calls when passed an empty list."""
+    assert get_secrets([]) == ({}, {})
+
+
+@pytest.mark.describe("get_secrets()")
+@pytest.mark.it("should raise error when passed a blank secret_id")
+def test_errors_on_blank_id(mock_secretsmanager):
+    """get_secrets() should raise BlankArgumentError when any id is blank."""
+    with pytest.raises(BlankArgumentError):
+        get_secrets(["test_secret", ""])
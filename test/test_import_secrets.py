@@ -0,0 +1,105 @@
+"""This module contains the test suite for `import_secrets()`."""
+
+import io
+import json
+import os
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from src.create_secret import create_secret
+from src.get_secret import get_secret
+from src.import_secrets import detect_format, import_secrets, iter_rows
+from src.list_secrets import list_secrets
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    """Mocked AWS Credentials for moto"""
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+
+
+@pytest.fixture
+def mock_secretsmanager(aws_credentials):
+    """Mock secretsmanager client"""
+    with mock_aws():
+        yield boto3.client("secretsmanager", region_name="eu-west-2")
+
+
+@pytest.fixture
+def csv_rows():
+    """create mock CSV input"""
+    return (
+        "secret_identifier,user_id,password\n"
+        "test_secret1,test_id,test_password\n"
+        'test_secret2,test_id,"pa,ss"\n'
+        "±±±,test_id,test_password\n"
+        "test_secret3,,test_password\n"
+    )
+
+
+@pytest.mark.describe("import_secrets()")
+@pytest.mark.it("should create a secret for every valid CSV row")
+def test_imports_csv(mock_secretsmanager, csv_rows):
+    """import_secrets() should create valid rows and count invalid ones."""
+    summary = import_secrets(io.StringIO(csv_rows), fmt="csv", max_workers=2)
+    assert summary == {"created": 2, "already exists": 0, "invalid": 2, "failed": 0}
+    assert sorted(list_secrets()) == ["test_secret1", "test_secret2"]
+    assert get_secret("test_secret2") == '{"user_id":"test_id","password":"pa,ss"}'
+
+
+@pytest.mark.describe("import_secrets()")
+@pytest.mark.it("should import JSON-lines input")
+def test_imports_jsonl(mock_secretsmanager):
+    """import_secrets() should read one JSON object per line."""
+    lines = "\n".join(
+        json.dumps(
+            {"secret_identifier": f"test_secret{i}", "user_id": "u", "password": "p"}
+        )
+        for i in range(25)
+    )
+    summary = import_secrets(io.StringIO(lines + "\nnot json\n"), fmt="jsonl")
+    assert summary["created"] == 25
+    assert summary["invalid"] == 1
+    assert len(list_secrets()) == 25
+
+
+@pytest.mark.describe("import_secrets()")
+@pytest.mark.it("should write a per-row report as rows complete")
+def test_writes_report(mock_secretsmanager, csv_rows):
+    """import_secrets() should report each row's status, including existing secrets."""
+    create_secret("test_secret1", "test_id", "test_password")
+    report = io.StringIO()
+    import_secrets(io.StringIO(csv_rows), report=report)
+    results = sorted(
+        (json.loads(line) for line in report.getvalue().splitlines()),
+        key=lambda r: r["row"],
+    )
+    assert [r["status"] for r in results] == [
+        "already exists",
+        "created",
+        "invalid",
+        "invalid",
+    ]
+    assert results[2]["error"] == "InvalidCharacterError"
+
+
+@pytest.mark.describe("iter_rows()")
+@pytest.mark.it("should error on an unknown format")
+def test_unknown_format():
+    """iter_rows() should raise ValueError for unsupported formats."""
+    with pytest.raises(ValueError):
+        list(iter_rows(io.StringIO(""), "xml"))
+
+
+@pytest.mark.describe("detect_format()")
+@pytest.mark.it("should pick the format from the file extension")
+def test_detect_format():
+    """detect_format() should map JSON-lines extensions to jsonl and others to csv."""
+    assert detect_format("secrets.jsonl") == "jsonl"
+    assert detect_format("secrets.CSV") == "csv"
@@ -0,0 +1,153 @@
+"""This module contains the test suite for `scan_inventory()`."""
+
+import os
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from src import inventory
+from src.create_secret import create_secret
+from src.delete_secret import delete_secret
+from src.inventory import scan_inventory, shard_prefixes, SecretRecord, FIRST_CHARACTERS
+from src.list_secrets import list_secrets
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    """Mocked AWS Credentials for moto"""
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+
+
+@pytest.fixture
+def mock_secretsmanager(aws_credentials):
+    """Mock secretsmanager client"""
+    with mock_aws():
+        yield boto3.client("secretsmanager", region_name="eu-west-2")
+
+
+@pytest.fixture
+def names(mock_secretsmanager):
+    """create secrets starting with many different characters and cases"""
+    names = [
+        "a",
+        "A",
+        "abc",
+        "Abc",
+        "prod",
+        "prod/db",
+        "prod/api",
+        "9lives",
+        "_x",
+        "@y",
+        "-z",
+    ]
+    names += [f"team/test_secret{i}" for i in range(120)]
+    for name in names:
+        create_secret(name, "test_id", "test_password")
+    create_secret("deleted", "test_id", "test_password")
+    delete_secret("deleted")
+    return names
+
+
+@pytest.mark.describe("shard_prefixes()")
+@pytest.mark.it("should cover every valid first character after the prefix")
+def test_shard_prefixes():
+    """shard_prefixes() should return one case-folded shard per first character."""
+    shards = shard_prefixes("prod/")
+    assert len(shards) == len(FIRST_CHARACTERS) == len(set(shards))
+    assert "prod/a" in shards and "prod/A" not in shards and "prod//" in shards
+
+
+@pytest.mark.describe("scan_inventory()")
+@pytest.mark.it("should yield every live secret exactly once")
+def test_scan(names):
+    """scan_inventory() should match the serial listing without duplicates."""
+    records = list(scan_inventory(max_workers=4))
+    assert sorted(r.name for r in records) == sorted(names) == sorted(list_secrets())
+    assert all(isinstance(r, SecretRecord) for r in records)
+    assert records[0].versions == 1
+
+
+@pytest.mark.describe("scan_inventory()")
+@pytest.mark.it(
+    "should scan under a prefix, including a secret named exactly the prefix"
+)
+def test_scan_prefix(names):
+    """scan_inventory() should include the exact name and nothing outside the prefix."""
+    assert sorted(r.name for r in scan_inventory("prod")) == [
+        "prod",
+        "prod/api",
+        "prod/db",
+    ]
+    assert sorted(r.name for r in scan_inventory("a")) == ["a", "abc"]
+
+
+@pytest.mark.describe("scan_inventory()")
+@pytest.mark.it("should split a shard with more than one page and list each case once")
+def test_scan_splits_shards(mock_secretsmanager, monkeypatch):
+    """scan_inventory() should spread a skewed, mixed-case namespace over shards."""
+    names = [f"Prod/x{i:03}" for i in range(120)] + ["prod"]
+    for name in names:
+        create_secret(name, "test_id", "test_password")
+
+    queries = []
+    real_list_page = inventory._list_page
+
+    def list_page(sm, name_prefix, suffix, next_token):
+        queries.append((name_prefix + suffix, next_token))
+        return real_list_page(sm, name_prefix, suffix, next_token)
+
+    monkeypatch.setattr(inventory, "_list_page", list_page)
+    records = list(scan_inventory(max_workers=4))
+    assert sorted(r.name for r in records) == sorted(list_secrets()) == sorted(names)
+
+    # "pro" has 8 case variants and its shards would have 16, so it is paged.
+    assert max(len(prefix) for prefix, _ in queries) == 3
+    assert any(prefix == "pro" and next_token for prefix, next_token in queries)
+
+    queries.clear()
+    records = list(scan_inventory("Prod/", max_workers=4))
+    assert sorted(r.name for r in records) == sorted(names[:-1])
+    assert "Prod/x1" in [prefix for prefix, _ in queries]
+
+
+@pytest.mark.describe("scan_inventory()")
+@pytest.mark.it("should add describe details in a worker pool")
+def test_scan_describe(mock_secretsmanager):
+    """scan_inventory() should fill in replica regions when describing."""
+    create_secret(
+        "test_secret", "test_id", "test_password", replica_regions=["eu-west-1"]
+    )
+    records = list(scan_inventory(describe=True, describe_workers=3))
+    assert [r.name for r in records] == ["test_secret"]
+    assert records[0].replica_regions == ("eu-west-1",)
+    assert records[0].as_dict()["tags"] == {}
+
+
+@pytest.mark.describe("scan_inventory()")
+@pytest.mark.it("should stop its workers when the caller stops early")
+def test_scan_early_exit(names):
+    """scan_inventory() should not hang when closed early with small buffers."""
+    scan = scan_inventory(
+        max_workers=2, describe=True, describe_workers=2, buffer_size=1
+    )
+    assert isinstance(next(scan), SecretRecord)
+    scan.close()
+
+
+@pytest.mark.describe("scan_inventory()")
+@pytest.mark.it("should raise errors from the workers")
+def test_scan_error(mock_secretsmanager, monkeypatch):
+    """scan_inventory() should re-raise a shard's error to the caller."""
+
+    def fail(*args):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr("src.inventory._list_page", fail)
+    with pytest.raises(RuntimeError):
+        list(scan_inventory())
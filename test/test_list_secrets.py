@@ -1,30 +1,18 @@
 """This module contains the test suite for `list_secrets()`."""
 
-import os
+import types
 
-import boto3
 import pytest
-from moto import mock_aws
 
+from src import rate_limit
 from src.create_secret import create_secret
-from src.list_secrets import list_secrets
-
-
-@pytest.fixture(scope="function")
-def aws_credentials():
-    """Mocked AWS Credentials for moto"""
-    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
-    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
-    os.environ["AWS_SECURITY_TOKEN"] = "testing"
-    os.environ["AWS_SESSION_TOKEN"] = "testing"
-    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+from src.list_secrets import iter_secrets, list_secrets
 
 
 @pytest.fixture
-def mock_secretsmanager(aws_credentials):
-    """Mock secretsmanager client"""
-    with mock_aws():
-        yield boto3.client("secretsmanager", region_name="eu-west-2")
+def mock_secretsmanager(backend):
+    """The client of each backend, so every test runs against AWS and the local vault"""
+    return backend
 
 
 @pytest.fixture
@@ -112,3 +100,87 @@ def test_does_not_return_deleted_secrets(
     )
     result = list_secrets()
     assert result == ["test_secret2"]
+
+
+@pytest.mark.describe("iter_secrets()")
+@pytest.mark.it("should lazily yield secret names")
+def test_iter_secrets_is_lazy(
+    mock_secretsmanager,
+    secret_identifier,
+    user_id,
+    password,
+):
+    """iter_secrets() should return a generator of secret names."""
+    create_secret(secret_identifier, user_id, password)
+    result = iter_secrets()
+    assert isinstance(result, types.GeneratorType)
+    assert next(result) == "test_secret"
+
+
+@pytest.mark.describe("iter_secrets()")
+@pytest.mark.it("should walk every page of results")
+def test_iter_secrets_paginates(mock_secretsmanager, user_id, password):
+    """iter_secrets() should follow NextToken until the listing is exhausted."""
+    for i in range(5):
+        create_secret(f"test_secret{i}", user_id, password)
+    result = list(iter_secrets(max_results=2))
+    assert result == [f"test_secret{i}" for i in range(5)]
+
+
+@pytest.mark.describe("iter_secrets()")
+@pytest.mark.it("should filter by name prefix")
+def test_iter_secrets_name_prefix(mock_secretsmanager, user_id, password):
+    """iter_secrets() should only yield secrets starting with name_prefix."""
+    create_secret("prod/db", user_id, password)
+    create_secret("prod/api", user_id, password)
+    create_secret("dev/db", user_id, password)
+    result = list(iter_secrets(name_prefix="prod/"))
+    assert sorted(result) == ["prod/api", "prod/db"]
+
+
+@pytest.mark.describe("iter_secrets()")
+@pytest.mark.it("should match the name prefix exactly, whatever the API returns")
+def test_iter_secrets_exact_prefix(mock_secretsmanager, monkeypatch):
+    """iter_secrets() should drop names the API's case-insensitive filter let in."""
+    page = {"SecretList": [{"Name": "prod/db"}, {"Name": "Prod/api"}]}
+    monkeypatch.setattr(rate_limit, "call", lambda api, fn, **kwargs: page)
+    assert list(iter_secrets(name_prefix="prod/")) == ["prod/db"]
+
+
+@pytest.mark.describe("iter_secrets()")
+@pytest.mark.it("should reject a name prefix the API would read as negated")
+def test_iter_secrets_negated_prefix(mock_secretsmanager, user_id, password):
+    """iter_secrets() should raise ValueError rather than list every other name."""
+    create_secret("dev/db", user_id, password)
+    with pytest.raises(ValueError):
+        list_secrets(name_prefix="!prod")
+
+
+@pytest.mark.describe("iter_secrets()")
+@pytest.mark.it("should filter by tag and description")
+def test_iter_secrets_tags_and_description(mock_secretsmanager):
+    """iter_secrets() should only yield secrets matching tag and description filters."""
+    mock_secretsmanager.create_secret(
+        Name="tagged",
+        SecretString="x",
+        Description="team credentials",
+        Tags=[{"Key": "team", "Value": "data"}],
+    )
+    mock_secretsmanager.create_secret(
+        Name="other_team",
+        SecretString="x",
+        Tags=[{"Key": "team", "Value": "web"}],
+    )
+    mock_secretsmanager.create_secret(Name="untagged", SecretString="x")
+    assert list(iter_secrets(tags={"team": "data"})) == ["tagged"]
+    assert sorted(iter_secrets(tags={"team": None})) == ["other_team", "tagged"]
+    assert list(iter_secrets(description="team")) == ["tagged"]
+
+
+@pytest.mark.describe("list_secrets()")
+@pytest.mark.it("should pass filters through to iter_secrets()")
+def test_list_secrets_filters(mock_secretsmanager, user_id, password):
+    """list_secrets() should accept the same filters as iter_secrets()."""
+    create_secret("prod/db", user_id, password)
+    create_secret("dev/db", user_id, password)
+    assert list_secrets(name_prefix="dev/") == ["dev/db"]
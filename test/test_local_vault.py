@@ -0,0 +1,229 @@
+"""This module contains the test suite for `LocalVault`, run alongside AWS."""
+
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+import pytest
+
+from src.client import BACKEND_VARIABLE
+from src.create_secret import create_secret
+from src.delete_secret import delete_secret
+from src.get_secret import get_secret, get_secret_fields
+from src.get_secrets import get_secrets
+from src.list_secrets import list_secrets
+from src.local_vault import (
+    default_key_file,
+    generate_key,
+    LocalVault,
+    VaultKeyError,
+    KEY_FILE_VARIABLE,
+    KEY_VARIABLE,
+)
+from src.upsert_secret import update_secret, upsert_secret
+
+
+@pytest.fixture
+def vault_path(tmp_path, monkeypatch):
+    """A vault path with no key in the environment"""
+    monkeypatch.delenv(KEY_VARIABLE, raising=False)
+    monkeypatch.delenv(KEY_FILE_VARIABLE, raising=False)
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    return str(tmp_path / "vault" / "vault.db")
+
+
+@pytest.mark.describe("LocalVault")
+@pytest.mark.it("should be returned by get_client() when the backend is local")
+def test_backend_selection(backend):
+    """get_client() should honour PASSWORD_MANAGER_BACKEND."""
+    is_local = os.environ.get(BACKEND_VARIABLE) == "local"
+    assert isinstance(backend, LocalVault) == is_local
+
+
+@pytest.mark.describe("LocalVault")
+@pytest.mark.it("should raise the same exception classes as boto3")
+def test_same_exceptions(backend):
+    """Both backends should raise the exception classes of a default boto3 client."""
+    exceptions = boto3.client("secretsmanager", region_name="eu-west-2").exceptions
+    create_secret("test_secret", "test_id", "test_password")
+
+    with pytest.raises(exceptions.ResourceExistsException):
+        create_secret("test_secret", "test_id", "test_password")
+    with pytest.raises(exceptions.ResourceNotFoundException):
+        get_secret("missing")
+    with pytest.raises(exceptions.ResourceNotFoundException):
+        delete_secret("missing")
+    with pytest.raises(exceptions.ResourceNotFoundException):
+        update_secret("missing", "test_id", "test_password")
+
+
+@pytest.mark.describe("LocalVault")
+@pytest.mark.it("should store, read and delete secrets like AWS")
+def test_round_trip(backend):
+    """create, get, list and delete should behave identically on both backends."""
+    assert create_secret("test_secret", "test_id", "test_password") == 200
+    create_secret("binary_secret", "test_id", "päss", binary=True)
+
+    assert (
+        get_secret("test_secret") == '{"user_id":"test_id","password":"test_password"}'
+    )
+    assert get_secret_fields("binary_secret") == {
+        "user_id": "test_id",
+        "password": "päss",
+    }
+    assert sorted(list_secrets()) == ["binary_secret", "test_secret"]
+
+    assert delete_secret("test_secret") == 200
+    assert list_secrets() == ["binary_secret"]
+    with pytest.raises(backend.exceptions.InvalidRequestException):
+        get_secret("test_secret")
+
+    delete_secret("binary_secret", force_delete=True)
+    assert list_secrets() == []
+
+
+@pytest.mark.describe("LocalVault")
+@pytest.mark.it("should filter and paginate listings like AWS")
+def test_list_filters(backend):
+    """list_secrets() should apply name, tag and description filters across pages."""
+    for name in ["prod/a", "prod/b", "prod/c", "dev/a"]:
+        create_secret(name, "test_id", "test_password")
+    backend.create_secret(
+        Name="tagged",
+        SecretString="x",
+        Description="the database",
+        Tags=[{"Key": "team", "Value": "data"}],
+    )
+
+    prod = list_secrets(name_prefix="prod/", max_results=2)
+    assert sorted(prod) == ["prod/a", "prod/b", "prod/c"]
+    assert list_secrets(tags={"team": "data"}) == ["tagged"]
+    assert list_secrets(tags={"team": "other"}) == []
+    assert list_secrets(description="the data") == ["tagged"]
+
+
+@pytest.mark.describe("LocalVault")
+@pytest.mark.it("should support versions, batch reads and upserts like AWS")
+def test_versions(backend):
+    """upsert_secret() and get_secrets() should behave identically on both backends."""
+    assert upsert_secret("test_secret", "test_id", "first") == "created"
+    assert upsert_secret("test_secret", "test_id", "second") == "updated"
+
+    secrets, errors = get_secrets(["test_secret", "missing"])
+    assert secrets == {"test_secret": '{"user_id":"test_id","password":"second"}'}
+    assert errors["missing"]["ErrorCode"] == "ResourceNotFoundException"
+
+    assert upsert_secret("test_secret", "test_id", "first") == "updated"
+    # moto does not move its default version with the stage, so ask for AWSCURRENT.
+
+    current = backend.get_secret_value(
+        SecretId="test_secret", VersionStage="AWSCURRENT"
+    )
+    assert current["SecretString"] == '{"user_id":"test_id","password":"first"}'
+    previous = backend.get_secret_value(
+        SecretId="test_secret", VersionStage="AWSPREVIOUS"
+    )
+    assert previous["SecretString"] == '{"user_id":"test_id","password":"second"}'
+
+
+@pytest.mark.describe("LocalVault")
+@pytest.mark.it("should require the version holding a label before moving it")
+def test_update_stage(backend):
+    """update_secret_version_stage() should refuse to silently take AWSCURRENT."""
+    upsert_secret("test_secret", "test_id", "first")
+    first = backend.describe_secret(SecretId="test_secret")["VersionIdsToStages"]
+    backend.put_secret_value(
+        SecretId="test_secret", SecretString="pending", VersionStages=["AWSPENDING"]
+    )
+    pending = backend.get_secret_value(
+        SecretId="test_secret", VersionStage="AWSPENDING"
+    )
+
+    with pytest.raises(backend.exceptions.InvalidParameterException):
+        backend.update_secret_version_stage(
+            SecretId="test_secret",
+            VersionStage="AWSCURRENT",
+            MoveToVersionId=pending["VersionId"],
+        )
+
+    backend.update_secret_version_stage(
+        SecretId="test_secret",
+        VersionStage="AWSCURRENT",
+        MoveToVersionId=pending["VersionId"],
+        RemoveFromVersionId=list(first)[0],
+    )
+    stages = backend.describe_secret(SecretId="test_secret")["VersionIdsToStages"]
+    assert sorted(stages[pending["VersionId"]]) == ["AWSCURRENT", "AWSPENDING"]
+    assert stages[list(first)[0]] == ["AWSPREVIOUS"]
+
+
+@pytest.mark.describe("LocalVault")
+@pytest.mark.it("should encrypt values and keep its files private")
+def test_encrypted(vault_path):
+    """The vault file should not contain the secret and the key file is owner-only."""
+    vault = LocalVault(vault_path)
+    vault.create_secret(Name="test_secret", SecretString="very-secret-password")
+    vault.close()
+
+    with open(vault_path, "rb") as f:
+        assert b"very-secret-password" not in f.read()
+    key_file = default_key_file(vault_path)
+    for path in (vault_path, key_file):
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert not any(
+        name.endswith(".key") for name in os.listdir(os.path.dirname(vault_path))
+    )
+
+    reopened = LocalVault(vault_path)
+    assert (
+        reopened.get_secret_value(SecretId="test_secret")["SecretString"]
+        == "very-secret-password"
+    )
+    reopened.close()
+
+
+@pytest.mark.describe("LocalVault")
+@pytest.mark.it("should refuse a wrong or missing key")
+def test_wrong_key(vault_path, monkeypatch):
+    """LocalVault should raise VaultKeyError rather than open with the wrong key."""
+    LocalVault(vault_path, key=generate_key()).close()
+
+    with pytest.raises(VaultKeyError):
+        LocalVault(vault_path, key=generate_key())
+    with pytest.raises(VaultKeyError):
+        LocalVault(vault_path, key="too-short")
+
+    monkeypatch.setenv(KEY_VARIABLE, generate_key())
+    with pytest.raises(VaultKeyError):
+        LocalVault(vault_path)
+
+
+@pytest.mark.describe("LocalVault")
+@pytest.mark.it("should serve reads and writes from many threads")
+def test_threads(backend):
+    """The vault should handle concurrent writers and readers."""
+
+    def round_trip(i):
+        upsert_secret(f"test_secret{i}", "test_id", f"password{i}")
+        return get_secret_fields(f"test_secret{i}")["password"]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        passwords = list(executor.map(round_trip, range(40)))
+
+    assert passwords == [f"password{i}" for i in range(40)]
+    assert len(list_secrets()) == 40
+
+
+@pytest.mark.describe("LocalVault")
+@pytest.mark.it("should not read a key file kept beside the vault")
+def test_ignores_key_beside_vault(vault_path):
+    """LocalVault should only look for its key outside the vault's directory."""
+    os.makedirs(os.path.dirname(vault_path))
+    key = generate_key()
+    LocalVault(vault_path, key=key).close()
+    with open(vault_path + ".key", "w") as f:
+        f.write(key + "\n")
+
+    with pytest.raises(VaultKeyError):
+        LocalVault(vault_path)
@@ -0,0 +1,149 @@
+"""This module contains the test suite for `MetadataIndex`."""
+
+import os
+import stat
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from src import metadata_index
+from src.client import get_client, reset_clients, BACKEND_VARIABLE, VAULT_VARIABLE
+from src.create_secret import create_secret
+from src.delete_secret import delete_secret
+from src.metadata_index import MetadataIndex, default_index_path
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    """Mocked AWS Credentials for moto"""
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+
+
+@pytest.fixture
+def mock_secretsmanager(aws_credentials):
+    """Mock secretsmanager client"""
+    with mock_aws():
+        yield boto3.client("secretsmanager", region_name="eu-west-2")
+
+
+@pytest.fixture
+def index(mock_secretsmanager, tmp_path):
+    """create a MetadataIndex that only syncs when asked"""
+    idx = MetadataIndex(str(tmp_path / "index.sqlite3"), max_staleness=None)
+    yield idx
+    idx.close()
+
+
+@pytest.fixture
+def secrets(mock_secretsmanager):
+    """create mock secrets with tags"""
+    mock_secretsmanager.create_secret(
+        Name="prod/db", SecretString="x", Tags=[{"Key": "team", "Value": "data"}]
+    )
+    mock_secretsmanager.create_secret(
+        Name="prod/api", SecretString="x", Tags=[{"Key": "team", "Value": "web"}]
+    )
+    mock_secretsmanager.create_secret(Name="dev/db", SecretString="x")
+
+
+@pytest.mark.describe("MetadataIndex")
+@pytest.mark.it("should sync on first use and answer list queries locally")
+def test_lists_from_index(index, secrets, mock_secretsmanager):
+    """MetadataIndex should not call the API again within the staleness bound."""
+    assert index.list_secrets() == ["dev/db", "prod/api", "prod/db"]
+    mock_secretsmanager.create_secret(Name="prod/cache", SecretString="x")
+    assert index.list_secrets(name_prefix="prod/") == ["prod/api", "prod/db"]
+    assert index.list_secrets(tags={"team": "data"}) == ["prod/db"]
+    assert index.list_secrets(tags={"team": None}) == ["prod/api", "prod/db"]
+
+
+@pytest.mark.describe("MetadataIndex")
+@pytest.mark.it("should only rewrite rows that changed on sync")
+def test_incremental_sync(index, secrets, mock_secretsmanager):
+    """MetadataIndex.sync() should count added, updated, removed and unchanged rows."""
+    assert index.sync()["added"] == 3
+    mock_secretsmanager.create_secret(Name="prod/cache", SecretString="x")
+    mock_secretsmanager.tag_resource(
+        SecretId="dev/db", Tags=[{"Key": "team", "Value": "dev"}]
+    )
+    mock_secretsmanager.delete_secret(
+        SecretId="prod/api", ForceDeleteWithoutRecovery=True
+    )
+    assert index.sync() == {"added": 1, "updated": 1, "removed": 1, "unchanged": 1}
+    assert index.list_secrets() == ["dev/db", "prod/cache", "prod/db"]
+    assert index.get_metadata("dev/db")["Tags"] == {"team": "dev"}
+
+
+@pytest.mark.describe("MetadataIndex")
+@pytest.mark.it("should go back to the API when refreshed or stale")
+def test_refresh_and_staleness(index, secrets, mock_secretsmanager, monkeypatch):
+    """MetadataIndex should resync on refresh=True or once max_staleness has passed."""
+    index.list_secrets()
+    mock_secretsmanager.create_secret(Name="prod/cache", SecretString="x")
+    assert "prod/cache" in index.list_secrets(refresh=True)
+    mock_secretsmanager.create_secret(Name="prod/queue", SecretString="x")
+    index.max_staleness = 60
+    now = metadata_index.time.time()
+    monkeypatch.setattr(metadata_index.time, "time", lambda: now + 61)
+    assert "prod/queue" in index.list_secrets()
+
+
+@pytest.mark.describe("MetadataIndex")
+@pytest.mark.it("should be updated by creates and deletes through the library")
+def test_write_through(index):
+    """MetadataIndex should reflect library writes without a sync."""
+    index.sync()
+    create_secret("test_secret", "test_id", "test_password")
+    assert index.list_secrets() == ["test_secret"]
+    delete_secret("test_secret")
+    assert index.list_secrets() == []
+    assert index.get_metadata("test_secret")["Deleted"] is True
+
+
+@pytest.mark.describe("MetadataIndex")
+@pytest.mark.it("should persist between instances with owner-only permissions")
+def test_persists(secrets, tmp_path):
+    """MetadataIndex should reopen an existing file without resyncing."""
+    path = str(tmp_path / "index.sqlite3")
+    first = MetadataIndex(path, max_staleness=None)
+    first.sync()
+    first.close()
+    second = MetadataIndex(path, max_staleness=None)
+    assert second.last_sync is not None
+    assert second.list_secrets() == ["dev/db", "prod/api", "prod/db"]
+    second.close()
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+
+@pytest.mark.describe("default_index_path()")
+@pytest.mark.it("should place the index under the user's cache directory")
+def test_default_index_path(monkeypatch, tmp_path):
+    """default_index_path() should honour XDG_CACHE_HOME and include the region."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert default_index_path("eu-west-2") == str(
+        tmp_path / "password-manager" / "index-eu-west-2.sqlite3"
+    )
+
+
+@pytest.mark.describe("default_index_path()")
+@pytest.mark.it("should keep a separate index for each local vault")
+def test_default_index_path_local(monkeypatch, tmp_path):
+    """default_index_path() should not need a region with the local backend."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.setenv(BACKEND_VARIABLE, "local")
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    paths = []
+    for name in ("first", "second"):
+        monkeypatch.setenv(VAULT_VARIABLE, str(tmp_path / name / "vault.db"))
+        reset_clients()
+        paths.append(default_index_path())
+        get_client().close()
+    reset_clients()
+
+    assert paths[0] != paths[1]
+    assert all(os.path.basename(path).startswith("index-local-") for path in paths)
@@ -0,0 +1,176 @@
+"""This module contains the test suite for the metrics layer."""
+
+import io
+import json
+import os
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from src import metrics
+from src.create_secret import create_secret
+from src.get_secret import get_secret
+from src.metrics import (
+    CallbackSink,
+    JsonLogSink,
+    PrometheusTextfileSink,
+    Registry,
+    to_prometheus,
+)
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    """Mocked AWS Credentials for moto"""
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+
+
+@pytest.fixture
+def mock_secretsmanager(aws_credentials):
+    """Mock secretsmanager client"""
+    with mock_aws():
+        yield boto3.client("secretsmanager", region_name="eu-west-2")
+
+
+@pytest.fixture
+def events():
+    """enable metrics with a callback sink, disabling them afterwards"""
+    received = []
+    metrics.enable(CallbackSink(received.append))
+    yield received
+    metrics.disable()
+
+
+def counter(snapshot, name, **labels):
+    for sample in snapshot["counters"].get(name, []):
+        if sample["labels"] == labels:
+            return sample["value"]
+    return 0
+
+
+@pytest.mark.describe("metrics")
+@pytest.mark.it("should record nothing while disabled")
+def test_disabled(mock_secretsmanager):
+    """@instrument should call straight through when metrics are disabled."""
+    assert not metrics.enabled()
+    create_secret("test_secret", "test_id", "test_password")
+    assert metrics.get_registry() is None
+
+
+@pytest.mark.describe("metrics")
+@pytest.mark.it("should count and time operations and API calls")
+def test_operations(mock_secretsmanager, events):
+    """enable() should record operations, client setup and API call details."""
+    create_secret("test_secret", "test_id", "test_password")
+    get_secret("test_secret")
+    with pytest.raises(Exception):
+        get_secret("missing")
+
+    snapshot = metrics.get_registry().snapshot()
+    assert (
+        counter(snapshot, "operation_calls_total", operation="get_secret", outcome="ok")
+        == 1
+    )
+    assert (
+        counter(
+            snapshot, "operation_calls_total", operation="get_secret", outcome="error"
+        )
+        == 1
+    )
+    assert (
+        counter(
+            snapshot,
+            "operation_errors_total",
+            operation="get_secret",
+            error="ResourceNotFoundException",
+        )
+        == 1
+    )
+    assert counter(snapshot, "api_calls_total", api="GetSecretValue") == 2
+    assert (
+        counter(
+            snapshot,
+            "api_errors_total",
+            api="GetSecretValue",
+            code="ResourceNotFoundException",
+        )
+        == 1
+    )
+
+    histograms = snapshot["histograms"]
+    assert histograms["client_setup_seconds"][0]["count"] == 1
+    for name in (
+        "api_request_seconds",
+        "api_parse_seconds",
+        "api_request_bytes",
+        "api_response_bytes",
+    ):
+        assert {sample["labels"]["api"] for sample in histograms[name]} == {
+            "CreateSecret",
+            "GetSecretValue",
+        }
+    assert {event["name"] for event in events} >= {
+        "operation_duration_seconds",
+        "api_calls_total",
+    }
+
+
+@pytest.mark.describe("Registry")
+@pytest.mark.it("should bucket observations cumulatively")
+def test_histogram():
+    """observe() should choose size buckets for _bytes metrics."""
+    registry = Registry()
+    registry.observe("api_request_bytes", 100, api="GetSecretValue")
+    registry.observe("api_request_bytes", 100000, api="GetSecretValue")
+    sample = registry.snapshot()["histograms"]["api_request_bytes"][0]
+    assert sample["buckets"][0] == [64, 0]
+    assert sample["buckets"][1] == [256, 1]
+    assert sample["buckets"][-1] == ["+Inf", 2]
+    assert sample["count"] == 2
+
+
+@pytest.mark.describe("to_prometheus()")
+@pytest.mark.it("should render counters and histograms in the text format")
+def test_to_prometheus():
+    """to_prometheus() should prefix names and escape label values."""
+    registry = Registry()
+    registry.increment("operation_calls_total", operation='a"b', outcome="ok")
+    registry.observe("operation_duration_seconds", 0.002, operation="get_secret")
+    text = to_prometheus(registry.snapshot())
+    assert "# TYPE password_manager_operation_calls_total counter" in text
+    assert (
+        'password_manager_operation_calls_total{operation="a\\"b",outcome="ok"} 1'
+        in text
+    )
+    assert (
+        "password_manager_operation_duration_seconds_bucket"
+        '{operation="get_secret",le="0.0025"} 1' in text
+    )
+    assert (
+        'password_manager_operation_duration_seconds_count{operation="get_secret"} 1'
+        in text
+    )
+
+
+@pytest.mark.describe("sinks")
+@pytest.mark.it("should write JSON lines and a Prometheus text file")
+def test_sinks(tmp_path):
+    """JsonLogSink should log each event and PrometheusTextfileSink write on flush."""
+    stream = io.StringIO()
+    path = tmp_path / "password_manager.prom"
+    registry = Registry([JsonLogSink(stream), PrometheusTextfileSink(str(path))])
+    registry.increment("api_retries_total", api="GetSecretValue")
+    registry.flush()
+
+    event = json.loads(stream.getvalue())
+    assert event["name"] == "api_retries_total"
+    assert event["labels"] == {"api": "GetSecretValue"}
+    assert (
+        'password_manager_api_retries_total{api="GetSecretValue"} 1' in path.read_text()
+    )
+    assert os.listdir(tmp_path) == ["password_manager.prom"]
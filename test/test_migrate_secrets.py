@@ -0,0 +1,60 @@
+"""This module contains the test suite for `migrate_secrets()`."""
+
+import os
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from src.get_secret import get_secret, get_secret_fields
+from src.migrate_secrets import migrate_secret, migrate_secrets
+from src.create_secret import create_secret
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    """Mocked AWS Credentials for moto"""
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+
+
+@pytest.fixture
+def mock_secretsmanager(aws_credentials):
+    """Mock secretsmanager client"""
+    with mock_aws():
+        yield boto3.client("secretsmanager", region_name="eu-west-2")
+
+
+@pytest.fixture
+def legacy_secret(mock_secretsmanager):
+    """create a secret in the legacy string format"""
+    mock_secretsmanager.create_secret(
+        Name="legacy_secret",
+        SecretString="{'user_id':test_id, 'password':test_password}",
+    )
+    return "legacy_secret"
+
+
+@pytest.mark.describe("migrate_secret()")
+@pytest.mark.it("should rewrite a legacy secret as JSON")
+def test_migrates_legacy(legacy_secret):
+    """migrate_secret() should store a JSON version of a legacy secret."""
+    assert get_secret_fields(legacy_secret) == {
+        "user_id": "test_id",
+        "password": "test_password",
+    }
+    assert migrate_secret(legacy_secret) is True
+    assert (
+        get_secret(legacy_secret) == '{"user_id":"test_id","password":"test_password"}'
+    )
+
+
+@pytest.mark.describe("migrate_secrets()")
+@pytest.mark.it("should migrate legacy secrets and leave current ones alone")
+def test_migrates_all(legacy_secret):
+    """migrate_secrets() should report each secret's migration status."""
+    create_secret("json_secret", "test_id", "test_password")
+    assert migrate_secrets() == {"legacy_secret": "migrated", "json_secret": "current"}
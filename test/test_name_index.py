@@ -0,0 +1,103 @@
+"""This module contains the test suite for `NameIndex`."""
+
+import os
+import time
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from src.create_secret import create_secret
+from src.delete_secret import delete_secret
+from src.name_index import NameIndex
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    """Mocked AWS Credentials for moto"""
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+
+
+@pytest.fixture
+def mock_secretsmanager(aws_credentials):
+    """Mock secretsmanager client"""
+    with mock_aws():
+        yield boto3.client("secretsmanager", region_name="eu-west-2")
+
+
+@pytest.fixture
+def index():
+    """create a NameIndex of mock secret names"""
+    idx = NameIndex(["prod/db", "prod/api", "prod/cache", "dev/db", "missile_codes"])
+    yield idx
+    idx.close()
+
+
+@pytest.mark.describe("NameIndex.complete()")
+@pytest.mark.it("should return names starting with a prefix, in order")
+def test_complete(index):
+    """complete() should return the sorted names in the prefix range."""
+    assert index.complete("prod/") == ["prod/api", "prod/cache", "prod/db"]
+    assert index.complete("prod/", limit=1) == ["prod/api"]
+    assert index.complete("qa/") == []
+
+
+@pytest.mark.describe("NameIndex.search()")
+@pytest.mark.it("should match globs and plain text")
+def test_search(index):
+    """search() should treat glob patterns and plain substrings differently."""
+    assert index.search("*/db") == ["dev/db", "prod/db"]
+    assert index.search("prod/c*") == ["prod/cache"]
+    assert index.search("code") == ["missile_codes"]
+
+
+@pytest.mark.describe("NameIndex.suggest()")
+@pytest.mark.it("should suggest close names for a typo")
+def test_suggest(index):
+    """suggest() should return the closest indexed names."""
+    assert index.suggest("missle_codes") == ["missile_codes"]
+    assert index.suggest("zzzzzz") == []
+
+
+@pytest.mark.describe("NameIndex.completer()")
+@pytest.mark.it("should behave as a readline completer")
+def test_completer(index):
+    """completer() should return successive matches then None."""
+    assert [index.completer("prod/", state) for state in range(4)] == [
+        "prod/api",
+        "prod/cache",
+        "prod/db",
+        None,
+    ]
+
+
+@pytest.mark.describe("NameIndex")
+@pytest.mark.it(
+    "should be built from the listing and follow library creates and deletes"
+)
+def test_follows_changes(mock_secretsmanager):
+    """NameIndex should apply creates and deletes incrementally."""
+    create_secret("test_secret1", "test_id", "test_password")
+    index = NameIndex.from_listing()
+    assert "test_secret1" in index
+    create_secret("test_secret2", "test_id", "test_password")
+    delete_secret("test_secret1")
+    assert index.complete("test_") == ["test_secret2"]
+    index.close()
+
+
+@pytest.mark.describe("NameIndex")
+@pytest.mark.it("should stay responsive with 50k names")
+def test_large_index():
+    """NameIndex should answer prefix and fuzzy queries quickly over 50k names."""
+    index = NameIndex(f"team{i % 50}/service{i}/db" for i in range(50000))
+    start = time.perf_counter()
+    for i in range(100):
+        index.complete(f"team{i % 50}/service{i}")
+    assert index.suggest("team7/service4007/bd")[0] == "team7/service4007/db"
+    assert time.perf_counter() - start < 1
+    index.close()
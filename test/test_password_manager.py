@@ -1,33 +1,21 @@
 """This module contains the test suite for `password_manager()`."""
 
-import os
+import json
 from unittest.mock import patch
 
-import boto3
 import pytest
-from moto import mock_aws
 
 from src.create_secret import create_secret
 from src.get_secret import get_secret
 from src.list_secrets import list_secrets
+from src import password_manager as pm
 from src.password_manager import password_manager
 
 
-@pytest.fixture(scope="function")
-def aws_credentials():
-    """Mocked AWS Credentials for moto"""
-    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
-    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
-    os.environ["AWS_SECURITY_TOKEN"] = "testing"
-    os.environ["AWS_SESSION_TOKEN"] = "testing"
-    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
-
-
 @pytest.fixture
-def mock_secretsmanager(aws_credentials):
-    """Mock secretsmanager client"""
-    with mock_aws():
-        yield boto3.client("secretsmanager", region_name="eu-west-2")
+def mock_secretsmanager(backend):
+    """The client of each backend, so every test runs against AWS and the local vault"""
+    return backend
 
 
 @pytest.mark.describe("password_manager()")
@@ -45,7 +33,7 @@ def mock_secretsmanager(aws_credentials):
 def test_creates_secret(mock_input, mock_secretsmanager):
     """password_manager() should create a new secret with passed data."""
     password_manager()
-    assert get_secret("test_id") == "{'user_id':test_user, 'password':test_password}"
+    assert get_secret("test_id") == '{"user_id":"test_user","password":"test_password"}'
 
 
 @pytest.mark.describe("password_manager()")
@@ -66,7 +54,7 @@ def test_retrieves_secret(mock_input, mock_secretsmanager):
     """password_manager() should retrieve a secret and save it to a file."""
     password_manager()
     with open("test_id.txt", "r", encoding="utf-8") as f:
-        assert f.read() == "{'user_id':test_user, 'password':test_password}"
+        assert f.read() == '{"user_id":"test_user","password":"test_password"}'
 
 
 @pytest.mark.describe("password_manager()")
@@ -85,3 +73,193 @@ def test_deletes_secret(mock_input, mock_secretsmanager):
     assert len(list_secrets()) == 1
     password_manager()
     assert len(list_secrets()) == 0
+
+
+@pytest.mark.describe("password_manager()")
+@pytest.mark.it("i: should import secrets from a file")
+def test_imports_secrets(mock_secretsmanager, tmp_path):
+    """password_manager() should import the CSV file named at the prompt."""
+    path = tmp_path / "secrets.csv"
+    path.write_text(
+        "secret_identifier,user_id,password\n"
+        "test_id1,test_user,test_password\n"
+        "test_id2,test_user,test_password\n",
+        encoding="utf-8",
+    )
+    with patch("builtins.input", side_effect=["i", str(path), "x"]):
+        password_manager()
+    assert sorted(list_secrets()) == ["test_id1", "test_id2"]
+
+
+@pytest.mark.describe("password_manager()")
+@pytest.mark.it("i: should keep diagnostics out of the import report")
+def test_import_report(mock_secretsmanager, tmp_path, capsys):
+    """password_manager() should send create_secret()'s messages to stderr."""
+    path = tmp_path / "secrets.csv"
+    path.write_text(
+        "secret_identifier,user_id,password\ntest_id1,test_user,test_password\n",
+        encoding="utf-8",
+    )
+    create_secret("test_id1", "test_user", "test_password")
+    capsys.readouterr()
+    with patch("builtins.input", side_effect=["i", str(path), "x"]):
+        password_manager()
+    captured = capsys.readouterr()
+
+    reports = [line for line in captured.out.splitlines() if line.startswith("{")]
+    assert [json.loads(line)["status"] for line in reports] == ["already exists"]
+    assert "ResourceExistsException" not in captured.out
+    assert "ResourceExistsException" in captured.err
+
+
+@pytest.mark.describe("password_manager()")
+@pytest.mark.it("b: should delete every secret matching a pattern once confirmed")
+@patch(
+    "builtins.input",
+    side_effect=[
+        "b",
+        "test_*",
+        "y",
+        "x",
+    ],
+)
+def test_bulk_deletes_secrets(mock_input, mock_secretsmanager):
+    """password_manager() should delete secrets matching the pattern."""
+    create_secret("test_id1", "test_user", "test_password")
+    create_secret("test_id2", "test_user", "test_password")
+    create_secret("keep_id", "test_user", "test_password")
+    password_manager()
+    assert list_secrets() == ["keep_id"]
+
+
+@pytest.mark.describe("password_manager()")
+@pytest.mark.it("l: should list secrets from the local metadata index")
+@patch(
+    "builtins.input",
+    side_effect=[
+        "l",
+        "x",
+    ],
+)
+def test_lists_secrets(mock_input, mock_secretsmanager, monkeypatch, tmp_path, capsys):
+    """password_manager() should list secrets through an index in the cache dir."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.setattr(pm, "_index", None)
+    create_secret("test_id", "test_user", "test_password")
+    password_manager()
+    assert "1 secret(s) available" in capsys.readouterr().out
+    assert len(list((tmp_path / "password-manager").glob("index-*.sqlite3"))) == 1
+
+
+@pytest.mark.describe("password_manager()")
+@pytest.mark.it("s: should search secret names locally")
+@patch(
+    "builtins.input",
+    side_effect=[
+        "s",
+        "test_*",
+        "x",
+    ],
+)
+def test_searches_secrets(
+    mock_input, mock_secretsmanager, monkeypatch, tmp_path, capsys
+):
+    """password_manager() should print the names matching the pattern."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.setattr(pm, "_index", None)
+    monkeypatch.setattr(pm, "_name_index", None)
+    create_secret("test_id", "test_user", "test_password")
+    create_secret("other_id", "test_user", "test_password")
+    password_manager()
+    out = capsys.readouterr().out
+    assert "1 secret(s) found" in out
+    assert "> test_id" in out
+
+
+@pytest.mark.describe("password_manager()")
+@pytest.mark.it("r: should suggest close names when a secret is not found")
+@patch(
+    "builtins.input",
+    side_effect=[
+        "r",
+        "tset_id",
+        "x",
+    ],
+)
+def test_suggests_names(mock_input, mock_secretsmanager, monkeypatch, tmp_path, capsys):
+    """password_manager() should print 'did you mean' suggestions on a failed get."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.setattr(pm, "_index", None)
+    monkeypatch.setattr(pm, "_name_index", None)
+    create_secret("test_id", "test_user", "test_password")
+    password_manager()
+    assert "Did you mean: test_id?" in capsys.readouterr().out
+
+
+@pytest.mark.describe("password_manager()")
+@pytest.mark.it("s: should report a failed search and keep running")
+@patch(
+    "builtins.input",
+    side_effect=[
+        "s",
+        "test_*",
+        "x",
+    ],
+)
+def test_search_fails(mock_input, mock_secretsmanager, monkeypatch, capsys):
+    """password_manager() should not exit when the listing behind a search fails."""
+
+    def failing_list(**kwargs):
+        raise RuntimeError("no credentials")
+
+    monkeypatch.setattr(pm, "_index", None)
+    monkeypatch.setattr(pm, "_name_index", None)
+    monkeypatch.setattr(pm, "MetadataIndex", failing_list)
+    monkeypatch.setattr(pm, "list_secrets", failing_list)
+    password_manager()
+    out = capsys.readouterr().out
+    assert "❌ Unable to search." in out
+    assert "Goodbye" in out
+
+
+@pytest.mark.describe("password_manager()")
+@pytest.mark.it("l: should fall back to a plain listing when the index fails")
+@patch(
+    "builtins.input",
+    side_effect=[
+        "l",
+        "x",
+    ],
+)
+def test_lists_without_index(mock_input, mock_secretsmanager, monkeypatch, capsys):
+    """password_manager() should list from the API if the index cannot be used."""
+
+    def failing_index(**kwargs):
+        raise RuntimeError("index unavailable")
+
+    monkeypatch.setattr(pm, "_index", None)
+    monkeypatch.setattr(pm, "MetadataIndex", failing_index)
+    create_secret("test_id", "test_user", "test_password")
+    password_manager()
+    assert "1 secret(s) available" in capsys.readouterr().out
+
+
+@pytest.mark.describe("password_manager()")
+@pytest.mark.it("b: should not ask for confirmation when nothing matches")
+@patch(
+    "builtins.input",
+    side_effect=[
+        "b",
+        "missing/",
+        "x",
+    ],
+)
+def test_bulk_delete_no_matches(mock_input, mock_secretsmanager, capsys):
+    """password_manager() should say nothing matched instead of offering to delete 0."""
+    create_secret("test_id", "test_user", "test_password")
+    password_manager()
+    out = capsys.readouterr().out
+    assert "No matching secrets." in out
+    assert "Unable to delete" not in out
+    assert mock_input.call_count == 3
+    assert list_secrets() == ["test_id"]
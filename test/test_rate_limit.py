@@ -0,0 +1,191 @@
+"""This module contains the test suite for the `rate_limit` module."""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError
+from moto import mock_aws
+
+from src import rate_limit
+from src.create_secret import create_secret
+from src.get_secret import get_secret
+from src.rate_limit import RateController, TokenBucket
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    """Mocked AWS Credentials for moto"""
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+
+
+@pytest.fixture
+def mock_secretsmanager(aws_credentials):
+    """Mock secretsmanager client"""
+    with mock_aws():
+        yield boto3.client("secretsmanager", region_name="eu-west-2")
+
+
+@pytest.fixture
+def clock():
+    """fake clock whose sleep advances time instead of blocking"""
+
+    class Clock:
+        now = 0.0
+        slept = []
+
+        def __call__(self):
+            return self.now
+
+        def sleep(self, seconds):
+            self.slept.append(seconds)
+            self.now += seconds
+
+    return Clock()
+
+
+@pytest.fixture
+def controller(clock):
+    """create a RateController driven by the fake clock"""
+    return RateController(rates={"GetSecretValue": 10}, clock=clock, sleep=clock.sleep)
+
+
+def client_error(code):
+    """create a botocore ClientError with the given error code"""
+    return ClientError({"Error": {"Code": code, "Message": code}}, "GetSecretValue")
+
+
+def flaky(*failures):
+    """create a function that raises each failure in turn, then succeeds"""
+    remaining = list(failures)
+
+    def func():
+        if remaining:
+            raise remaining.pop(0)
+        return "ok"
+
+    return func
+
+
+@pytest.mark.describe("TokenBucket")
+@pytest.mark.it("should make callers wait once the burst is spent")
+def test_token_bucket_waits(clock):
+    """TokenBucket should block for 1/rate seconds per token past capacity."""
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock, sleep=clock.sleep)
+    waits = [bucket.acquire() for _ in range(4)]
+    assert waits == [0, 0, 0.5, 0.5]
+
+
+@pytest.mark.describe("RateController")
+@pytest.mark.it("should retry throttled calls and count them")
+def test_retries_throttles(controller):
+    """RateController should retry ThrottlingException and record the throttle."""
+    func = flaky(
+        client_error("ThrottlingException"), client_error("ThrottlingException")
+    )
+    assert controller.call("GetSecretValue", func) == "ok"
+    stats = controller.stats["GetSecretValue"]
+    assert stats["calls"] == 3
+    assert stats["retries"] == 2
+    assert stats["throttles"] == 2
+
+
+@pytest.mark.describe("RateController")
+@pytest.mark.it("should halve the rate on a throttle and recover it additively")
+def test_aimd(controller):
+    """RateController should cut the rate multiplicatively and raise it additively."""
+    controller.call("GetSecretValue", flaky(client_error("ThrottlingException")))
+    assert controller.stats["GetSecretValue"]["rate"] == 6
+    controller.call("GetSecretValue", flaky())
+    assert controller.stats["GetSecretValue"]["rate"] == 7
+
+
+@pytest.mark.describe("RateController")
+@pytest.mark.it("should retry transient connection errors")
+def test_retries_transient(controller):
+    """RateController should retry connection errors without changing the rate."""
+    func = flaky(EndpointConnectionError(endpoint_url="https://example"))
+    assert controller.call("GetSecretValue", func) == "ok"
+    assert controller.stats["GetSecretValue"]["throttles"] == 0
+    assert controller.stats["GetSecretValue"]["rate"] == 10
+
+
+@pytest.mark.describe("RateController")
+@pytest.mark.it("should not retry non-transient errors")
+def test_does_not_retry_other_errors(controller):
+    """RateController should raise other ClientErrors straight away."""
+    with pytest.raises(ClientError):
+        controller.call(
+            "GetSecretValue", flaky(client_error("ResourceNotFoundException"))
+        )
+    assert controller.stats["GetSecretValue"]["calls"] == 1
+
+
+@pytest.mark.describe("RateController")
+@pytest.mark.it("should give up after max_attempts with exponential jittered backoff")
+def test_gives_up(clock):
+    """RateController should raise the last error once attempts run out."""
+    controller = RateController(
+        max_attempts=3, base_delay=1, clock=clock, sleep=clock.sleep
+    )
+    func = flaky(*[client_error("ServiceUnavailable")] * 3)
+    with pytest.raises(ClientError):
+        controller.call("ListSecrets", func)
+    assert controller.stats["ListSecrets"]["failures"] == 1
+    backoffs = clock.slept
+    assert len(backoffs) == 2
+    assert 0 <= backoffs[0] <= 1 and 0 <= backoffs[1] <= 2
+
+
+@pytest.mark.describe("RateController")
+@pytest.mark.it("should retry writes with the same client request token")
+def test_retries_writes_with_same_token(controller):
+    """RateController should send one ClientRequestToken on every attempt of a write."""
+    tokens = []
+    failures = [EndpointConnectionError(endpoint_url="https://example")]
+
+    def func(**kwargs):
+        tokens.append(kwargs["ClientRequestToken"])
+        if failures:
+            raise failures.pop(0)
+        return "ok"
+
+    assert controller.call("CreateSecret", func, Name="test_secret") == "ok"
+    assert len(tokens) == 2 and tokens[0] == tokens[1]
+
+    tokens.clear()
+    controller.call("PutSecretValue", func, ClientRequestToken="caller-token")
+    assert tokens == ["caller-token"]
+
+
+@pytest.mark.describe("RateController")
+@pytest.mark.it("should share state between threads")
+def test_thread_safe(controller):
+    """RateController should count every call made from concurrent threads."""
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(
+            executor.map(
+                lambda _: controller.call("GetSecretValue", flaky()), range(100)
+            )
+        )
+    assert controller.stats["GetSecretValue"]["calls"] == 100
+
+
+@pytest.mark.describe("rate_limit.call()")
+@pytest.mark.it("should be used by the secret operations")
+def test_operations_use_controller(mock_secretsmanager):
+    """create_secret() and get_secret() should go through the shared controller."""
+    controller = RateController()
+    rate_limit.set_rate_controller(controller)
+    try:
+        create_secret("test_secret", "test_id", "test_password")
+        get_secret("test_secret")
+    finally:
+        rate_limit.set_rate_controller(RateController())
+    assert controller.stats["CreateSecret"]["calls"] == 1
+    assert controller.stats["GetSecretValue"]["calls"] == 1
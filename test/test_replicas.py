@@ -0,0 +1,149 @@
+"""This module contains the test suite for `ReplicaRouter` and `replicate_secret()`."""
+
+import os
+
+import boto3
+import pytest
+from botocore.exceptions import EndpointConnectionError
+from moto import mock_aws
+
+from src import replicas
+from src.client import get_client
+from src.create_secret import create_secret
+from src.replicas import ReplicaRouter, replicate_secret
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    """Mocked AWS Credentials for moto"""
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+
+
+@pytest.fixture
+def mock_secretsmanager(aws_credentials):
+    """Mock secretsmanager client"""
+    with mock_aws():
+        yield boto3.client("secretsmanager", region_name="eu-west-2")
+
+
+@pytest.fixture
+def replicated(mock_secretsmanager):
+    """create a secret in eu-west-2 replicated to eu-west-1"""
+    create_secret(
+        "test_secret", "test_id", "test_password", replica_regions=["eu-west-1"]
+    )
+
+
+class Clock:
+    """a manually advanced clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def unreachable(monkeypatch):
+    """make eu-west-2 unreachable for the router"""
+    calls = []
+
+    class Unreachable:
+        def __getattr__(self, name):
+            def fail(**kwargs):
+                calls.append(name)
+                raise EndpointConnectionError(endpoint_url="https://eu-west-2")
+
+            return fail
+
+    def fake_get_client(region_name=None, profile_name=None):
+        if region_name == "eu-west-2":
+            return Unreachable()
+        return get_client(region_name, profile_name)
+
+    monkeypatch.setattr(replicas, "get_client", fake_get_client)
+    return calls
+
+
+@pytest.mark.describe("create_secret()")
+@pytest.mark.it("should replicate a new secret when passed replica regions")
+def test_create_with_replicas(replicated):
+    """create_secret() should add the replica in the other region."""
+    replica = boto3.client("secretsmanager", region_name="eu-west-1")
+    response = replica.get_secret_value(SecretId="test_secret")
+    assert (
+        response["SecretString"] == '{"user_id":"test_id","password":"test_password"}'
+    )
+
+
+@pytest.mark.describe("replicate_secret()")
+@pytest.mark.it("should replicate an existing secret")
+def test_replicate_secret(mock_secretsmanager):
+    """replicate_secret() should return the status of each replica."""
+    create_secret("test_secret", "test_id", "test_password")
+    statuses = replicate_secret("test_secret", ["us-east-1"])
+    assert [s["Region"] for s in statuses] == ["us-east-1"]
+    router = ReplicaRouter(["us-east-1"])
+    assert router.get_secret_fields("test_secret")["user_id"] == "test_id"
+
+
+@pytest.mark.describe("ReplicaRouter")
+@pytest.mark.it("should read from a healthy region and measure its latency")
+def test_reads(replicated):
+    """get_secret() should probe every region and then read the secret."""
+    router = ReplicaRouter(["eu-west-2", "eu-west-1"])
+    assert (
+        router.get_secret("test_secret")
+        == '{"user_id":"test_id","password":"test_password"}'
+    )
+    health = router.health
+    assert all(h["latency"] is not None and h["healthy"] for h in health.values())
+
+
+@pytest.mark.describe("ReplicaRouter")
+@pytest.mark.it("should prefer the region with the lowest latency")
+def test_ranking():
+    """ranked_regions() should sort by measured latency, unmeasured regions last."""
+    router = ReplicaRouter(["eu-west-2", "eu-west-1", "us-east-1"])
+    router._record_success("eu-west-1", 0.01)
+    router._record_success("eu-west-2", 0.2)
+    assert router.ranked_regions() == ["eu-west-1", "eu-west-2", "us-east-1"]
+
+
+@pytest.mark.describe("ReplicaRouter")
+@pytest.mark.it("should fail over and skip a failing region until its cooldown ends")
+def test_failover(replicated, unreachable):
+    """get_secret() should read the replica when the primary region is unreachable."""
+    clock = Clock()
+    router = ReplicaRouter(
+        ["eu-west-2", "eu-west-1"], failure_threshold=1, cooldown=10, clock=clock
+    )
+    router._probed = True
+
+    assert router.get_secret_fields("test_secret")["password"] == "test_password"
+    assert router.health["eu-west-2"] == {
+        "latency": None,
+        "failures": 1,
+        "healthy": False,
+    }
+
+    assert router.get_secret("test_secret")
+    assert unreachable == ["get_secret_value"]
+
+    clock.now = 11
+    assert router.health["eu-west-2"]["healthy"]
+
+
+@pytest.mark.describe("ReplicaRouter")
+@pytest.mark.it("should raise the last error when every region fails")
+def test_all_fail(replicated):
+    """get_secret() should raise ResourceNotFoundException, regions staying healthy."""
+    router = ReplicaRouter(["eu-west-2", "eu-west-1"])
+    with pytest.raises(get_client().exceptions.ResourceNotFoundException):
+        router.get_secret("missing")
+    assert all(h["failures"] == 0 for h in router.health.values())
@@ -0,0 +1,205 @@
+"""This module contains the test suite for `rotate_secret()` and `rotate_secrets()`."""
+
+import json
+import os
+import string
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from src import rotate_secrets as rotate_module
+from src.create_secret import create_secret
+from src.rotate_secrets import (
+    generate_password,
+    rotate_secret,
+    rotate_secrets,
+    FAILED,
+    ROTATED,
+    SKIPPED,
+)
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    """Mocked AWS Credentials for moto"""
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+
+
+@pytest.fixture
+def mock_secretsmanager(aws_credentials):
+    """Mock secretsmanager client"""
+    with mock_aws():
+        yield boto3.client("secretsmanager", region_name="eu-west-2")
+
+
+def current_fields(client, secret_id):
+    # moto does not move its default version with the stage, so ask for AWSCURRENT.
+    response = client.get_secret_value(SecretId=secret_id, VersionStage="AWSCURRENT")
+    return json.loads(response["SecretString"])
+
+
+def stages(client, secret_id):
+    return client.describe_secret(SecretId=secret_id)["VersionIdsToStages"]
+
+
+@pytest.mark.describe("generate_password()")
+@pytest.mark.it("should include every character class at the requested length")
+def test_generate_password():
+    """generate_password() should return strong, distinct passwords."""
+    password = generate_password(12)
+    assert len(password) == 12
+    assert any(c in string.digits for c in password)
+    assert any(c in rotate_module.PUNCTUATION for c in password)
+    assert generate_password() != generate_password()
+    with pytest.raises(ValueError):
+        generate_password(4)
+
+
+@pytest.mark.describe("rotate_secret()")
+@pytest.mark.it("should make a new password current and keep the old one as previous")
+def test_rotate_secret(mock_secretsmanager):
+    """rotate_secret() should move AWSCURRENT to the new version."""
+    create_secret("test_secret", "test_id", "old_password")
+    applied = []
+
+    version_id = rotate_secret(
+        "test_secret",
+        generate=lambda: "new_password",
+        apply=lambda *args: applied.append(args),
+    )
+
+    assert applied == [("test_secret", "test_id", "new_password")]
+    assert current_fields(mock_secretsmanager, "test_secret") == {
+        "user_id": "test_id",
+        "password": "new_password",
+    }
+    labels = stages(mock_secretsmanager, "test_secret")
+    assert labels[version_id] == ["AWSCURRENT"]
+    assert ["AWSPREVIOUS"] in labels.values()
+
+
+@pytest.mark.describe("rotate_secret()")
+@pytest.mark.it(
+    "should leave the new version pending if applying it fails, then finish it"
+)
+def test_rotate_secret_pending(mock_secretsmanager):
+    """rotate_secret() should finish an earlier pending version, not make another."""
+    create_secret("test_secret", "test_id", "old_password")
+
+    def fail(*args):
+        raise ConnectionError("database unavailable")
+
+    with pytest.raises(ConnectionError):
+        rotate_secret("test_secret", generate=lambda: "first_try", apply=fail)
+    assert (
+        current_fields(mock_secretsmanager, "test_secret")["password"] == "old_password"
+    )
+    assert ["AWSPENDING"] in stages(mock_secretsmanager, "test_secret").values()
+
+    rotate_secret("test_secret", generate=lambda: "second_try")
+    assert current_fields(mock_secretsmanager, "test_secret")["password"] == "first_try"
+
+
+@pytest.mark.describe("rotate_secrets()")
+@pytest.mark.it("should rotate secrets selected by prefix and tag")
+def test_rotate_secrets(mock_secretsmanager):
+    """rotate_secrets() should rotate only the selected secrets."""
+    for i in range(5):
+        create_secret(f"prod/db{i}", "test_id", "old_password")
+    create_secret("dev/db", "test_id", "old_password")
+    mock_secretsmanager.create_secret(
+        Name="tagged",
+        SecretString='{"user_id":"test_id","password":"old_password"}',
+        Tags=[{"Key": "rotate", "Value": "yes"}],
+    )
+
+    results = rotate_secrets(
+        name_prefix="prod/", max_workers=3, rotations_per_second=100
+    )
+    assert results == {f"prod/db{i}": ROTATED for i in range(5)}
+    assert rotate_secrets(tags={"rotate": "yes"}) == {"tagged": ROTATED}
+    assert current_fields(mock_secretsmanager, "dev/db")["password"] == "old_password"
+    assert current_fields(mock_secretsmanager, "prod/db0")["password"] != "old_password"
+
+    with pytest.raises(ValueError):
+        rotate_secrets()
+
+
+@pytest.mark.describe("rotate_secrets()")
+@pytest.mark.it("should reject a negated prefix rather than rotate everything else")
+def test_rotate_secrets_negated_prefix(mock_secretsmanager):
+    """rotate_secrets() should not pass a leading "!" to the name filter."""
+    create_secret("prod/db", "test_id", "old_password")
+    create_secret("dev/db", "test_id", "old_password")
+
+    with pytest.raises(ValueError):
+        rotate_secrets(name_prefix="!prod")
+    assert current_fields(mock_secretsmanager, "dev/db")["password"] == "old_password"
+
+
+@pytest.mark.describe("rotate_secrets()")
+@pytest.mark.it("should resume from its journal without rotating anything twice")
+def test_rotate_secrets_resume(mock_secretsmanager, tmp_path, monkeypatch):
+    """rotate_secrets() should skip rotated secrets and finish pending ones."""
+    for i in range(6):
+        create_secret(f"test_secret{i}", "test_id", "old_password")
+    journal = str(tmp_path / "rotation.jsonl")
+
+    real_rotate = rotate_module.rotate_secret
+
+    def crashing_rotate(secret_id, **kwargs):
+        if secret_id == "test_secret4":
+            raise ConnectionError("crashed")
+        return real_rotate(secret_id, **kwargs)
+
+    monkeypatch.setattr(rotate_module, "rotate_secret", crashing_rotate)
+    first = rotate_secrets(name_prefix="test_secret", journal=journal)
+    assert first["test_secret4"] == FAILED
+    assert list(first.values()).count(ROTATED) == 5
+    passwords = {
+        f"test_secret{i}": current_fields(mock_secretsmanager, f"test_secret{i}")[
+            "password"
+        ]
+        for i in range(6)
+    }
+
+    monkeypatch.setattr(rotate_module, "rotate_secret", real_rotate)
+    with open(journal, "a", encoding="utf-8") as f:
+        f.write('{"torn')
+
+    second = rotate_secrets(name_prefix="test_secret", journal=journal)
+    assert second["test_secret4"] == ROTATED
+    assert list(second.values()).count(SKIPPED) == 5
+    for i in range(6):
+        password = current_fields(mock_secretsmanager, f"test_secret{i}")["password"]
+        assert (password == passwords[f"test_secret{i}"]) == (i != 4)
+
+
+@pytest.mark.describe("rotate_secrets()")
+@pytest.mark.it(
+    "should not rotate again a secret whose rotation finished before the crash"
+)
+def test_rotate_secrets_completed_pending(mock_secretsmanager, tmp_path):
+    """rotate_secrets() should treat a journalled version now current as done."""
+    create_secret("test_secret", "test_id", "old_password")
+    version_id = rotate_secret("test_secret", generate=lambda: "new_password")
+
+    journal = tmp_path / "rotation.jsonl"
+    journal.write_text(
+        json.dumps(
+            {"secret_id": "test_secret", "status": "pending", "version_id": version_id}
+        )
+        + "\n"
+    )
+
+    assert rotate_secrets(["test_secret"], journal=str(journal)) == {
+        "test_secret": ROTATED
+    }
+    assert (
+        current_fields(mock_secretsmanager, "test_secret")["password"] == "new_password"
+    )
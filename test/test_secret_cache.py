@@ -0,0 +1,147 @@
+"""This module contains the test suite for `SecretCache`."""
+
+import os
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from src import secret_cache
+from src.create_secret import create_secret
+from src.delete_secret import delete_secret
+from src.secret_cache import SecretCache, get_cached_secret
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    """Mocked AWS Credentials for moto"""
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+
+
+@pytest.fixture
+def mock_secretsmanager(aws_credentials):
+    """Mock secretsmanager client"""
+    with mock_aws():
+        yield boto3.client("secretsmanager", region_name="eu-west-2")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """controllable replacement for time.monotonic()"""
+
+    class Clock:
+        now = 1000.0
+
+        def __call__(self):
+            return self.now
+
+    fake = Clock()
+    monkeypatch.setattr(secret_cache.time, "monotonic", fake)
+    return fake
+
+
+@pytest.fixture
+def cache():
+    """create a SecretCache that is closed after the test"""
+    c = SecretCache(ttl=60, max_size=2)
+    yield c
+    c.close()
+
+
+@pytest.mark.describe("SecretCache")
+@pytest.mark.it("should serve repeated reads from the cache")
+def test_hits(mock_secretsmanager, cache):
+    """SecretCache should only call the API on the first read."""
+    create_secret("test_secret", "test_id", "test_password")
+    first = cache.get_secret("test_secret")
+    mock_secretsmanager.put_secret_value(SecretId="test_secret", SecretString="new")
+    assert cache.get_secret("test_secret") == first
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 1
+
+
+@pytest.mark.describe("SecretCache")
+@pytest.mark.it("should refetch a secret once its ttl has passed")
+def test_expires(mock_secretsmanager, cache, clock):
+    """SecretCache should wipe entries older than the ttl."""
+    create_secret("test_secret", "test_id", "test_password")
+    cache.get_secret("test_secret")
+    mock_secretsmanager.put_secret_value(SecretId="test_secret", SecretString="new")
+    clock.now += 61
+    assert cache.get_secret("test_secret") == "new"
+    assert cache.stats["expirations"] == 1
+
+
+@pytest.mark.describe("SecretCache")
+@pytest.mark.it("should evict the least recently used secret when full")
+def test_lru_eviction(mock_secretsmanager, cache):
+    """SecretCache should evict the least recently used entry past max_size."""
+    for name in ("one", "two", "three"):
+        create_secret(name, "test_id", "test_password")
+    cache.get_secret("one")
+    cache.get_secret("two")
+    cache.get_secret("one")
+    cache.get_secret("three")
+    assert cache.stats["evictions"] == 1
+    assert cache.stats["size"] == 2
+    cache.get_secret("one")
+    assert cache.stats["hits"] == 2
+
+
+@pytest.mark.describe("SecretCache")
+@pytest.mark.it("should revalidate stale entries without refetching the value")
+def test_revalidates(mock_secretsmanager, clock):
+    """SecretCache should keep a stale entry whose version is still AWSCURRENT."""
+    create_secret("test_secret", "test_id", "test_password")
+    cache = SecretCache(ttl=60, revalidate=True)
+    cache.get_secret("test_secret")
+    clock.now += 61
+    assert (
+        cache.get_secret("test_secret")
+        == '{"user_id":"test_id","password":"test_password"}'
+    )
+    assert cache.stats["revalidations"] == 1
+    mock_secretsmanager.put_secret_value(SecretId="test_secret", SecretString="new")
+    clock.now += 61
+    assert cache.get_secret("test_secret") == "new"
+    assert cache.stats["misses"] == 2
+    cache.close()
+
+
+@pytest.mark.describe("SecretCache")
+@pytest.mark.it("should invalidate entries on create and delete through the library")
+def test_invalidates_on_change(mock_secretsmanager, cache):
+    """SecretCache should drop an entry when the library deletes the secret."""
+    create_secret("test_secret", "test_id", "test_password")
+    cache.get_secret("test_secret")
+    delete_secret("test_secret")
+    assert len(cache) == 0
+    with pytest.raises(mock_secretsmanager.exceptions.InvalidRequestException):
+        cache.get_secret("test_secret")
+
+
+@pytest.mark.describe("SecretCache")
+@pytest.mark.it("should wipe masked values when entries are dropped")
+def test_wipes_values(mock_secretsmanager, cache):
+    """SecretCache should zero an entry's buffers when it is invalidated."""
+    create_secret("test_secret", "test_id", "test_password")
+    cache.get_secret("test_secret")
+    entry = cache._entries["test_secret"]
+    assert b"test_password" not in bytes(entry._masked)
+    cache.invalidate("test_secret")
+    assert not any(entry._masked) and not any(entry._pad)
+
+
+@pytest.mark.describe("get_cached_secret()")
+@pytest.mark.it("should retrieve secrets through a shared cache")
+def test_get_cached_secret(mock_secretsmanager):
+    """get_cached_secret() should return the secret string."""
+    create_secret("test_secret", "test_id", "test_password")
+    assert (
+        get_cached_secret("test_secret")
+        == '{"user_id":"test_id","password":"test_password"}'
+    )
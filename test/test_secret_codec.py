@@ -0,0 +1,74 @@
+"""This module contains the test suite for the `secret_codec` module."""
+
+import json
+
+import pytest
+
+from src.secret_codec import (
+    binary_to_string,
+    decode_secret,
+    encode_secret,
+    encode_secret_binary,
+    is_legacy,
+    SecretFormatError,
+)
+
+
+@pytest.fixture
+def awkward_password():
+    """create a password containing JSON and legacy-format punctuation"""
+    return "p'a\"s{s}, 'password':w\\ord"
+
+
+@pytest.mark.describe("encode_secret()")
+@pytest.mark.it("should produce valid JSON for any password")
+def test_encodes_json(awkward_password):
+    """encode_secret() should round trip punctuation through JSON."""
+    secret_string = encode_secret("test_id", awkward_password)
+    assert json.loads(secret_string) == {
+        "user_id": "test_id",
+        "password": awkward_password,
+    }
+    assert decode_secret(secret_string)["password"] == awkward_password
+
+
+@pytest.mark.describe("encode_secret_binary()")
+@pytest.mark.it("should write a versioned header and round trip")
+def test_encodes_binary(awkward_password):
+    """encode_secret_binary() should produce a b'PMS' payload that decodes back."""
+    for compress in (True, False):
+        payload = encode_secret_binary("test_id", awkward_password, compress=compress)
+        assert payload[:4] == b"PMS\x01"
+        assert decode_secret(payload) == {
+            "user_id": "test_id",
+            "password": awkward_password,
+        }
+
+
+@pytest.mark.describe("decode_secret()")
+@pytest.mark.it("should read legacy strings")
+def test_decodes_legacy():
+    """decode_secret() should parse the old non-JSON format."""
+    legacy = "{'user_id':test_id, 'password':test_password}"
+    assert is_legacy(legacy)
+    assert decode_secret(legacy) == {"user_id": "test_id", "password": "test_password"}
+
+
+@pytest.mark.describe("decode_secret()")
+@pytest.mark.it("should error on unrecognised values")
+def test_decode_errors():
+    """decode_secret() should raise SecretFormatError for unknown formats."""
+    with pytest.raises(SecretFormatError):
+        decode_secret("not a secret")
+    with pytest.raises(SecretFormatError):
+        decode_secret("[1, 2]")
+    with pytest.raises(SecretFormatError):
+        binary_to_string(b"\x00\x01\x02")
+    with pytest.raises(SecretFormatError):
+        binary_to_string(b"PMS\x09\x00{}")
+    with pytest.raises(SecretFormatError):
+        binary_to_string(b"PMS\x01")
+    with pytest.raises(SecretFormatError):
+        binary_to_string(b"PMS\x01\x01not zlib")
+    with pytest.raises(SecretFormatError):
+        binary_to_string(b"PMS\x01\x00\xff\xfe")
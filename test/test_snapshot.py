@@ -0,0 +1,297 @@
+"""This module contains the test suite for `snapshot_secrets()` and restoring."""
+
+import os
+import stat
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from src import snapshot as snapshot_module
+from src.create_secret import create_secret
+from src.delete_secret import delete_secret
+from src.get_secret import get_secret, get_secret_fields
+from src.local_vault import decode_key, generate_key
+from src.snapshot import (
+    load_key,
+    read_snapshot,
+    restore_snapshot,
+    snapshot_secrets,
+    verify_snapshot,
+    SnapshotError,
+    KEY_VARIABLE,
+)
+from src.upsert_secret import upsert_secret
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    """Mocked AWS Credentials for moto"""
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+
+
+@pytest.fixture
+def mock_secretsmanager(aws_credentials):
+    """Mock secretsmanager client"""
+    with mock_aws():
+        yield boto3.client("secretsmanager", region_name="eu-west-2")
+
+
+@pytest.fixture
+def key():
+    """A fresh snapshot key"""
+    return decode_key(generate_key())
+
+
+@pytest.fixture
+def secrets(mock_secretsmanager):
+    """Store 50 secrets"""
+    for i in range(50):
+        create_secret(f"test_secret{i}", "test_id", f"password{i}")
+
+
+@pytest.mark.describe("snapshot_secrets()")
+@pytest.mark.it("should write every secret to one encrypted, owner-only file")
+def test_snapshot(secrets, key, tmp_path):
+    """snapshot_secrets() should report throughput and hold no plaintext."""
+    path = str(tmp_path / "backup.snap")
+    summary = snapshot_secrets(path, key, frame_size=16)
+
+    assert summary["secrets"] == 50 and summary["errors"] == {}
+    assert summary["bytes"] == os.path.getsize(path)
+    assert summary["secrets_per_second"] > 0
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert not os.path.exists(path + ".partial")
+
+    with open(path, "rb") as f:
+        content = f.read()
+    assert b"password1" not in content and b"test_secret1" not in content
+
+    records = dict(read_snapshot(path, key))
+    assert len(records) == 50
+    assert records["test_secret7"] == get_secret("test_secret7")
+    assert verify_snapshot(path, key)["secrets"] == 50
+
+
+@pytest.mark.describe("snapshot_secrets()")
+@pytest.mark.it("should record secrets that cannot be read")
+def test_snapshot_errors(secrets, key, tmp_path):
+    """snapshot_secrets() should list failed ids in the summary and manifest."""
+    path = str(tmp_path / "backup.snap")
+    summary = snapshot_secrets(path, key, secret_ids=["test_secret1", "missing"])
+    assert summary["secrets"] == 1
+    assert summary["errors"] == {"missing": "ResourceNotFoundException"}
+    assert verify_snapshot(path, key)["errors"] == summary["errors"]
+
+
+@pytest.mark.describe("snapshot_secrets()")
+@pytest.mark.it("should continue an interrupted snapshot")
+def test_snapshot_resume(secrets, key, tmp_path, monkeypatch):
+    """snapshot_secrets() should keep complete frames and skip the secrets they hold."""
+    path = str(tmp_path / "backup.snap")
+    real_get_secrets = snapshot_module.get_secrets
+    calls = []
+
+    def failing_get_secrets(chunk, max_workers):
+        calls.append(chunk)
+        if len(calls) > 2:
+            raise ConnectionError("interrupted")
+        return real_get_secrets(chunk, max_workers)
+
+    monkeypatch.setattr(snapshot_module, "get_secrets", failing_get_secrets)
+    with pytest.raises(ConnectionError):
+        snapshot_secrets(path, key, max_workers=1, frame_size=10)
+    assert os.path.exists(path + ".partial") and not os.path.exists(path)
+
+    # Leave a torn frame at the end, as a crash mid-write would.
+    with open(path + ".partial", "ab") as f:
+        f.write(b"\x00\x00\x01\x00\x01torn")
+
+    monkeypatch.setattr(snapshot_module, "get_secrets", real_get_secrets)
+    summary = snapshot_secrets(path, key, frame_size=10)
+
+    assert 0 < summary["resumed"] < 50
+    assert summary["secrets"] == 50
+    names = [secret_id for secret_id, _ in read_snapshot(path, key)]
+    assert sorted(names) == sorted(f"test_secret{i}" for i in range(50))
+
+
+@pytest.mark.describe("snapshot_secrets()")
+@pytest.mark.it("should keep the errors of an interrupted snapshot")
+def test_snapshot_resume_errors(secrets, key, tmp_path, monkeypatch):
+    """snapshot_secrets() should report secrets an earlier run could not read."""
+    path = str(tmp_path / "backup.snap")
+    secret_ids = ["missing"] + [f"test_secret{i}" for i in range(50)]
+    real_get_secrets = snapshot_module.get_secrets
+    calls = []
+
+    def failing_get_secrets(chunk, max_workers):
+        calls.append(chunk)
+        if len(calls) > 2:
+            raise ConnectionError("interrupted")
+        return real_get_secrets(chunk, max_workers)
+
+    def recording_get_secrets(chunk, max_workers):
+        calls.append(chunk)
+        return real_get_secrets(chunk, max_workers)
+
+    monkeypatch.setattr(snapshot_module, "get_secrets", failing_get_secrets)
+    with pytest.raises(ConnectionError):
+        snapshot_secrets(path, key, secret_ids=secret_ids, max_workers=1, frame_size=10)
+
+    calls.clear()
+    monkeypatch.setattr(snapshot_module, "get_secrets", recording_get_secrets)
+    summary = snapshot_secrets(path, key, secret_ids=secret_ids, frame_size=10)
+
+    assert not any("missing" in chunk for chunk in calls)
+    assert summary["secrets"] == 50
+    assert summary["errors"] == {"missing": "ResourceNotFoundException"}
+    assert verify_snapshot(path, key)["errors"] == summary["errors"]
+
+
+@pytest.mark.describe("snapshot_secrets()")
+@pytest.mark.it("should refuse to continue a snapshot with another key")
+def test_snapshot_resume_wrong_key(secrets, key, tmp_path):
+    """snapshot_secrets() should not overwrite a partial snapshot it cannot read."""
+    path = str(tmp_path / "backup.snap")
+    snapshot_secrets(path, key)
+    os.rename(path, path + ".partial")
+
+    with pytest.raises(SnapshotError):
+        snapshot_secrets(path, decode_key(generate_key()))
+
+
+@pytest.mark.describe("verify_snapshot()")
+@pytest.mark.it("should detect a wrong key, tampering and truncation")
+def test_verify(secrets, key, tmp_path):
+    """verify_snapshot() should raise SnapshotError for any damage."""
+    path = str(tmp_path / "backup.snap")
+    snapshot_secrets(path, key, frame_size=16)
+    with open(path, "rb") as f:
+        content = f.read()
+
+    with pytest.raises(SnapshotError):
+        verify_snapshot(path, decode_key(generate_key()))
+
+    tampered = bytearray(content)
+    tampered[len(content) // 2] ^= 1
+    damaged = [
+        bytes(tampered),
+        content[:-10],
+        content[: len(content) // 2],
+        b"nonsense",
+    ]
+
+    for data in damaged:
+        with open(path, "wb") as f:
+            f.write(data)
+        with pytest.raises(SnapshotError):
+            verify_snapshot(path, key)
+
+
+@pytest.mark.describe("restore_snapshot()")
+@pytest.mark.it("should write back changed and missing secrets and skip the rest")
+def test_restore(secrets, key, tmp_path):
+    """restore_snapshot() should report created, updated and unchanged secrets."""
+    path = str(tmp_path / "backup.snap")
+    snapshot_secrets(path, key)
+
+    delete_secret("test_secret1", force_delete=True)
+    upsert_secret("test_secret2", "test_id", "changed")
+
+    summary = restore_snapshot(path, key, max_workers=4)
+
+    assert summary["created"] == 1
+    assert summary["updated"] == 1
+    assert summary["unchanged"] == 48
+    assert summary["failed"] == 0
+    assert get_secret_fields("test_secret1")["password"] == "password1"
+    assert get_secret_fields("test_secret2")["password"] == "password2"
+    assert not os.path.exists(path + ".restore")
+
+    again = restore_snapshot(path, key)
+    assert again["unchanged"] == 50
+
+
+@pytest.mark.describe("restore_snapshot()")
+@pytest.mark.it("should skip the frames an interrupted restore completed")
+def test_restore_resume(secrets, key, tmp_path, monkeypatch):
+    """restore_snapshot() should keep a journal until every secret is restored."""
+    path = str(tmp_path / "backup.snap")
+    snapshot_secrets(path, key, frame_size=10)
+    for i in range(50):
+        delete_secret(f"test_secret{i}", force_delete=True)
+
+    real_upsert = snapshot_module.upsert_secret_string
+
+    def failing_upsert(secret_id, secret_string, current_version=None):
+        if secret_id == "test_secret3":
+            raise ConnectionError("interrupted")
+        return real_upsert(secret_id, secret_string, current_version)
+
+    monkeypatch.setattr(snapshot_module, "upsert_secret_string", failing_upsert)
+    summary = restore_snapshot(path, key)
+    assert summary["failed"] == 1
+    assert summary["errors"] == {"test_secret3": "ConnectionError"}
+    assert os.path.exists(path + ".restore")
+
+    monkeypatch.setattr(snapshot_module, "upsert_secret_string", real_upsert)
+    summary = restore_snapshot(path, key)
+    assert summary["created"] == 1
+    assert summary["unchanged"] + summary["created"] < 50
+    assert not os.path.exists(path + ".restore")
+
+
+@pytest.mark.describe("restore_snapshot()")
+@pytest.mark.it("should replay every frame when not resuming")
+def test_restore_restart(secrets, key, tmp_path, monkeypatch):
+    """restore_snapshot() should start a new journal when resume is False."""
+    path = str(tmp_path / "backup.snap")
+    snapshot_secrets(path, key, frame_size=10)
+    delete_secret("test_secret1", force_delete=True)
+    with open(path + ".restore", "w", encoding="ascii") as f:
+        f.write("".join(f"{index}\n" for index in range(1, 6)))
+
+    assert restore_snapshot(path, key)["created"] == 0
+    with open(path + ".restore", "w", encoding="ascii") as f:
+        f.write("".join(f"{index}\n" for index in range(1, 6)))
+
+    real_upsert = snapshot_module.upsert_secret_string
+
+    def failing_upsert(secret_id, secret_string, current_version=None):
+        raise ConnectionError("interrupted")
+
+    monkeypatch.setattr(snapshot_module, "upsert_secret_string", failing_upsert)
+    summary = restore_snapshot(path, key, resume=False)
+    assert summary["failed"] == 1 and summary["unchanged"] == 49
+    with open(path + ".restore", "r", encoding="ascii") as f:
+        assert len(f.read().split()) == 4
+
+    monkeypatch.setattr(snapshot_module, "upsert_secret_string", real_upsert)
+    assert restore_snapshot(path, key)["created"] == 1
+    assert get_secret_fields("test_secret1")["password"] == "password1"
+    assert not os.path.exists(path + ".restore")
+
+
+@pytest.mark.describe("load_key()")
+@pytest.mark.it("should read the key from the environment or a key file")
+def test_load_key(tmp_path, monkeypatch):
+    """load_key() should create an owner-only key file only when asked."""
+    monkeypatch.delenv(KEY_VARIABLE, raising=False)
+    key_file = str(tmp_path / "snapshot.key")
+
+    with pytest.raises(SnapshotError):
+        load_key()
+    with pytest.raises(FileNotFoundError):
+        load_key(key_file=key_file)
+
+    created = load_key(key_file=key_file, create=True)
+    assert stat.S_IMODE(os.stat(key_file).st_mode) == 0o600
+    assert load_key(key_file=key_file) == created
+
+    monkeypatch.setenv(KEY_VARIABLE, generate_key())
+    assert load_key(key_file=key_file) != created
@@ -0,0 +1,50 @@
+"""This module contains the test suite for CLI startup time."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from src.startup import profile_startup, STARTUP_BUDGET_SECONDS
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.describe("password_manager startup")
+@pytest.mark.it("should import the CLI without loading boto3")
+def test_cli_import_does_not_load_boto3():
+    """importing src.password_manager should leave boto3 and botocore unloaded."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, src.password_manager; "
+            "print(sorted(m for m in sys.modules "
+            "if m.split('.')[0] in ('boto3', 'botocore')))",
+        ],
+        capture_output=True,
+        text=True,
+        cwd=PACKAGE_ROOT,
+        check=True,
+    )
+    assert result.stdout.strip() == "[]"
+
+
+@pytest.mark.describe("password_manager startup")
+@pytest.mark.it("should import the CLI within the startup budget")
+def test_cli_import_within_budget():
+    """the CLI import should take less than STARTUP_BUDGET_SECONDS."""
+    timings = [profile_startup()["stages"][0][1] for _ in range(3)]
+    assert min(timings) < STARTUP_BUDGET_SECONDS
+
+
+@pytest.mark.describe("profile_startup()")
+@pytest.mark.it("should report stage timings and the slowest imports")
+def test_profile_startup():
+    """profile_startup() should time each startup stage in a fresh interpreter."""
+    profile = profile_startup(top=5)
+    stages = dict(profile["stages"])
+    assert stages["boto3 loaded by the CLI import"] is False
+    assert stages["import boto3"] > 0
+    assert len(profile["imports"]) == 5
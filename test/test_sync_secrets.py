@@ -0,0 +1,250 @@
+"""This module contains the test suite for `plan_sync()` and `apply_sync()`."""
+
+import hashlib
+import os
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from src import rate_limit
+from src.create_secret import create_secret
+from src.export_secrets import export_secrets, secret_filename
+from src.get_secret import get_secret
+from src.list_secrets import list_secrets
+from src.local_vault import generate_key
+from src.sync_secrets import apply_sync, content_hash, plan_sync, HASH_TAG
+from src.upsert_secret import upsert_secret, TOKEN_KEY_VARIABLE
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    """Mocked AWS Credentials for moto"""
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+
+
+@pytest.fixture
+def mock_secretsmanager(aws_credentials):
+    """Mock secretsmanager client"""
+    with mock_aws():
+        yield boto3.client("secretsmanager", region_name="eu-west-2")
+
+
+@pytest.fixture
+def api_calls(monkeypatch):
+    """Record the name of every API call"""
+    calls = []
+    real_call = rate_limit.call
+
+    def call(api, fn, **kwargs):
+        calls.append(api)
+        return real_call(api, fn, **kwargs)
+
+    monkeypatch.setattr(rate_limit, "call", call)
+    return calls
+
+
+def write_file(directory, secret_id, secret_string):
+    with open(os.path.join(directory, secret_filename(secret_id)), "w") as f:
+        f.write(secret_string)
+
+
+def value(password):
+    return '{"user_id":"test_id","password":"%s"}' % password
+
+
+@pytest.fixture
+def directory(tmp_path):
+    """A directory holding 30 secrets"""
+    for i in range(30):
+        write_file(str(tmp_path), f"prod/test_secret{i}", value(f"password{i}"))
+    return str(tmp_path)
+
+
+@pytest.mark.describe("plan_sync()")
+@pytest.mark.it("should plan and push new secrets, then find nothing to do")
+def test_push(mock_secretsmanager, directory, api_calls):
+    """apply_sync() should create and tag every secret; a new plan reads no values."""
+    plan = plan_sync(directory)
+    assert len(plan.add) == 30 and plan.update == plan.delete == []
+    assert list_secrets() == []
+
+    summary = apply_sync(plan)
+    assert summary["added"] == 30 and summary["failed"] == 0
+    assert get_secret("prod/test_secret3") == value("password3")
+
+    tags = mock_secretsmanager.describe_secret(SecretId="prod/test_secret3")["Tags"]
+    assert tags[0]["Key"] == HASH_TAG
+    assert f":{content_hash(value('password3'))}:" in tags[0]["Value"]
+
+    api_calls.clear()
+    again = plan_sync(directory)
+    assert len(again.unchanged) == 30 and again.changes() == []
+    assert set(api_calls) == {"ListSecrets"}
+
+
+@pytest.mark.describe("plan_sync()")
+@pytest.mark.it("should push changed files and delete missing secrets only when asked")
+def test_push_changes(mock_secretsmanager, directory):
+    """apply_sync() should update edited secrets and delete removed ones."""
+    apply_sync(plan_sync(directory))
+
+    write_file(directory, "prod/test_secret1", value("changed"))
+    os.remove(os.path.join(directory, secret_filename("prod/test_secret2")))
+
+    plan = plan_sync(directory)
+    assert plan.update == ["prod/test_secret1"] and plan.delete == []
+
+    plan = plan_sync(directory, delete=True)
+    assert plan.delete == ["prod/test_secret2"]
+    assert plan.as_dict()["unchanged"] == 28
+
+    summary = apply_sync(plan)
+    assert (summary["updated"], summary["deleted"], summary["failed"]) == (1, 1, 0)
+    assert get_secret("prod/test_secret1") == value("changed")
+    assert "prod/test_secret2" not in list_secrets()
+
+
+@pytest.mark.describe("plan_sync()")
+@pytest.mark.it("should read and tag secrets whose hash is missing or out of date")
+def test_untagged(mock_secretsmanager, directory, api_calls):
+    """plan_sync() should compare untagged secrets by value once, then see changes."""
+    for i in range(30):
+        create_secret(f"prod/test_secret{i}", "test_id", f"password{i}")
+
+    plan = plan_sync(directory)
+    assert len(plan.unchanged) == 30
+    assert "BatchGetSecretValue" in api_calls
+    apply_sync(plan)
+
+    upsert_secret("prod/test_secret4", "test_id", "changed elsewhere")
+
+    api_calls.clear()
+    plan = plan_sync(directory)
+    assert plan.update == ["prod/test_secret4"]
+    assert api_calls.count("BatchGetSecretValue") == 1
+
+    apply_sync(plan)
+    assert get_secret("prod/test_secret4") == value("password4")
+
+
+@pytest.mark.describe("plan_sync()")
+@pytest.mark.it("should pull added, changed and deleted secrets into the directory")
+def test_pull(mock_secretsmanager, tmp_path):
+    """apply_sync() should write the store's secrets as export files."""
+    for i in range(5):
+        create_secret(f"test_secret{i}", "test_id", f"password{i}")
+    directory = str(tmp_path / "pulled")
+
+    summary = apply_sync(plan_sync(directory, direction="pull"))
+    assert summary["added"] == 5
+
+    exported = str(tmp_path / "exported")
+    export_secrets(exported)
+    assert sorted(os.listdir(directory)) == sorted(os.listdir(exported))
+
+    upsert_secret("test_secret0", "test_id", "changed")
+    write_file(directory, "extra", value("local only"))
+
+    plan = plan_sync(directory, direction="pull", delete=True)
+    assert (plan.update, plan.delete) == (["test_secret0"], ["extra"])
+    apply_sync(plan)
+
+    with open(os.path.join(directory, secret_filename("test_secret0"))) as f:
+        assert f.read() == value("changed")
+    assert not os.path.exists(os.path.join(directory, secret_filename("extra")))
+    assert plan_sync(directory, direction="pull").changes() == []
+
+
+@pytest.mark.describe("plan_sync()")
+@pytest.mark.it("should report a secret deleted between the plan and the pull")
+def test_pull_missing(mock_secretsmanager, tmp_path):
+    """apply_sync() should pull the rest and report the missing secret."""
+    for i in range(3):
+        create_secret(f"test_secret{i}", "test_id", f"password{i}")
+    apply_sync(plan_sync(str(tmp_path / "tagged"), direction="pull"))
+
+    directory = str(tmp_path / "pulled")
+    plan = plan_sync(directory, direction="pull")
+    mock_secretsmanager.delete_secret(
+        SecretId="test_secret1", ForceDeleteWithoutRecovery=True
+    )
+
+    summary = apply_sync(plan)
+    assert summary["added"] == 2
+    assert summary["errors"] == {"test_secret1": "ResourceNotFoundException"}
+
+
+@pytest.mark.describe("plan_sync()")
+@pytest.mark.it("should only sync secrets under the name prefix")
+def test_prefix(mock_secretsmanager, directory):
+    """plan_sync() should ignore files and secrets outside the prefix."""
+    create_secret("other", "test_id", "test_password")
+    plan = plan_sync(directory, name_prefix="prod/test_secret1", delete=True)
+    assert len(plan.add) == 11 and plan.delete == []
+
+
+@pytest.mark.describe("plan_sync()")
+@pytest.mark.it("should refuse to push from a missing or empty directory with delete")
+def test_missing_directory(mock_secretsmanager, tmp_path):
+    """plan_sync() should not plan deleting every secret because of a bad path."""
+    for i in range(3):
+        create_secret(f"test_secret{i}", "test_id", f"password{i}")
+
+    with pytest.raises(FileNotFoundError):
+        plan_sync(str(tmp_path / "typo"), delete=True)
+    with pytest.raises(ValueError):
+        plan_sync(str(tmp_path), delete=True)
+
+    plan = plan_sync(str(tmp_path), delete=True, allow_empty=True)
+    assert len(plan.delete) == 3
+
+
+@pytest.mark.describe("plan_sync()")
+@pytest.mark.it("should tag an HMAC under the local key rather than a plain hash")
+def test_tag_is_keyed(mock_secretsmanager, directory, monkeypatch):
+    """content_hash() should depend on the token key, not only on the value."""
+    digest = content_hash(value("password3"))
+    assert digest != hashlib.sha256(value("password3").encode("utf-8")).hexdigest()
+    monkeypatch.setenv(TOKEN_KEY_VARIABLE, generate_key())
+    assert content_hash(value("password3")) != digest
+
+
+@pytest.mark.describe("plan_sync()")
+@pytest.mark.it("should read rather than update secrets tagged under another key")
+def test_tag_from_another_key(mock_secretsmanager, directory, monkeypatch, api_calls):
+    """plan_sync() on a host with its own key should find nothing to push."""
+    apply_sync(plan_sync(directory))
+    monkeypatch.setenv(TOKEN_KEY_VARIABLE, generate_key())
+
+    api_calls.clear()
+    plan = plan_sync(directory)
+    assert len(plan.unchanged) == 30 and plan.changes() == []
+    assert "BatchGetSecretValue" in api_calls
+
+    apply_sync(plan)
+    api_calls.clear()
+    assert plan_sync(directory).changes() == []
+    assert set(api_calls) == {"ListSecrets"}
+
+
+@pytest.mark.describe("plan_sync()")
+@pytest.mark.it("should pull every secret of a large, mixed-case namespace")
+def test_pull_mixed_case(mock_secretsmanager, tmp_path):
+    """plan_sync() should see secrets the sharded listing has to split for."""
+    for i in range(120):
+        create_secret(f"Prod/x{i:03}", "test_id", f"password{i}")
+    plan = plan_sync(str(tmp_path), direction="pull", delete=True)
+    assert len(plan.add) == 120
+
+
+@pytest.mark.describe("plan_sync()")
+@pytest.mark.it("should reject an unknown direction")
+def test_direction(tmp_path):
+    """plan_sync() should raise ValueError for anything but push or pull."""
+    with pytest.raises(ValueError):
+        plan_sync(str(tmp_path), direction="both")
@@ -0,0 +1,182 @@
+"""This module contains the test suite for `upsert_secret()` and its variants."""
+
+import os
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from src import events
+from src.create_secret import create_secret
+from src.get_secret import get_secret, get_secret_fields
+from src.local_vault import generate_key
+from src.upsert_secret import (
+    TOKEN_KEY_VARIABLE,
+    client_request_token,
+    default_token_key_file,
+    update_secret,
+    upsert_secret,
+    upsert_secret_string,
+    upsert_secrets,
+)
+from src.validation import InvalidCharacterError
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    """Mocked AWS Credentials for moto"""
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+
+
+@pytest.fixture
+def mock_secretsmanager(aws_credentials):
+    """Mock secretsmanager client"""
+    with mock_aws():
+        yield boto3.client("secretsmanager", region_name="eu-west-2")
+
+
+def versions(client, secret_id):
+    return client.describe_secret(SecretId=secret_id)["VersionIdsToStages"]
+
+
+@pytest.mark.describe("client_request_token()")
+@pytest.mark.it("should derive the same valid token from the same content")
+def test_token():
+    """client_request_token() should depend on both name and content."""
+    token = client_request_token("test_secret", "value")
+    assert token == client_request_token("test_secret", "value")
+    assert token != client_request_token("test_secret", "other")
+    assert token != client_request_token("other_secret", "value")
+    assert 32 <= len(token) <= 64
+
+
+@pytest.mark.describe("client_request_token()")
+@pytest.mark.it("should depend on the token key, created owner-only when not set")
+def test_token_key(monkeypatch, tmp_path):
+    """client_request_token() should be an HMAC under a locally held key."""
+    token = client_request_token("test_secret", "value")
+    monkeypatch.setenv(TOKEN_KEY_VARIABLE, generate_key())
+    assert client_request_token("test_secret", "value") != token
+
+    monkeypatch.delenv(TOKEN_KEY_VARIABLE)
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path))
+    token = client_request_token("test_secret", "value")
+    key_file = default_token_key_file()
+    assert key_file.startswith(str(tmp_path))
+    assert os.stat(key_file).st_mode & 0o777 == 0o600
+    assert client_request_token("test_secret", "value") == token
+
+
+@pytest.mark.describe("upsert_secret()")
+@pytest.mark.it("should create a missing secret and update an existing one")
+def test_upsert(mock_secretsmanager):
+    """upsert_secret() should create, then add versions, but none for repeats."""
+    assert upsert_secret("test_secret", "test_id", "first") == "created"
+    assert upsert_secret("test_secret", "test_id", "second") == "updated"
+    assert upsert_secret("test_secret", "test_id", "second") == "unchanged"
+    assert get_secret_fields("test_secret")["password"] == "second"
+    assert len(versions(mock_secretsmanager, "test_secret")) == 2
+
+
+@pytest.mark.describe("upsert_secret()")
+@pytest.mark.it("should update a secret made by create_secret()")
+def test_upsert_existing(mock_secretsmanager):
+    """upsert_secret() should put a new version on an existing secret."""
+    create_secret("test_secret", "test_id", "test_password")
+    assert upsert_secret("test_secret", "test_id", "new_password") == "updated"
+    assert (
+        get_secret("test_secret") == '{"user_id":"test_id","password":"new_password"}'
+    )
+
+
+@pytest.mark.describe("upsert_secret()")
+@pytest.mark.it("should make an earlier value current again")
+def test_upsert_revert(mock_secretsmanager):
+    """upsert_secret() should move AWSCURRENT to an older version with the content."""
+    upsert_secret("test_secret", "test_id", "first")
+    upsert_secret("test_secret", "test_id", "second")
+    assert upsert_secret("test_secret", "test_id", "first") == "updated"
+    # moto does not move its default version with the stage, so ask for AWSCURRENT.
+    current = mock_secretsmanager.get_secret_value(
+        SecretId="test_secret", VersionStage="AWSCURRENT"
+    )
+    assert current["SecretString"] == '{"user_id":"test_id","password":"first"}'
+    assert len(versions(mock_secretsmanager, "test_secret")) == 2
+
+
+@pytest.mark.describe("upsert_secret()")
+@pytest.mark.it("should skip the write when the known version matches the content")
+def test_upsert_unchanged(mock_secretsmanager):
+    """upsert_secret() should send nothing when the current version has the content."""
+    upsert_secret("test_secret", "test_id", "first")
+    current = client_request_token("test_secret", get_secret("test_secret"))
+    assert (
+        upsert_secret("test_secret", "test_id", "first", current_version=current)
+        == "unchanged"
+    )
+    with pytest.raises(InvalidCharacterError):
+        upsert_secret("±", "test_id", "first")
+
+
+@pytest.mark.describe("upsert_secret()")
+@pytest.mark.it("should find unchanged content without being told the current version")
+def test_upsert_unchanged_lookup(mock_secretsmanager):
+    """upsert_secret() should neither write nor announce content already current."""
+    upsert_secret("test_secret", "test_id", "first")
+    changes = []
+
+    def listener(action, secret_id):
+        changes.append((action, secret_id))
+
+    events.subscribe(listener)
+    try:
+        assert upsert_secret("test_secret", "test_id", "first") == "unchanged"
+        assert update_secret("test_secret", "test_id", "first") == "unchanged"
+        assert (
+            upsert_secret_string("test_secret", get_secret("test_secret"))
+            == "unchanged"
+        )
+        assert changes == []
+        assert upsert_secret("test_secret", "test_id", "second") == "updated"
+        assert changes == [(events.UPDATED, "test_secret")]
+    finally:
+        events.unsubscribe(listener)
+    assert len(versions(mock_secretsmanager, "test_secret")) == 2
+
+
+@pytest.mark.describe("update_secret()")
+@pytest.mark.it("should error when the secret does not exist")
+def test_update_missing(mock_secretsmanager):
+    """update_secret() should not create secrets."""
+    with pytest.raises(mock_secretsmanager.exceptions.ResourceNotFoundException):
+        update_secret("missing", "test_id", "test_password")
+
+
+@pytest.mark.describe("upsert_secrets()")
+@pytest.mark.it("should reconcile many secrets, skipping unchanged ones")
+def test_upsert_secrets(mock_secretsmanager):
+    """upsert_secrets() should report a status per secret."""
+    upsert_secret("same", "test_id", "test_password")
+    upsert_secret("changed", "test_id", "old")
+    create_secret("legacy", "test_id", "test_password")
+    rows = [
+        {"secret_identifier": name, "user_id": "test_id", "password": password}
+        for name, password in [
+            ("same", "test_password"),
+            ("changed", "new"),
+            ("legacy", "test_password"),
+            ("new", "test_password"),
+            ("±", "test_password"),
+        ]
+    ]
+    assert upsert_secrets(rows, max_workers=2) == {
+        "same": "unchanged",
+        "changed": "updated",
+        "legacy": "updated",
+        "new": "created",
+        "±": "failed",
+    }
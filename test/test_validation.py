@@ -0,0 +1,101 @@
+"""This module contains the test suite for the shared validation rules."""
+
+import pytest
+
+from src import create_secret, delete_secret, get_secret, get_secrets
+from src.validation import (
+    check_secret,
+    validate_batch,
+    validate_secret,
+    validate_secret_id,
+    validate_secret_size,
+    BlankArgumentError,
+    InvalidCharacterError,
+    NameTooLongError,
+    SecretTooLargeError,
+    ValidationError,
+    MAX_NAME_LENGTH,
+    MAX_SECRET_SIZE,
+)
+
+
+@pytest.mark.describe("validate_secret()")
+@pytest.mark.it("should accept every allowed character up to the name length limit")
+def test_valid():
+    """validate_secret() should accept letters, digits and /_+=.@-."""
+    validate_secret("aZ09/_+=.@-", "test_id", "test_password")
+    validate_secret("a" * MAX_NAME_LENGTH, "test_id", "test_password")
+
+
+@pytest.mark.describe("validate_secret()")
+@pytest.mark.it("should reject blank, invalid, long and oversized input")
+def test_invalid():
+    """validate_secret() should raise the specific ValidationError for each problem."""
+    with pytest.raises(BlankArgumentError):
+        validate_secret("test_secret", "", "test_password")
+    with pytest.raises(InvalidCharacterError):
+        validate_secret("test secret", "test_id", "test_password")
+    with pytest.raises(InvalidCharacterError):
+        validate_secret("tést", "test_id", "test_password")
+    with pytest.raises(InvalidCharacterError):
+        validate_secret("test_secret\n", "test_id", "test_password")
+    with pytest.raises(NameTooLongError):
+        validate_secret("a" * (MAX_NAME_LENGTH + 1), "test_id", "test_password")
+    with pytest.raises(SecretTooLargeError):
+        validate_secret("test_secret", "test_id", "p" * MAX_SECRET_SIZE)
+    with pytest.raises(SecretTooLargeError):
+        validate_secret_size(b"\0" * (MAX_SECRET_SIZE + 1))
+
+
+@pytest.mark.describe("validate_secret()")
+@pytest.mark.it("should measure the encoded size of multi-byte values")
+def test_encoded_size():
+    """validate_secret() should count UTF-8 bytes, not characters."""
+    validate_secret("test_secret", "test_id", "é" * (MAX_SECRET_SIZE // 2 - 100))
+    with pytest.raises(SecretTooLargeError):
+        validate_secret("test_secret", "test_id", "é" * (MAX_SECRET_SIZE // 2))
+
+
+@pytest.mark.describe("validation errors")
+@pytest.mark.it("should be shared by every module")
+def test_shared_errors():
+    """Each module should re-export the one BlankArgumentError."""
+    for module in (create_secret, delete_secret, get_secret, get_secrets):
+        assert module.BlankArgumentError is BlankArgumentError
+    assert create_secret.InvalidCharacterError is InvalidCharacterError
+    assert issubclass(BlankArgumentError, ValidationError)
+    with pytest.raises(BlankArgumentError):
+        validate_secret_id("")
+
+
+@pytest.mark.describe("validate_batch()")
+@pytest.mark.it("should report every invalid row in one pass")
+def test_validate_batch():
+    """validate_batch() should count valid rows and describe each invalid one."""
+    rows = [
+        {"secret_identifier": "test_secret", "user_id": "u", "password": "p"},
+        {"secret_identifier": "±±±", "user_id": "u", "password": "p"},
+        {"secret_identifier": "test_secret", "user_id": "u", "password": "p"},
+        {"secret_identifier": "other", "user_id": "u"},
+    ]
+    report = validate_batch(rows)
+    assert report["valid"] == 1
+    assert report["invalid"] == 3
+    assert [(e["row"], e["error"]) for e in report["errors"]] == [
+        (2, "InvalidCharacterError"),
+        (3, "DuplicateSecretError"),
+        (4, "BlankArgumentError"),
+    ]
+
+
+@pytest.mark.describe("validate_batch()")
+@pytest.mark.it("should check thousands of rows")
+def test_validate_batch_large():
+    """validate_batch() should handle large batches."""
+    rows = (
+        {"secret_identifier": f"team/test_secret{i}", "user_id": "u", "password": "p"}
+        for i in range(20000)
+    )
+    assert validate_batch(rows) == {"valid": 20000, "invalid": 0, "errors": []}
+    assert check_secret("±", "u", "p") is InvalidCharacterError
+    assert check_secret("ok", "u", "p") is None